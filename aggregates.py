@@ -0,0 +1,346 @@
+# importing modules
+import json
+import os
+import threading
+
+# importing user made modules
+from pricing import DEFAULT_PRICING
+from read import readCommitStamp
+from write import getLastCommitStamp
+
+# Size (bytes) of the log of totals changes above which it is folded into the saved totals
+TOTALS_LOG_FOLD_SIZE = 256 * 1024
+
+# Helper Function for adding one sale line to a group of totals.
+def addToTotals(totals, key, units, revenue, cost):
+    """
+    Helper Function
+    Adding units, revenue and cost to the [units, revenue, cost] entry of a key.
+
+    · Parameters:
+        totals (dict): Key -> [units, revenue, cost] (e.g., RunningTotals.byBrand).
+        key (str): The day, brand or origin.
+        units (int): Units sold (including free ones).
+        revenue (int): Money received.
+        cost (int): Cost price of the units sold.
+    """
+    entry = totals.get(key)
+    if entry is None:
+        totals[key] = [units, revenue, cost]
+    else:
+        entry[0] += units
+        entry[1] += revenue
+        entry[2] += cost
+
+# Class for totals that are kept up to date with every sale and restock.
+class RunningTotals:
+    """
+    Main Class
+    Keeping shop-wide figures up to date as transactions happen, instead of scanning
+    the catalogue or the invoices each time they are needed:
+    - stock value at cost price and at the regular selling price (the markup of the
+      pricing engine, 2x cost by default, without promotions),
+    - units sold, revenue and cost of the items sold (so the margin) per day, per
+      brand and per origin, each kept as [units, revenue, cost].
+    Each sale or restock changes them in O(1) per cart line. It is used as a recorder
+    (recordSale/recordRestock, see notifyRecorders in engine.py). Every change is
+    appended as one line to a log next to the product file (e.g.,
+    "products.txt.totals.log"), which is folded into the saved totals
+    ("products.txt.totals") once it grows past TOTALS_LOG_FOLD_SIZE bytes.
+    The stock values are worked out from the catalogue only when no saved totals
+    exist or they were not saved in step with the stock: the totals and every logged
+    change hold the commit stamp of the last stock change they include (see
+    getLastCommitStamp in write.py), which has to match the stamp of the product
+    file (see readCommitStamp in read.py). Compacting the journal keeps the stamp.
+
+    · Example (Only for demonstration purposes):
+        runningTotals = RunningTotals.load("products.txt", product_data)
+        runningTotals.stockValueCost
+        units, revenue, cost = runningTotals.byDay["2025-05-01"]
+    """
+
+    def __init__(self, totalsFileName, pricingEngine=None, productFileName=None):
+        self.totalsFileName = totalsFileName
+        self.logFileName = totalsFileName + ".log"
+        self.productFileName = productFileName # For the key of the stock the totals match
+        self.pricingEngine = pricingEngine or DEFAULT_PRICING
+        self.lock = threading.Lock() # The inventory server records from several threads
+        self.autoSave = True # Batches turn this off and save once at the end
+        self.productCount = 0
+        self.markups = None # Markups the selling value was worked out with
+        self.stateKey = None # Commit stamp of the stock the stock values belong to
+        self.stockValueCost = 0
+        self.stockValueSelling = 0
+        self.byDay = {}
+        self.byBrand = {}
+        self.byOrigin = {}
+
+    @classmethod
+    def load(cls, productFileName, productDataDict, pricingEngine=None):
+        """
+        Loading the saved totals of a product file and the changes logged since,
+        or working the stock values out from the catalogue if there are none (or
+        they belong to other stock, a catalogue of another size or other markups).
+
+        · Parameters:
+            productFileName (str): The product file (e.g., "products.txt").
+            productDataDict (dict or ProductStore): The loaded products.
+            pricingEngine (PricingEngine): Optional pricing rules, see pricing.py.
+        · Returns:
+            RunningTotals: The totals.
+        """
+        runningTotals = cls(productFileName + ".totals", pricingEngine, productFileName)
+        try:
+            totalsFile = open(runningTotals.totalsFileName, "r")
+            saved = json.load(totalsFile)
+            totalsFile.close()
+            for key, value in saved.items():
+                setattr(runningTotals, key, value)
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print("Warning: Could not read saved totals, recalculating: " + str(e))
+        try:
+            logFile = open(runningTotals.logFileName, "r")
+            for line in logFile:
+                try:
+                    change = json.loads(line)
+                except ValueError:
+                    break # A line cut short by a crash, its stock change is caught by the key
+                runningTotals.applyChange(change)
+            logFile.close()
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print("Warning: Could not read the totals log, recalculating: " + str(e))
+            runningTotals.stateKey = None
+        if runningTotals.productCount != len(productDataDict) or runningTotals.markups != runningTotals.currentMarkups() or runningTotals.stateKey != readCommitStamp(productFileName):
+            runningTotals.rebuildStockValues(productDataDict)
+        return runningTotals
+
+    def currentMarkups(self):
+        """
+        Getting the markups of the pricing engine in the form they are saved in.
+
+        · Returns:
+            list: [markup, {brand: markup}].
+        """
+        return [self.pricingEngine.markup, self.pricingEngine.brandMarkups]
+
+    def rebuildStockValues(self, productDataDict):
+        """
+        Working out the stock values from the whole catalogue (one full scan).
+
+        · Parameters:
+            productDataDict (dict or ProductStore): The products.
+        """
+        if hasattr(productDataDict, "totalStockValue"):
+            stockValueCost = productDataDict.totalStockValue()
+        else:
+            stockValueCost = sum(details[2] * details[3] for details in productDataDict.values())
+        if not self.pricingEngine.brandMarkups and self.pricingEngine.markup == int(self.pricingEngine.markup):
+            stockValueSelling = stockValueCost * int(self.pricingEngine.markup)
+        else:
+            stockValueSelling = sum(details[2] * self.pricingEngine.listPrice(details[1], details[3]) for details in productDataDict.values())
+        with self.lock:
+            self.productCount = len(productDataDict)
+            self.markups = self.currentMarkups()
+            self.stockValueCost = stockValueCost
+            self.stockValueSelling = stockValueSelling
+        self.save()
+
+    def currentStateKey(self, readFile=False):
+        """
+        Getting the commit stamp of the current stock of the product file, as saved
+        by this process (a dictionary lookup, no file is read).
+
+        · Parameters:
+            readFile (bool): Reading the stamp from the product file and its journal
+                             if this process has not saved a change to it yet.
+        · Returns:
+            str: The stamp, or None for totals not tied to a product file (or stock
+                 without a stamp, e.g. a binary product file).
+        """
+        if not self.productFileName:
+            return None
+        commitStamp = getLastCommitStamp(self.productFileName)
+        if commitStamp is None and readFile:
+            commitStamp = readCommitStamp(self.productFileName)
+        return commitStamp
+
+    def applyChange(self, change):
+        """
+        Adding one logged change to the totals (see logChange).
+
+        · Parameters:
+            change (dict): {"cost", "selling", "products", "sales", "key"}, where
+                           "sales" holds [day, brand, origin, units, revenue, cost] lines.
+        """
+        self.stockValueCost += change["cost"]
+        self.stockValueSelling += change["selling"]
+        self.productCount += change["products"]
+        for day, brand, origin, units, revenue, cost in change["sales"]:
+            addToTotals(self.byDay, day, units, revenue, cost)
+            addToTotals(self.byBrand, brand, units, revenue, cost)
+            addToTotals(self.byOrigin, origin, units, revenue, cost)
+        self.stateKey = change["key"]
+
+    def logChange(self, costChange, sellingChange, productCountChange=0, sales=()):
+        """
+        Applying one change to the totals and, unless a batch saves them at the end,
+        appending it to the totals log, so a sale writes one short line instead of
+        all the totals. The log is folded into the saved totals once it grows past
+        TOTALS_LOG_FOLD_SIZE bytes.
+
+        · Parameters:
+            costChange (int): Change of the stock value at cost price.
+            sellingChange (int): Change of the stock value at selling price.
+            productCountChange (int): Products added to the catalogue.
+            sales (list): [day, brand, origin, units, revenue, cost] per sale line.
+        · Returns:
+            bool: True if logged (or not asked to), False otherwise.
+        """
+        with self.lock:
+            change = {"cost": costChange, "selling": sellingChange, "products": productCountChange, "sales": list(sales), "key": self.currentStateKey()}
+            self.applyChange(change)
+            if not self.autoSave:
+                return True
+            try:
+                logFile = open(self.logFileName, "a")
+                logFile.write(json.dumps(change, separators=(",", ":")) + "\n")
+                logSize = logFile.tell()
+                logFile.close()
+            except Exception as e:
+                print("Warning: Could not log totals '" + self.logFileName + "': " + str(e))
+                return False
+        if logSize > TOTALS_LOG_FOLD_SIZE:
+            return self.save()
+        return True
+
+    def save(self):
+        """
+        Saving all the totals next to the product file (temporary file + rename),
+        with the key of the current stock, and removing the log folded into them.
+
+        · Returns:
+            bool: True if saved, False otherwise.
+        """
+        stateKey = self.currentStateKey(readFile=True)
+        with self.lock:
+            self.stateKey = stateKey
+            saved = {
+                "productCount": self.productCount,
+                "markups": self.markups,
+                "stateKey": self.stateKey,
+                "stockValueCost": self.stockValueCost,
+                "stockValueSelling": self.stockValueSelling,
+                "byDay": self.byDay,
+                "byBrand": self.byBrand,
+                "byOrigin": self.byOrigin,
+            }
+            try:
+                tempFileName = self.totalsFileName + ".tmp"
+                totalsFile = open(tempFileName, "w")
+                json.dump(saved, totalsFile)
+                totalsFile.close()
+                os.replace(tempFileName, self.totalsFileName)
+                if os.path.exists(self.logFileName):
+                    os.remove(self.logFileName)
+                return True
+            except Exception as e:
+                print("Warning: Could not save totals '" + self.totalsFileName + "': " + str(e))
+                return False
+
+    def recordSale(self, invoiceName, customerName, customerPhone, cart, timestamp):
+        """
+        Updating the totals for one sale.
+
+        · Parameters:
+            invoiceName (str): The invoice file name (unused).
+            customerName (str): The customer name (unused).
+            customerPhone (str): The customer phone number (unused).
+            cart (list): The sale items (see createSaleItem in engine.py).
+            timestamp (datetime): When the sale happened.
+        """
+        day = timestamp.strftime("%Y-%m-%d")
+        costChange = 0
+        sellingChange = 0
+        sales = []
+        for item in cart:
+            units = item["totalQty"]
+            revenue = item["paidQty"] * item["price"]
+            cost = units * item["cost"]
+            costChange -= cost
+            sellingChange -= units * self.pricingEngine.listPrice(item["brand"], item["cost"])
+            sales.append([day, item["brand"], item["origin"], units, revenue, cost])
+        self.logChange(costChange, sellingChange, 0, sales)
+
+    def recordRestock(self, invoiceName, supplierName, supplierPhone, restockList, previousValues, timestamp):
+        """
+        Updating the stock values for one restock. A restock also sets a new cost
+        price, so the old value of each product is replaced by its new value.
+
+        · Parameters:
+            invoiceName (str): The invoice file name (unused).
+            supplierName (str): The supplier name (unused).
+            supplierPhone (str): The supplier phone number (unused).
+            restockList (list): The restock items {"id", "name", "brand", "qty", "cost", "origin"}.
+            previousValues (dict): Product ID -> (Quantity, CostPrice) before the restock.
+            timestamp (datetime): When the restock happened (unused).
+        """
+        brands = dict((item["id"], item["brand"]) for item in restockList)
+        finalValues = dict((productId, list(values)) for productId, values in previousValues.items())
+        for item in restockList:
+            finalValues[item["id"]][0] += item["qty"]
+            finalValues[item["id"]][1] = item["cost"]
+        listPrice = self.pricingEngine.listPrice
+        costChange = 0
+        sellingChange = 0
+        for productId, (oldQty, oldCost) in previousValues.items():
+            newQty, newCost = finalValues[productId]
+            costChange += newQty * newCost - oldQty * oldCost
+            sellingChange += newQty * listPrice(brands[productId], newCost) - oldQty * listPrice(brands[productId], oldCost)
+        self.logChange(costChange, sellingChange)
+
+    def recordStockChange(self, brand, quantityChange, costPrice, productCountChange=0):
+        """
+        Updating the stock values for stock moved in or out without a sale or restock,
+        e.g. a transfer between locations (see locations.py).
+
+        · Parameters:
+            brand (str): The brand of the product.
+            quantityChange (int): The units added (positive) or taken out (negative).
+            costPrice (int): The cost price per item.
+            productCountChange (int): 1 if the product was new to this catalogue.
+        """
+        self.logChange(quantityChange * costPrice, quantityChange * self.pricingEngine.listPrice(brand, costPrice), productCountChange)
+
+# Function for showing the dashboard of running totals.
+def displayDashboard(runningTotals, today):
+    """
+    Main Function
+    Showing the running totals on the console, without scanning the catalogue or
+    the invoices.
+
+    · Parameters:
+        runningTotals (RunningTotals): The totals to show.
+        today (str): Today's date, "YYYY-MM-DD".
+    · Returns:
+        None: This function only prints to the console.
+    """
+    print("\n" + "=" * 60)
+    print("------------------------ Dashboard -------------------------")
+    print("-" * 60)
+    print("Stock value at cost price:     Nrs " + str(runningTotals.stockValueCost))
+    print("Stock value at selling price:  Nrs " + str(runningTotals.stockValueSelling))
+    units, revenue, cost = runningTotals.byDay.get(today, [0, 0, 0])
+    print("Sold today:                    " + str(units) + " units")
+    print("Revenue today:                 Nrs " + str(revenue))
+    print("Margin today:                  Nrs " + str(revenue - cost))
+    for label, totals in (("Brand", runningTotals.byBrand), ("Origin", runningTotals.byOrigin)):
+        print("-" * 60)
+        print(label + "\t\t\tUnits\tRevenue\tMargin")
+        for key in sorted(totals, key=lambda key: totals[key][1], reverse=True)[:10]:
+            units, revenue, cost = totals[key]
+            print(key + "\t\t\t" + str(units) + "\t" + str(revenue) + "\t" + str(revenue - cost))
+    print("=" * 60)
@@ -0,0 +1,320 @@
+# importing modules
+import argparse
+import sqlite3
+import threading
+import time
+
+# Default file of the sales archive
+ARCHIVE_FILE = "sales.db"
+# Rows read from the archive at a time when streaming many lines
+ARCHIVE_FETCH_SIZE = 5000
+
+# Tables of the archive:
+#   transaction_lines: one row per invoice line of every sale and restock
+#   daily_totals     : units, revenue and cost per day, product and kind, kept up to
+#                      date on every insert so reports do not have to read every line
+ARCHIVE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS transaction_lines (
+    line_id INTEGER PRIMARY KEY,
+    kind TEXT NOT NULL,
+    invoice TEXT NOT NULL,
+    day TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    party TEXT NOT NULL,
+    phone TEXT NOT NULL,
+    product_id INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    brand TEXT NOT NULL,
+    origin TEXT NOT NULL,
+    quantity INTEGER NOT NULL,
+    paid_quantity INTEGER NOT NULL,
+    unit_price INTEGER NOT NULL,
+    unit_cost INTEGER NOT NULL,
+    amount INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS lines_by_day ON transaction_lines (day);
+CREATE INDEX IF NOT EXISTS lines_by_product ON transaction_lines (product_id, day);
+CREATE INDEX IF NOT EXISTS lines_by_party ON transaction_lines (kind, party, day);
+CREATE TABLE IF NOT EXISTS daily_totals (
+    day TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    product_id INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    brand TEXT NOT NULL,
+    origin TEXT NOT NULL,
+    units INTEGER NOT NULL,
+    paid_units INTEGER NOT NULL,
+    revenue INTEGER NOT NULL,
+    cost INTEGER NOT NULL,
+    PRIMARY KEY (day, kind, product_id)
+);
+CREATE INDEX IF NOT EXISTS totals_by_product ON daily_totals (product_id, day);
+CREATE INDEX IF NOT EXISTS totals_by_brand ON daily_totals (brand, day);
+"""
+
+# Statement adding one line to the daily totals
+DAILY_TOTALS_UPSERT = """
+INSERT INTO daily_totals (day, kind, product_id, name, brand, origin, units, paid_units, revenue, cost)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (day, kind, product_id) DO UPDATE SET
+    units = units + excluded.units,
+    paid_units = paid_units + excluded.paid_units,
+    revenue = revenue + excluded.revenue,
+    cost = cost + excluded.cost
+"""
+
+# Columns a report can be grouped by, and the SQL expression for each
+REPORT_GROUPS = {
+    "product": "product_id || ' ' || name",
+    "brand": "brand",
+    "origin": "origin",
+    "day": "day",
+    "month": "substr(day, 1, 7)",
+    "year": "substr(day, 1, 4)",
+}
+
+# Class for the structured, indexed archive of every sale and restock.
+class SalesArchive:
+    """
+    Main Class
+    Recording every sale and restock line in a local SQLite file next to the text
+    invoices, indexed by date, product, customer and supplier, and answering
+    revenue, units and margin reports without reading any invoice file.
+    It is used as a recorder by sellProducts/restockProducts, batch.py and the
+    inventory server (see notifyRecorders in engine.py).
+
+    · Example (Only for demonstration purposes):
+        salesArchive = SalesArchive("sales.db")
+        salesArchive.report("brand", "2025-01-01", "2025-03-31")
+    """
+
+    def __init__(self, fileName=ARCHIVE_FILE):
+        self.fileName = fileName
+        self.lock = threading.Lock() # One connection shared by the server threads
+        self.connection = sqlite3.connect(fileName, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(ARCHIVE_SCHEMA)
+
+    def insertLines(self, rows):
+        """
+        Adding invoice lines and updating the daily totals in one database transaction.
+
+        · Parameters:
+            rows (list): Tuples in the column order of transaction_lines (without line_id).
+        """
+        with self.lock:
+            with self.connection:
+                self.connection.executemany("INSERT INTO transaction_lines (kind, invoice, day, timestamp, party, phone, product_id, name, brand, origin, quantity, paid_quantity, unit_price, unit_cost, amount) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+                self.connection.executemany(DAILY_TOTALS_UPSERT, [(row[2], row[0], row[6], row[7], row[8], row[9], row[10], row[11], row[14], row[10] * row[13]) for row in rows])
+
+    def recordSale(self, invoiceName, customerName, customerPhone, cart, timestamp):
+        """
+        Recording the lines of one sale.
+
+        · Parameters:
+            invoiceName (str): The invoice file name.
+            customerName (str): The customer name.
+            customerPhone (str): The customer phone number.
+            cart (list): The sale items (see createSaleItem in engine.py).
+            timestamp (datetime): When the sale happened.
+        """
+        day = timestamp.strftime("%Y-%m-%d")
+        moment = timestamp.isoformat(" ")
+        self.insertLines([("SALE", invoiceName, day, moment, customerName, customerPhone, item["id"], item["name"], item["brand"], item["origin"], item["totalQty"], item["paidQty"], item["price"], item["cost"], item["paidQty"] * item["price"]) for item in cart])
+
+    def recordRestock(self, invoiceName, supplierName, supplierPhone, restockList, previousValues, timestamp):
+        """
+        Recording the lines of one restock.
+
+        · Parameters:
+            invoiceName (str): The invoice file name.
+            supplierName (str): The supplier name.
+            supplierPhone (str): The supplier phone number.
+            restockList (list): The restock items {"id", "name", "brand", "qty", "cost", "origin"}.
+            previousValues (dict): Product ID -> (Quantity, CostPrice) before the restock (unused).
+            timestamp (datetime): When the restock happened.
+        """
+        day = timestamp.strftime("%Y-%m-%d")
+        moment = timestamp.isoformat(" ")
+        self.insertLines([("RESTOCK", invoiceName, day, moment, supplierName, supplierPhone, item["id"], item["name"], item["brand"], item["origin"], item["qty"], item["qty"], item["cost"], item["cost"], item["qty"] * item["cost"]) for item in restockList])
+
+    def report(self, groupBy, fromDate=None, toDate=None, kind="SALE", productId=None, party=None):
+        """
+        Summarising units, revenue, cost and margin per product, brand, origin or period.
+        Reports without a customer/supplier filter read the daily totals, so their
+        cost depends on the number of days and products, not on the number of lines.
+
+        · Parameters:
+            groupBy (str): One of REPORT_GROUPS ("product", "brand", "origin", "day", "month", "year").
+            fromDate (str): First day included, "YYYY-MM-DD" (optional).
+            toDate (str): Last day included, "YYYY-MM-DD" (optional).
+            kind (str): "SALE" or "RESTOCK".
+            productId (int): Only this product (optional).
+            party (str): Only this customer/supplier (optional, reads the invoice lines).
+        · Returns:
+            list: (group, units, paidUnits, revenue, cost, margin) tuples, highest revenue first.
+        · Raises:
+            ValueError: If groupBy is not known.
+        """
+        if groupBy not in REPORT_GROUPS:
+            raise ValueError("Unknown report grouping: " + groupBy)
+        if party is None:
+            table = "daily_totals"
+            sums = "SUM(units), SUM(paid_units), SUM(revenue), SUM(cost)"
+        else:
+            table = "transaction_lines"
+            sums = "SUM(quantity), SUM(paid_quantity), SUM(amount), SUM(quantity * unit_cost)"
+        conditions = ["kind = ?"]
+        parameters = [kind]
+        if fromDate:
+            conditions.append("day >= ?")
+            parameters.append(fromDate)
+        if toDate:
+            conditions.append("day <= ?")
+            parameters.append(toDate)
+        if productId is not None:
+            conditions.append("product_id = ?")
+            parameters.append(productId)
+        if party is not None:
+            conditions.append("party = ?")
+            parameters.append(party)
+        query = "SELECT " + REPORT_GROUPS[groupBy] + ", " + sums + " FROM " + table + " WHERE " + " AND ".join(conditions) + " GROUP BY 1 ORDER BY 4 DESC"
+        with self.lock:
+            rows = self.connection.execute(query, parameters).fetchall()
+        return [(group, units, paidUnits, revenue, cost, revenue - cost) for group, units, paidUnits, revenue, cost in rows]
+
+    def unitsSoldByProduct(self, fromDate, toDate=None):
+        """
+        Adding up the units sold of every product over a period, from the daily totals.
+
+        · Parameters:
+            fromDate (str): First day included, "YYYY-MM-DD".
+            toDate (str): Last day included, "YYYY-MM-DD" (optional).
+        · Returns:
+            dict: Product ID -> units sold (including free items).
+        """
+        query = "SELECT product_id, SUM(units) FROM daily_totals WHERE kind = 'SALE' AND day >= ?"
+        parameters = [fromDate]
+        if toDate:
+            query += " AND day <= ?"
+            parameters.append(toDate)
+        with self.lock:
+            rows = self.connection.execute(query + " GROUP BY product_id", parameters).fetchall()
+        return dict(rows)
+
+    def getLastLineId(self):
+        """
+        Getting the ID of the last invoice line recorded. Lines are numbered in the
+        order they are recorded, so reads limited to this ID see the archive as it
+        is now, even while new lines are being added.
+
+        · Returns:
+            int: The ID, 0 if the archive is empty.
+        """
+        with self.lock:
+            return self.connection.execute("SELECT COALESCE(MAX(line_id), 0) FROM transaction_lines").fetchone()[0]
+
+    def iterDayParties(self, day, lastLineId=None):
+        """
+        Listing the customers and suppliers of one day with their number of invoice
+        lines, ordered by kind, party and phone, without reading the lines themselves.
+
+        · Parameters:
+            day (str): The day, "YYYY-MM-DD".
+            lastLineId (int): Optional ID of the last line counted (see getLastLineId).
+        · Returns:
+            generator: Yields (kind, party, phone, lineCount) tuples.
+        """
+        query = "SELECT kind, party, phone, COUNT(*) FROM transaction_lines WHERE day = ?"
+        parameters = [day]
+        if lastLineId is not None:
+            query += " AND line_id <= ?"
+            parameters.append(lastLineId)
+        with self.lock:
+            cursor = self.connection.execute(query + " GROUP BY kind, party, phone ORDER BY kind, party, phone", parameters)
+        while True:
+            with self.lock:
+                rows = cursor.fetchmany(ARCHIVE_FETCH_SIZE)
+            if not rows:
+                break
+            for row in rows:
+                yield row
+
+    def iterPartyLines(self, day, kind, firstParty, lastParty, lastLineId=None):
+        """
+        Streaming the invoice lines of one day for a range of customers or suppliers
+        (through the kind/party index), ordered by party and phone and, within each,
+        in the order they were recorded.
+
+        · Parameters:
+            day (str): The day, "YYYY-MM-DD".
+            kind (str): "SALE" or "RESTOCK".
+            firstParty (str): The first customer/supplier name included.
+            lastParty (str): The last customer/supplier name included.
+            lastLineId (int): Optional ID of the last line read (see getLastLineId).
+        · Returns:
+            generator: Yields (party, phone, invoice, timestamp, name, brand, quantity,
+                       paidQuantity, unitPrice, amount) tuples.
+        """
+        query = "SELECT party, phone, invoice, timestamp, name, brand, quantity, paid_quantity, unit_price, amount FROM transaction_lines WHERE kind = ? AND party BETWEEN ? AND ? AND day = ?"
+        parameters = [kind, firstParty, lastParty, day]
+        if lastLineId is not None:
+            query += " AND line_id <= ?"
+            parameters.append(lastLineId)
+        with self.lock:
+            cursor = self.connection.execute(query + " ORDER BY party, phone, line_id", parameters)
+        while True:
+            with self.lock:
+                rows = cursor.fetchmany(ARCHIVE_FETCH_SIZE)
+            if not rows:
+                break
+            for row in rows:
+                yield row
+
+    def close(self):
+        """
+        Closing the database.
+        """
+        with self.lock:
+            self.connection.close()
+
+# Function for printing a report from the archive.
+def printReport(salesArchive, groupBy, fromDate=None, toDate=None, kind="SALE", productId=None, party=None):
+    """
+    Main Function
+    Printing a units/revenue/margin report from the sales archive as a table,
+    with the time the query took.
+
+    · Parameters:
+        salesArchive (SalesArchive): The archive to read.
+        groupBy, fromDate, toDate, kind, productId, party: See SalesArchive.report.
+    · Returns:
+        None: This function only prints to the console.
+    """
+    start = time.perf_counter()
+    rows = salesArchive.report(groupBy, fromDate, toDate, kind, productId, party)
+    elapsed = (time.perf_counter() - start) * 1000
+    valueLabel = "Revenue" if kind == "SALE" else "Spent"
+    print("\n" + "=" * 90)
+    print(groupBy.capitalize() + "\t\t\tUnits\tPaid\t" + valueLabel + "\tCost\tMargin")
+    print("-" * 90)
+    for group, units, paidUnits, revenue, cost, margin in rows:
+        print(str(group) + "\t\t\t" + str(units) + "\t" + str(paidUnits) + "\t" + str(revenue) + "\t" + str(cost) + "\t" + str(margin))
+    print("=" * 90)
+    print(str(len(rows)) + " rows in " + str(round(elapsed, 1)) + " ms")
+
+# Main Program Execution Block
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sales and restock reports from the WeCare sales archive")
+    parser.add_argument("--archive", default=ARCHIVE_FILE, help="archive database file")
+    parser.add_argument("--by", default="product", choices=sorted(REPORT_GROUPS), help="what to group the report by")
+    parser.add_argument("--from", dest="fromDate", help="first day, YYYY-MM-DD")
+    parser.add_argument("--to", dest="toDate", help="last day, YYYY-MM-DD")
+    parser.add_argument("--kind", default="SALE", choices=["SALE", "RESTOCK"], help="sales or restocks")
+    parser.add_argument("--product", type=int, help="only this product ID")
+    parser.add_argument("--party", help="only this customer (sales) or supplier (restocks)")
+    options = parser.parse_args()
+    salesArchive = SalesArchive(options.archive)
+    printReport(salesArchive, options.by, options.fromDate, options.toDate, options.kind, options.product, options.party)
+    salesArchive.close()
@@ -0,0 +1,243 @@
+# importing modules
+import argparse
+import atexit
+import csv
+import os
+import sys
+import time
+
+# importing user made modules
+from read import readProductFile
+from write import InvoiceWriter
+from engine import Inventory, InventoryError, notifyRecorders
+from archive import SalesArchive
+from aggregates import RunningTotals
+from pricing import PricingEngine, PRICING_FILE
+from locations import claimLocation, releaseLocation
+
+# Most carts whose recorder calls are held back before the stock changes are committed
+BATCH_COMMIT_CARTS = 1000
+
+# Class for holding the recorder calls of a batch back until its stock is saved.
+class DeferredRecorder:
+    """
+    Helper Class
+    A recorder that only remembers the sales and restocks it is told about, and
+    passes them on to the real recorders (e.g., SalesArchive, RunningTotals) when
+    flush() is called, once the stock changes of those carts are committed. So a
+    failed commit leaves no archive rows or totals for stock that was never saved.
+    """
+
+    def __init__(self, recorders):
+        self.recorders = recorders
+        self.calls = [] # (method name, arguments) in the order the carts were applied
+
+    def recordSale(self, *arguments):
+        self.calls.append(("recordSale", arguments))
+
+    def recordRestock(self, *arguments):
+        self.calls.append(("recordRestock", arguments))
+
+    def flush(self):
+        """
+        Passing the remembered transactions on to the recorders.
+        """
+        for methodName, arguments in self.calls:
+            notifyRecorders(self.recorders, methodName, *arguments)
+        self.calls = []
+
+# Helper Function for committing the carts of a batch applied so far.
+def commitCarts(inventory, deferredRecorder):
+    """
+    Helper Function
+    Committing the stock changes kept back since the last commit, then passing the
+    carts on to the recorders.
+
+    · Parameters:
+        inventory (Inventory): The inventory of the batch (autoCommit off).
+        deferredRecorder (DeferredRecorder): The recorder holding the carts back.
+    · Returns:
+        bool: True if committed, False if the inventory file could not be updated
+              (the held-back carts are then not recorded).
+    · Raises:
+        (Prints a warning if the commit fails.)
+    """
+    if not inventory.commit():
+        print("Warning: Invoices generated, but inventory file update failed! The last " + str(len(deferredRecorder.calls)) + " carts are not saved or recorded, the rest of the batch was not applied.")
+        return False
+    deferredRecorder.flush()
+    return True
+
+# Helper Function for reading the transaction groups of a batch file.
+def readBatchGroups(csvFile, kind):
+    """
+    Helper Function
+    Streaming the lines of a batch CSV file and grouping consecutive lines of the
+    same customer/supplier into one cart, so only one cart is held in memory at a time.
+    Sales files have the columns: customer, phone, product ID, quantity.
+    Restock files have the columns: supplier, phone, product ID, quantity, cost price.
+    A first line whose product ID column is not a number is treated as a header.
+
+    · Parameters:
+        csvFile (file): The open CSV file.
+        kind (str): "sales" or "restock".
+    · Returns:
+        generator: Yields (partyName, partyPhone, lines, lineNumbers, errors) per cart, where
+                   lines are (productId, quantity[, costPrice]) tuples, lineNumbers are the
+                   file line numbers of those lines and errors lists (lineNumber, row, message)
+                   for rows that could not be parsed.
+    · Raises:
+        (Rows that cannot be parsed are reported in errors instead of raising.)
+    """
+    columnCount = 4 if kind == "sales" else 5
+    currentParty = None
+    lines = []
+    lineNumbers = []
+    errors = []
+    for lineNumber, row in enumerate(csv.reader(csvFile), start=1):
+        if not row or not "".join(row).strip():
+            continue # Skipping empty lines
+        if lineNumber == 1 and len(row) > 2 and not row[2].strip().isdigit():
+            continue # Skipping the header
+        party = (row[0].strip(), row[1].strip() if len(row) > 1 else "")
+        if party != currentParty and currentParty is not None and (lines or errors):
+            yield currentParty[0], currentParty[1], lines, lineNumbers, errors
+            lines, lineNumbers, errors = [], [], []
+        currentParty = party
+        try:
+            if len(row) < columnCount:
+                raise ValueError("expected " + str(columnCount) + " columns")
+            values = tuple(int(value) for value in row[2:columnCount])
+            lines.append(values)
+            lineNumbers.append(lineNumber)
+        except ValueError as e:
+            errors.append((lineNumber, row, "Invalid line: " + str(e)))
+    if currentParty is not None and (lines or errors):
+        yield currentParty[0], currentParty[1], lines, lineNumbers, errors
+
+# Function for applying a whole batch file of sales or restocks.
+def runBatch(kind, csvFileName, productFileName, rejectFileName=None, recorders=None, pricingEngine=None):
+    """
+    Main Function
+    Applying a CSV file of sales or restock lines without any prompts, e.g. for the
+    end-of-day reconciliation of POS exports.
+    Consecutive lines of the same customer/supplier form one cart. Each cart is
+    checked as a whole (stock, product IDs, the 999 restock limit) with the same
+    rules as the menus, including the prices and free items of the pricing engine
+    (by default "buy 3 get 1 free"), and gets its own invoice,
+    written in batches by the background InvoiceWriter (see invoices/<date>/).
+    Rejected carts are written to a reject file with the reason. The inventory is
+    committed once every BATCH_COMMIT_CARTS carts and at the end of the batch,
+    instead of once per cart, and the recorders are told about the carts only
+    once their stock is committed. If a commit fails the rest of the batch is
+    not applied.
+
+    · Parameters:
+        kind (str): "sales" or "restock".
+        csvFileName (str): The CSV file to read.
+        productFileName (str): The product file to update (e.g., "products.txt").
+        rejectFileName (str): Where rejected lines are written; defaults to
+                              "<csvFileName>.rejected.csv".
+        recorders (list): Optional recorders (e.g., SalesArchive) told about every
+                          accepted cart, see notifyRecorders in engine.py. The
+                          running totals of the product file are always updated.
+        pricingEngine (PricingEngine): Optional pricing rules, see pricing.py.
+    · Returns:
+        dict: Counts of lines, accepted and rejected lines, invoices, and lines/sec.
+    · Raises:
+        (Prints error messages to the console for file errors instead of raising.)
+    · Example (Only for demonstration purposes):
+        python batch.py sales pos_export.csv
+        python batch.py restock deliveries.csv --file products.txt
+    """
+    if rejectFileName is None:
+        rejectFileName = csvFileName + ".rejected.csv"
+    summary = {"lines": 0, "accepted": 0, "rejected": 0, "invoices": 0, "linesPerSecond": 0.0}
+    productDataDict = readProductFile(productFileName)
+    if not productDataDict:
+        print("Inventory is empty. Batch not applied.")
+        return summary
+
+    start = time.perf_counter()
+    try:
+        csvFile = open(csvFileName, "r", newline="")
+        rejectFile = open(rejectFileName, "w", newline="")
+    except Exception as e:
+        print("Error opening batch files: " + str(e))
+        return summary
+    # keeping the running totals of the product file up to date as well (see aggregates.py)
+    runningTotals = RunningTotals.load(productFileName, productDataDict, pricingEngine)
+    runningTotals.autoSave = False # Saved once, with the inventory, at the end of the batch
+    deferredRecorder = DeferredRecorder(list(recorders or []) + [runningTotals])
+    rejectWriter = csv.writer(rejectFile)
+    invoiceWriter = InvoiceWriter()
+    # the stock changes of the carts are kept back and committed together, see commitCarts
+    inventory = Inventory(productDataDict, productFileName, pricingEngine, [deferredRecorder], invoiceWriter, autoCommit=False)
+
+    committed = True
+    try:
+        for partyName, partyPhone, lines, lineNumbers, errors in readBatchGroups(csvFile, kind):
+            summary["lines"] += len(lines) + len(errors)
+            for lineNumber, row, message in errors:
+                rejectWriter.writerow([lineNumber] + row + [message])
+            summary["rejected"] += len(errors)
+            if not lines:
+                continue
+            try:
+                if kind == "sales":
+                    inventory.sell(partyName, partyPhone, lines)
+                else:
+                    inventory.restock(partyName, partyPhone, lines)
+            except InventoryError as e:
+                # Rejecting the whole cart, nothing of it was applied
+                for lineNumber, line in zip(lineNumbers, lines):
+                    rejectWriter.writerow([lineNumber, partyName, partyPhone] + list(line) + [str(e)])
+                summary["rejected"] += len(lines)
+                continue
+            summary["accepted"] += len(lines)
+            summary["invoices"] += 1
+            if len(deferredRecorder.calls) >= BATCH_COMMIT_CARTS:
+                committed = commitCarts(inventory, deferredRecorder)
+                if not committed:
+                    break
+    finally:
+        csvFile.close()
+        rejectFile.close()
+        # Writing the invoices still waiting in the background
+        if not invoiceWriter.close():
+            print("Warning: " + str(len(invoiceWriter.failedInvoices)) + " invoice(s) of this batch are missing, see the errors above.")
+
+    # Committing the stock changes of the last carts
+    if committed:
+        commitCarts(inventory, deferredRecorder)
+    # The totals were only told about committed carts, so they match the saved stock
+    runningTotals.save()
+    elapsed = time.perf_counter() - start
+    if elapsed > 0:
+        summary["linesPerSecond"] = summary["lines"] / elapsed
+    print("Batch '" + csvFileName + "': " + str(summary["lines"]) + " lines, " + str(summary["accepted"]) + " accepted, " + str(summary["rejected"]) + " rejected, " + str(summary["invoices"]) + " invoices in " + str(round(elapsed, 2)) + " s (" + str(round(summary["linesPerSecond"])) + " lines/sec)")
+    if summary["rejected"]:
+        print("Rejected lines written to '" + rejectFileName + "'.")
+    else:
+        os.remove(rejectFileName) # Not keeping an empty reject file
+    return summary
+
+# Main Program Execution Block
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Apply a CSV file of sales or restock lines to the WeCare inventory")
+    parser.add_argument("kind", choices=["sales", "restock"], help="type of lines in the CSV file")
+    parser.add_argument("csvFile", help="CSV file: customer,phone,product ID,quantity (sales) or supplier,phone,product ID,quantity,cost price (restock)")
+    parser.add_argument("--file", default="products.txt", help="product file to update")
+    parser.add_argument("--rejects", help="file for rejected lines (default: <csvFile>.rejected.csv)")
+    parser.add_argument("--archive", default="sales.db", help="sales archive the accepted lines are recorded in")
+    parser.add_argument("--pricing", default=PRICING_FILE, help="pricing rules (markups, bundles, promotions)")
+    parser.add_argument("--force", action="store_true", help="update the product file even if a terminal seems to be selling from it")
+    options = parser.parse_args()
+    # only one process may write a product file, e.g. a location's shard a terminal sells from (see locations.py)
+    if not claimLocation(options.file, options.force):
+        print("Another program seems to be using '" + options.file + "' (see '" + options.file + ".owner'). Run the batch when it has stopped, or use --force if it is no longer running.")
+        sys.exit(1)
+    atexit.register(releaseLocation, options.file)
+    salesArchive = SalesArchive(options.archive)
+    runBatch(options.kind, options.csvFile, options.file, options.rejects, [salesArchive], PricingEngine.load(options.pricing))
+    salesArchive.close()
@@ -0,0 +1,336 @@
+# importing modules
+import argparse
+import builtins
+import collections
+import json
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+# importing user made modules
+from read import readProductFile, getJournalFileName, getCompactingJournalFileName
+from write import writeProductsToFile, appendJournalRecord, InvoiceWriter
+from operations import sellProducts, restockProducts
+from engine import Inventory
+from display import ProductTableView
+
+# Default catalogue sizes, from 1 thousand to 5 million products
+DEFAULT_SIZES = "1k,10k,100k,1M,5M"
+# Default file the results are written to
+RESULTS_FILE = "benchmark_results.json"
+
+# Words the synthetic products are made of
+PRODUCT_WORDS = ["Aloe", "Vera", "Gel", "Night", "Day", "Cream", "Serum", "Face", "Wash", "Body", "Lotion", "Sunscreen", "Toner", "Retinol", "Vitamin", "Moisturizer", "Cleanser", "Mask", "Scrub", "Balm"]
+BRAND_NAMES = ["Cetaphil", "Himalaya", "Garnier", "Aqualogica", "Biossance", "SoftGlow", "FreshSkin", "ClearLook", "CoolTouch", "Nivea"]
+ORIGIN_NAMES = ["Nepal", "India", "USA", "France", "Korea", "Japan", "Switzerland", "Australia"]
+
+# Class for a synthetic catalogue that is generated while it is written.
+class SyntheticProducts:
+    """
+    Helper Class
+    A catalogue of random products that is generated while it is being written, so
+    writeProductsToFile can write millions of products without holding them in memory.
+    The same size and seed always give the same catalogue.
+
+    · Example (Only for demonstration purposes):
+        writeProductsToFile("products.txt", SyntheticProducts(1000000))
+    """
+
+    def __init__(self, rowCount, seed=1):
+        self.rowCount = rowCount
+        self.seed = seed
+
+    def __len__(self):
+        return self.rowCount
+
+    def items(self):
+        randomizer = random.Random(self.seed)
+        for row in range(self.rowCount):
+            name = randomizer.choice(PRODUCT_WORDS) + " " + randomizer.choice(PRODUCT_WORDS) + " " + str(row % 97)
+            yield row + 1, [name, randomizer.choice(BRAND_NAMES), randomizer.randint(1000, 5000), randomizer.randint(50, 2000), randomizer.choice(ORIGIN_NAMES)]
+
+# Helper Function for parsing a catalogue size such as "10k" or "5M".
+def parseSize(text):
+    """
+    Helper Function
+    Converting a catalogue size with an optional k (thousand) or M (million) suffix.
+
+    · Parameters:
+        text (str): The size, e.g. "1000", "10k" or "5M".
+    · Returns:
+        int: The number of products.
+    · Raises:
+        ValueError: If the size is not a number.
+    """
+    text = text.strip()
+    multipliers = {"k": 1000, "K": 1000, "m": 1000000, "M": 1000000}
+    if text and text[-1] in multipliers:
+        return int(float(text[:-1]) * multipliers[text[-1]])
+    return int(text)
+
+# Helper Function for reading a percentile from a list of timings.
+def percentile(values, fraction):
+    """
+    Helper Function
+    Getting the value below which the given fraction of the values lie.
+
+    · Parameters:
+        values (list): The measured values.
+        fraction (float): The fraction, e.g. 0.5 for the median or 0.99.
+    · Returns:
+        float: The percentile, or 0.0 if there are no values.
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+# Class for answering input() prompts from a script.
+class ScriptedInput:
+    """
+    Helper Class
+    Standing in for the builtin input() while a benchmark runs, answering the
+    prompts of sellProducts/restockProducts from a queue of prepared answers, so
+    the menus can be timed without anyone typing.
+
+    · Example (Only for demonstration purposes):
+        scriptedInput = ScriptedInput()
+        scriptedInput.answers.extend(["Bench", "9800000000", "", "1", "3", "n"])
+        builtins.input = scriptedInput
+    """
+
+    def __init__(self):
+        self.answers = collections.deque()
+
+    def __call__(self, prompt=""):
+        if not self.answers:
+            raise RuntimeError("The benchmark script has no answer for the prompt: " + prompt)
+        return self.answers.popleft()
+
+# Helper Function for the answers of one scripted checkout.
+def scriptCheckout(randomizer, inventory, lineCount):
+    """
+    Helper Function
+    Building the answers sellProducts asks for when selling one cart: customer,
+    phone, the table page (Enter), then for each line the product ID, the quantity
+    and whether to add another product.
+    Only products with stock left for the cart are picked, as no quantity is asked
+    for an out-of-stock product.
+
+    · Parameters:
+        randomizer (random.Random): Picks the products and quantities.
+        inventory (Inventory): The inventory engine, for the products and their stock.
+        lineCount (int): The number of cart lines.
+    · Returns:
+        list: The answers, in the order they are asked for.
+    """
+    productCount = len(inventory.products)
+    answers = ["Bench Customer", "9800000000", ""]
+    plannedQuantities = {} # Product ID -> units paid for in this cart so far
+    for line in range(lineCount):
+        for attempt in range(100):
+            productId = randomizer.randint(1, productCount)
+            held = inventory.quoteSaleItem(productId, plannedQuantities[productId])["totalQty"] if productId in plannedQuantities else 0
+            if inventory.products[productId][2] - inventory.reservations.heldByOthers(productId) - held > 0:
+                break
+        else:
+            break # Everything picked is sold out, checking out what is in the cart
+        quantityToBuy = randomizer.randint(1, 3)
+        if inventory.quoteSaleItem(productId, plannedQuantities.get(productId, 0) + quantityToBuy)["totalQty"] <= inventory.products[productId][2]:
+            plannedQuantities[productId] = plannedQuantities.get(productId, 0) + quantityToBuy
+        answers.extend([str(productId), str(quantityToBuy), "y"])
+    if answers[-1] == "y":
+        answers[-1] = "n"
+    return answers
+
+# Helper Function for the answers of one scripted restock order.
+def scriptRestock(randomizer, inventory, lineCount):
+    """
+    Helper Function
+    Building the answers restockProducts asks for when restocking one order:
+    supplier, phone, then for each line the table page (Enter), the product ID, the
+    quantity, the new cost price and whether to add another product.
+
+    · Parameters:
+        randomizer (random.Random): Picks the products, quantities and prices.
+        inventory (Inventory): The inventory engine, for the number of products (IDs 1..count).
+        lineCount (int): The number of order lines.
+    · Returns:
+        list: The answers, in the order they are asked for.
+    """
+    productCount = len(inventory.products)
+    answers = ["Bench Supplier", "9800000001"]
+    for line in range(lineCount):
+        answers.extend(["", str(randomizer.randint(1, productCount)), str(randomizer.randint(10, 100)), str(randomizer.randint(50, 2000))])
+        answers.append("y" if line < lineCount - 1 else "n")
+    return answers
+
+# Helper Function for timing scripted transactions.
+def timeTransactions(transaction, scriptFunction, inventory, productView, count, seed):
+    """
+    Helper Function
+    Running a menu transaction (sellProducts or restockProducts) a number of times
+    with scripted answers and console output thrown away, timing each one from the
+    first prompt to the inventory commit.
+
+    · Parameters:
+        transaction (function): sellProducts or restockProducts.
+        scriptFunction (function): scriptCheckout or scriptRestock.
+        inventory (Inventory): The inventory engine over the loaded products.
+        productView (ProductTableView): The table view shared by the transactions.
+        count (int): The number of transactions.
+        seed (int): Seed for the scripted answers.
+    · Returns:
+        list: The time of each transaction in milliseconds.
+    """
+    randomizer = random.Random(seed)
+    scriptedInput = ScriptedInput()
+    timings = []
+    originalInput = builtins.input
+    originalStdout = sys.stdout
+    builtins.input = scriptedInput
+    sys.stdout = open(os.devnull, "w")
+    try:
+        for run in range(count):
+            scriptedInput.answers.extend(scriptFunction(randomizer, inventory, randomizer.randint(1, 5)))
+            start = time.perf_counter()
+            transaction(inventory, productView)
+            timings.append((time.perf_counter() - start) * 1000)
+            if scriptedInput.answers:
+                raise RuntimeError("The benchmark script is out of step with the prompts of " + transaction.__name__ + ".")
+    finally:
+        sys.stdout.close()
+        sys.stdout = originalStdout
+        builtins.input = originalInput
+    return timings
+
+# Function for benchmarking one catalogue size.
+def benchmarkSize(rowCount, checkouts, restocks, lazy=False, measureMemory=True):
+    """
+    Main Function
+    Generating a synthetic products.txt of the given size in a temporary directory
+    and measuring:
+    - load time (and peak memory of the load, traced with tracemalloc), parsing the
+      file and from the parsed snapshot cache,
+    - p50/p99 latency of scripted checkouts and restock orders through the menus,
+      including the journal commit and queueing the invoice,
+    - persistence cost: one journal append and one full snapshot.
+    The temporary directory is removed afterwards.
+
+    · Parameters:
+        rowCount (int): The number of products.
+        checkouts (int): The number of checkouts to time.
+        restocks (int): The number of restock orders to time.
+        lazy (bool): If True, the catalogue is loaded with lazy parsing.
+        measureMemory (bool): If True, the catalogue is loaded a second time with
+                              tracemalloc to measure the peak memory of the load.
+    · Returns:
+        dict: The measurements of this size.
+    """
+    workDirectory = tempfile.mkdtemp(prefix="wecare_benchmark_")
+    originalDirectory = os.getcwd()
+    os.chdir(workDirectory) # Invoices are written into the working directory
+    try:
+        productFileName = os.path.join(workDirectory, "products.txt")
+        start = time.perf_counter()
+        writeProductsToFile(productFileName, SyntheticProducts(rowCount))
+        generateSeconds = time.perf_counter() - start
+
+        result = {"rows": rowCount, "lazy": lazy, "fileMb": os.path.getsize(productFileName) / (1024 * 1024), "generateSeconds": generateSeconds}
+        start = time.perf_counter()
+        productDataDict = readProductFile(productFileName, lazy=lazy, useCache=False)
+        result["loadSeconds"] = time.perf_counter() - start
+        if not lazy:
+            del productDataDict
+            start = time.perf_counter()
+            productDataDict = readProductFile(productFileName) # Written by the load above
+            result["cachedLoadSeconds"] = time.perf_counter() - start
+        if measureMemory:
+            del productDataDict
+            tracemalloc.start()
+            productDataDict = readProductFile(productFileName, lazy=lazy, useCache=False)
+            result["loadPeakMb"] = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+            tracemalloc.stop()
+
+        productView = ProductTableView(productDataDict)
+        invoiceWriter = InvoiceWriter()
+        inventory = Inventory(productDataDict, productFileName, invoiceWriter=invoiceWriter)
+        checkoutTimes = timeTransactions(sellProducts, scriptCheckout, inventory, productView, checkouts, 1)
+        restockTimes = timeTransactions(restockProducts, scriptRestock, inventory, productView, restocks, 2)
+        invoiceWriter.close()
+        while os.path.exists(getCompactingJournalFileName(getJournalFileName(productFileName))):
+            time.sleep(0.05) # Letting a background compaction finish before the snapshot is timed
+        result["checkoutP50Ms"] = percentile(checkoutTimes, 0.5)
+        result["checkoutP99Ms"] = percentile(checkoutTimes, 0.99)
+        result["restockP50Ms"] = percentile(restockTimes, 0.5)
+        result["restockP99Ms"] = percentile(restockTimes, 0.99)
+
+        start = time.perf_counter()
+        appendJournalRecord(getJournalFileName(productFileName), productDataDict, [1])
+        result["journalAppendMs"] = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        writeProductsToFile(productFileName, productDataDict)
+        result["snapshotSeconds"] = time.perf_counter() - start
+        return result
+    finally:
+        os.chdir(originalDirectory)
+        shutil.rmtree(workDirectory, ignore_errors=True)
+
+# Function for comparing two result files.
+def compareResults(previousResults, currentResults):
+    """
+    Main Function
+    Printing how each measurement changed compared to an earlier run, for the
+    catalogue sizes both runs measured. Times going up by more than 10% are marked.
+
+    · Parameters:
+        previousResults (dict): The contents of an earlier results file.
+        currentResults (dict): The contents of the new results file.
+    · Returns:
+        None: This function only prints to the console.
+    """
+    previousBySize = dict((result["rows"], result) for result in previousResults["results"])
+    print("\nCompared with '" + previousResults.get("label", "") + "' (" + previousResults.get("date", "") + "):")
+    for result in currentResults["results"]:
+        previous = previousBySize.get(result["rows"])
+        if previous is None:
+            continue
+        for key in ("loadSeconds", "cachedLoadSeconds", "loadPeakMb", "checkoutP50Ms", "checkoutP99Ms", "restockP50Ms", "restockP99Ms", "journalAppendMs", "snapshotSeconds"):
+            if key in result and previous.get(key):
+                change = (result[key] - previous[key]) / previous[key] * 100
+                marker = "  <-- slower" if change > 10 else ""
+                print(str(result["rows"]) + "\t" + key + "\t" + str(round(previous[key], 3)) + " -> " + str(round(result[key], 3)) + " (" + ("+" if change >= 0 else "") + str(round(change, 1)) + "%)" + marker)
+
+# Main Program Execution Block
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the load, checkout, restock and persistence paths of the WeCare inventory")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="comma-separated catalogue sizes, k and M suffixes allowed (e.g. 1k,100k,5M)")
+    parser.add_argument("--checkouts", type=int, default=200, help="scripted checkouts timed per size")
+    parser.add_argument("--restocks", type=int, default=50, help="scripted restock orders timed per size")
+    parser.add_argument("--lazy", action="store_true", help="load the catalogues with lazy parsing")
+    parser.add_argument("--no-memory", dest="memory", action="store_false", help="skip the second, traced load that measures peak memory")
+    parser.add_argument("--label", default="", help="name of this run, e.g. a version or commit")
+    parser.add_argument("--output", default=RESULTS_FILE, help="JSON file the results are written to")
+    parser.add_argument("--compare", help="earlier results file to compare with")
+    options = parser.parse_args()
+
+    results = {"label": options.label, "date": datetime.now().isoformat(" ", "seconds"), "python": platform.python_version(), "platform": platform.platform(), "results": []}
+    print("Rows\t\tLoad s\tCached s\tPeak MB\tCheckout p50/p99 ms\tRestock p50/p99 ms\tJournal ms\tSnapshot s")
+    for size in options.sizes.split(","):
+        result = benchmarkSize(parseSize(size), options.checkouts, options.restocks, options.lazy, options.memory)
+        results["results"].append(result)
+        print(str(result["rows"]) + "\t\t" + str(round(result["loadSeconds"], 3)) + "\t" + str(round(result.get("cachedLoadSeconds", 0), 3)) + "\t\t" + str(round(result.get("loadPeakMb", 0), 1)) + "\t" + str(round(result["checkoutP50Ms"], 2)) + " / " + str(round(result["checkoutP99Ms"], 2)) + "\t\t" + str(round(result["restockP50Ms"], 2)) + " / " + str(round(result["restockP99Ms"], 2)) + "\t\t" + str(round(result["journalAppendMs"], 2)) + "\t\t" + str(round(result["snapshotSeconds"], 3)))
+    resultsFile = open(options.output, "w")
+    json.dump(results, resultsFile, indent=2)
+    resultsFile.close()
+    print("Results written to '" + options.output + "'.")
+    if options.compare:
+        previousFile = open(options.compare, "r")
+        compareResults(json.load(previousFile), results)
+        previousFile.close()
@@ -0,0 +1,267 @@
+# importing modules
+
+# Importing mmap for mapping the binary inventory file into memory
+import mmap
+# Importing os for flushing files to disk and atomic renames
+import os
+# Importing struct for packing and unpacking the fixed-width records
+import struct
+
+# NumPy is optional, it only speeds up whole-catalogue calculations
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# importing user made modules
+from store import ProductStore, StringPool
+
+# Binary File Layout
+#   Header : magic (8 bytes), record count (uint64), string table offset (uint64)
+#   Records: one fixed-width record per product, see RECORD_FORMAT
+#   Strings: the name, brand and origin pools, each as a count (uint32) followed by
+#            length-prefixed (uint32) UTF-8 strings
+BINARY_MAGIC = b"WECAREB1"
+HEADER_FORMAT = "<8sQQ"
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+# Product ID, name code, brand code, origin code, quantity, cost price
+RECORD_FORMAT = "<qiiiqq"
+RECORD_SIZE = struct.calcsize(RECORD_FORMAT)
+# Byte position and format of each field inside a record
+FIELD_ID = (0, "<q")
+FIELD_NAME = (8, "<i")
+FIELD_BRAND = (12, "<i")
+FIELD_ORIGIN = (16, "<i")
+FIELD_QUANTITY = (20, "<q")
+FIELD_COST = (28, "<q")
+
+# Helper Function for checking if a file name refers to the binary inventory format.
+def isBinaryProductFile(fileName):
+    """
+    Helper Function
+    Checking if a product file uses the binary format, based on its ".bin" extension.
+
+    · Parameters:
+        fileName (str): The name of the product file.
+    · Returns:
+        bool: True for binary product files (e.g., "products.bin"), False otherwise.
+    · Raises:
+        Nothing
+    """
+    return fileName.lower().endswith(".bin")
+
+# Class for reading and writing one field of every record directly in the mapped file.
+class MappedColumn:
+    """
+    Helper Class
+    A column of a BinaryProductStore that reads and writes one field of every
+    fixed-width record directly in the memory-mapped file, without copying it.
+    Setting a value only writes the bytes of that one field.
+    """
+
+    def __init__(self, mappedFile, recordCount, field, readOnly=False):
+        self.mappedFile = mappedFile
+        self.recordCount = recordCount
+        self.fieldOffset, self.fieldFormat = field
+        self.readOnly = readOnly
+
+    def __getitem__(self, row):
+        return struct.unpack_from(self.fieldFormat, self.mappedFile, HEADER_SIZE + row * RECORD_SIZE + self.fieldOffset)[0]
+
+    def __setitem__(self, row, value):
+        if self.readOnly:
+            raise TypeError("This field cannot be changed in a binary product file. Convert it to text, edit it and convert it back.")
+        struct.pack_into(self.fieldFormat, self.mappedFile, HEADER_SIZE + row * RECORD_SIZE + self.fieldOffset, value)
+
+    def __len__(self):
+        return self.recordCount
+
+    def __iter__(self):
+        for row in range(self.recordCount):
+            yield self[row]
+
+# Class for a product store that lives in a memory-mapped binary inventory file.
+class BinaryProductStore(ProductStore):
+    """
+    Main Class
+    A ProductStore whose columns are views on a memory-mapped binary inventory file.
+    Loading only builds the product ID lookup and the string pools; quantities and
+    cost prices stay in the file and are updated in place, so a sale or restock
+    writes just the quantity/cost bytes of the touched records.
+    Adding or removing products, or changing names, brands or origins, is not
+    possible in place; convert the file to text, edit it and convert it back.
+    """
+
+    def __init__(self, fileName, file, mappedFile, recordCount, namePool, brandPool, originPool):
+        ProductStore.__init__(self)
+        self.fileName = fileName
+        self.file = file
+        self.mappedFile = mappedFile
+        self.ids = MappedColumn(mappedFile, recordCount, FIELD_ID, readOnly=True)
+        self.names = MappedColumn(mappedFile, recordCount, FIELD_NAME, readOnly=True)
+        self.brands = MappedColumn(mappedFile, recordCount, FIELD_BRAND, readOnly=True)
+        self.origins = MappedColumn(mappedFile, recordCount, FIELD_ORIGIN, readOnly=True)
+        self.quantities = MappedColumn(mappedFile, recordCount, FIELD_QUANTITY)
+        self.costs = MappedColumn(mappedFile, recordCount, FIELD_COST)
+        self.namePool = namePool
+        self.brandPool = brandPool
+        self.originPool = originPool
+        for row, productId in enumerate(self.ids):
+            self.rowById[productId] = row
+
+    def __setitem__(self, productId, details):
+        if productId not in self.rowById:
+            raise TypeError("Products cannot be added to a binary product file in place.")
+        ProductStore.__setitem__(self, productId, details)
+
+    def __delitem__(self, productId):
+        raise TypeError("Products cannot be removed from a binary product file in place.")
+
+    def __repr__(self):
+        return "BinaryProductStore(" + self.fileName + ", " + str(len(self)) + " products)"
+
+    def totalStockValue(self, priceMultiplier=1):
+        """
+        Calculating the value of all stock at cost price (or at a multiple of it)
+        straight from the mapped records. With NumPy, the quantity and cost fields
+        are read as strided views on the file without copying.
+
+        · Parameters:
+            priceMultiplier (int): The factor applied to the cost price.
+        · Returns:
+            int: The sum of quantity * cost price * priceMultiplier over all products.
+        """
+        recordCount = len(self)
+        if numpy is not None and recordCount:
+            quantities = numpy.ndarray((recordCount,), dtype="<i8", buffer=self.mappedFile, offset=HEADER_SIZE + FIELD_QUANTITY[0], strides=(RECORD_SIZE,))
+            costs = numpy.ndarray((recordCount,), dtype="<i8", buffer=self.mappedFile, offset=HEADER_SIZE + FIELD_COST[0], strides=(RECORD_SIZE,))
+            return int(numpy.dot(quantities, costs)) * priceMultiplier
+        return ProductStore.totalStockValue(self, priceMultiplier)
+
+    def flushChanges(self, changedIds=None):
+        """
+        Making the in-place changes permanent by flushing the mapped file to disk.
+        Only the pages that were written to (the touched records) are written out.
+
+        · Parameters:
+            changedIds (iterable): The product IDs touched by the cart (for callers
+                                   that record changes per product; not needed here).
+        · Returns:
+            bool: True if the changes were flushed, False otherwise.
+        · Raises:
+            (Prints error messages to the console instead of raising, returns False.)
+        """
+        try:
+            self.mappedFile.flush()
+            return True
+        except Exception as e:
+            print("Error flushing binary product file '" + self.fileName + "': " + str(e))
+            return False
+
+    def close(self):
+        """
+        Flushing and unmapping the file.
+        """
+        self.flushChanges()
+        self.mappedFile.close()
+        self.file.close()
+
+# Helper Function for reading one string pool from the string table.
+def readStringPool(mappedFile, offset):
+    """
+    Helper Function
+    Reading one string pool (count followed by length-prefixed UTF-8 strings)
+    from the string table of a binary product file.
+
+    · Parameters:
+        mappedFile (mmap): The mapped binary product file.
+        offset (int): The byte position where the pool starts.
+    · Returns:
+        tuple: (StringPool, int) the pool and the byte position after it.
+    · Raises:
+        struct.error, UnicodeDecodeError: If the string table is damaged.
+    """
+    pool = StringPool()
+    (count,) = struct.unpack_from("<I", mappedFile, offset)
+    offset += 4
+    for index in range(count):
+        (length,) = struct.unpack_from("<I", mappedFile, offset)
+        offset += 4
+        pool.encode(bytes(mappedFile[offset:offset + length]).decode("utf-8"))
+        offset += length
+    return pool, offset
+
+# Helper Function for opening a binary product file.
+def openBinaryProductFile(fileName):
+    """
+    Helper Function
+    Memory-mapping a binary product file for reading and in-place updates.
+
+    · Parameters:
+        fileName (str): The name of the binary product file (e.g., "products.bin").
+    · Returns:
+        BinaryProductStore: The products, used like the product dictionary.
+    · Raises:
+        ValueError: If the file is not a WeCare binary product file or is damaged.
+        OSError: If the file cannot be opened or mapped.
+    """
+    file = open(fileName, "r+b")
+    try:
+        mappedFile = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_WRITE)
+    except Exception:
+        file.close()
+        raise
+    try:
+        magic, recordCount, stringTableOffset = struct.unpack_from(HEADER_FORMAT, mappedFile, 0)
+        if magic != BINARY_MAGIC or stringTableOffset != HEADER_SIZE + recordCount * RECORD_SIZE:
+            raise ValueError("'" + fileName + "' is not a valid WeCare binary product file.")
+        namePool, offset = readStringPool(mappedFile, stringTableOffset)
+        brandPool, offset = readStringPool(mappedFile, offset)
+        originPool, offset = readStringPool(mappedFile, offset)
+    except Exception:
+        mappedFile.close()
+        file.close()
+        raise
+    return BinaryProductStore(fileName, file, mappedFile, recordCount, namePool, brandPool, originPool)
+
+# Helper Function for writing products to a binary product file.
+def writeBinaryProductFile(fileName, productDataDict):
+    """
+    Helper Function
+    Writing products to a binary product file with fixed-width records and a
+    string table. Like writeProductsToFile, the data goes to a temporary file that
+    is flushed to disk and then renamed over the old file.
+
+    · Parameters:
+        fileName (str): The name of the binary product file (e.g., "products.bin").
+        productDataDict (dict or ProductStore): The products to write.
+    · Returns:
+        bool: True if the file was written successfully, False otherwise.
+    · Raises:
+        (Prints error messages to the console instead of raising, returns False.)
+    """
+    tempFileName = fileName + ".tmp"
+    try:
+        namePool = StringPool()
+        brandPool = StringPool()
+        originPool = StringPool()
+        file = open(tempFileName, "wb")
+        recordCount = len(productDataDict)
+        file.write(struct.pack(HEADER_FORMAT, BINARY_MAGIC, recordCount, HEADER_SIZE + recordCount * RECORD_SIZE))
+        for productId, details in productDataDict.items():
+            name, brand, qty, cost, origin = details
+            file.write(struct.pack(RECORD_FORMAT, productId, namePool.encode(name), brandPool.encode(brand), originPool.encode(origin), qty, cost))
+        for pool in (namePool, brandPool, originPool):
+            file.write(struct.pack("<I", len(pool.values)))
+            for value in pool.values:
+                encoded = value.encode("utf-8")
+                file.write(struct.pack("<I", len(encoded)))
+                file.write(encoded)
+        file.flush()
+        os.fsync(file.fileno())
+        file.close()
+        os.replace(tempFileName, fileName)
+        return True
+    except Exception as e:
+        print("Error writing binary product file '" + fileName + "': " + str(e))
+        return False
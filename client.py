@@ -0,0 +1,250 @@
+# importing modules
+import argparse
+import json
+import socket
+
+# importing user made modules
+from read import getNaturalNumber, askToContinue
+from server import DEFAULT_HOST, DEFAULT_PORT
+
+# Class for talking to the inventory server.
+class InventoryClient:
+    """
+    Main Class
+    A connection from one terminal to the inventory server. Every call sends one
+    JSON request line and returns the decoded JSON response.
+
+    · Example (Only for demonstration purposes):
+        client = InventoryClient(port=5050)
+        client.sell("Bob", "9800000000", [(1, 3), (2, 1)])
+        client.close()
+    """
+
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT, unixPath=None):
+        if unixPath is not None:
+            self.connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.connection.connect(unixPath)
+        else:
+            self.connection = socket.create_connection((host, port))
+        self.reader = self.connection.makefile("rb")
+
+    def request(self, message):
+        """
+        Sending one request and waiting for its response.
+
+        · Parameters:
+            message (dict): The request, e.g. {"op": "get", "id": 1}.
+        · Returns:
+            dict: The response from the server.
+        · Raises:
+            ConnectionError: If the server closed the connection.
+        """
+        self.connection.sendall((json.dumps(message) + "\n").encode("utf-8"))
+        line = self.reader.readline()
+        if not line:
+            raise ConnectionError("The inventory server closed the connection.")
+        return json.loads(line.decode("utf-8"))
+
+    def sell(self, customerName, customerPhone, saleLines):
+        """
+        Selling a whole cart as one transaction.
+
+        · Parameters:
+            customerName (str): The customer name.
+            customerPhone (str): The customer phone number.
+            saleLines (list): (productId, quantityToBuy) pairs.
+        · Returns:
+            dict: {"ok": True, "invoice": [lines]} or {"ok": False, "error": message}.
+        """
+        return self.request({"op": "sell", "customer": customerName, "phone": customerPhone, "items": saleLines})
+
+    def restock(self, supplierName, supplierPhone, restockLines):
+        """
+        Restocking a whole order as one transaction.
+
+        · Parameters:
+            supplierName (str): The supplier name.
+            supplierPhone (str): The supplier phone number.
+            restockLines (list): (productId, qtyToAdd, newCostPrice) tuples.
+        · Returns:
+            dict: {"ok": True, "invoice": [lines]} or {"ok": False, "error": message}.
+        """
+        return self.request({"op": "restock", "supplier": supplierName, "phone": supplierPhone, "items": restockLines})
+
+    def reserve(self, cartId, saleLines):
+        """
+        Adding lines to a cart on the server, which holds their stock until checkout.
+
+        · Parameters:
+            cartId (int): The cart, or None to open a new one.
+            saleLines (list): (productId, quantityToBuy) pairs.
+        · Returns:
+            dict: {"ok": True, "cart": cartId, "items": [...], "holdSeconds": seconds}
+                  or {"ok": False, "error": message, "code": code}.
+        """
+        return self.request({"op": "reserve", "cart": cartId, "items": saleLines})
+
+    def checkout(self, cartId, customerName, customerPhone):
+        """
+        Selling a cart built with reserve() as one transaction.
+
+        · Parameters:
+            cartId (int): The cart.
+            customerName (str): The customer name.
+            customerPhone (str): The customer phone number.
+        · Returns:
+            dict: {"ok": True, "invoice": [lines]} or {"ok": False, "error": message}.
+        """
+        return self.request({"op": "checkout", "cart": cartId, "customer": customerName, "phone": customerPhone})
+
+    def release(self, cartId):
+        """
+        Dropping a cart and freeing the stock it holds.
+
+        · Parameters:
+            cartId (int): The cart.
+        · Returns:
+            dict: {"ok": True}.
+        """
+        return self.request({"op": "release", "cart": cartId})
+
+    def getProduct(self, productId):
+        """
+        Reading one product.
+
+        · Parameters:
+            productId (int): The ID of the product.
+        · Returns:
+            dict: {"ok": True, "product": [id, name, brand, qty, cost, origin]} or an error.
+        """
+        return self.request({"op": "get", "id": productId})
+
+    def listProducts(self, offset=0, limit=20):
+        """
+        Reading one page of the catalogue.
+
+        · Parameters:
+            offset (int): The number of products to skip.
+            limit (int): The most products to return.
+        · Returns:
+            dict: {"ok": True, "total": count, "products": [...]}.
+        """
+        return self.request({"op": "list", "offset": offset, "limit": limit})
+
+    def close(self):
+        """
+        Closing the connection.
+        """
+        self.reader.close()
+        self.connection.close()
+
+# Function for entering a cart or restock order at a terminal and sending it to the server.
+def enterRemoteTransaction(client, kind):
+    """
+    Main Function
+    Collecting a sales cart (kind "sell") or restock order (kind "restock") from the
+    user and sending it to the inventory server as one transaction. Each line of a
+    cart is held on the server as it is added (reserve), so the user knows at once
+    whether it is in stock and no other terminal can sell it before checkout.
+
+    · Parameters:
+        client (InventoryClient): The connection to the server.
+        kind (str): "sell" or "restock".
+    · Returns:
+        None: This function handles all operations and outputs directly.
+    · Raises:
+        (Prints the error sent by the server if the transaction is rejected.)
+    """
+    partyLabel = "customer" if kind == "sell" else "supplier"
+    partyName = input("Enter " + partyLabel + " name for invoice: ")
+    partyPhone = input("Enter " + partyLabel + " phone number: ")
+    lines = []
+    cartId = None
+    while True:
+        productId = getNaturalNumber("Enter Product ID:")
+        response = client.getProduct(productId)
+        if not response["ok"]:
+            print("Error: " + response["error"])
+        else:
+            productId, name, brand, qty, cost, origin = response["product"]
+            print("\nSelected: " + name + " (" + brand + "), Stock: " + str(qty) + ", Cost Price: " + str(cost) + ", Origin: " + origin)
+            if kind == "sell":
+                response = client.reserve(cartId, [(productId, getNaturalNumber("Enter quantity to buy:"))])
+                cartId = response.get("cart", cartId)
+                if response["ok"]:
+                    lines = response["items"]
+                    print(name + " held for this cart.")
+                else:
+                    print("Error: " + response["error"])
+            else:
+                qtyToAdd = getNaturalNumber("Enter quantity to add:")
+                lines.append((productId, qtyToAdd, getNaturalNumber("Enter new cost price per item for this batch:")))
+        if not askToContinue("Add another product?"):
+            break
+    if not lines:
+        if cartId is not None:
+            client.release(cartId)
+        print("\nNothing selected. Transaction cancelled.")
+        return
+    response = client.checkout(cartId, partyName, partyPhone) if kind == "sell" else client.restock(partyName, partyPhone, lines)
+    if not response["ok"]:
+        if cartId is not None:
+            client.release(cartId)
+        print("Error: " + response["error"])
+    for line in response.get("invoice", []):
+        print(line)
+
+# Function for showing one page of the catalogue from the server.
+def showRemoteStock(client, offset, pageSize):
+    """
+    Main Function
+    Showing one page of the catalogue held by the inventory server.
+
+    · Parameters:
+        client (InventoryClient): The connection to the server.
+        offset (int): The number of products to skip.
+        pageSize (int): The number of products to show.
+    · Returns:
+        int: The total number of products on the server.
+    """
+    response = client.listProducts(offset, pageSize)
+    print("\n" + "=" * 90)
+    print("ID\tName\t\t\tBrand\t\tQty\tCost Price\tOrigin")
+    print("-" * 90)
+    for productId, name, brand, qty, cost, origin in response["products"]:
+        print(str(productId) + "\t" + name + "\t\t" + brand + "\t" + str(qty) + "\t" + str(cost) + "\t\t" + origin)
+    print("=" * 90)
+    return response["total"]
+
+# Main Program Execution Block
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="WeCare terminal connected to an inventory server")
+    parser.add_argument("--host", default=DEFAULT_HOST, help="address of the inventory server")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="TCP port of the inventory server")
+    parser.add_argument("--unix", help="Unix domain socket of the inventory server")
+    options = parser.parse_args()
+
+    client = InventoryClient(options.host, options.port, options.unix)
+    pageOffset = 0
+    pageSize = 20
+    while True:
+        print("\n+------------ TERMINAL MENU ---------+")
+        print("| 1. Show Stock (next page)          |")
+        print("| 2. Sell Products                   |")
+        print("| 3. Restock Products                |")
+        print("| 4. Exit                            |")
+        print("+------------------------------------+")
+        choice = getNaturalNumber("Enter choice (1-4):")
+        if choice == 1:
+            total = showRemoteStock(client, pageOffset, pageSize)
+            pageOffset = pageOffset + pageSize if pageOffset + pageSize < total else 0
+        elif choice == 2:
+            enterRemoteTransaction(client, "sell")
+        elif choice == 3:
+            enterRemoteTransaction(client, "restock")
+        elif choice == 4:
+            print("\nExiting Terminal. Goodbye!")
+            break
+        else:
+            print("Invalid choice. Please enter 1-4.")
+    client.close()
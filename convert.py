@@ -0,0 +1,61 @@
+# importing modules
+import os
+import sys
+
+# importing user made modules
+from read import readProductFile, getJournalFileName, getCompactingJournalFileName
+from write import writeProductsToFile
+from binformat import isBinaryProductFile, writeBinaryProductFile
+
+# Function for converting a product file between the text and binary formats.
+def convertProductFile(sourceFileName, targetFileName):
+    """
+    Main Function
+    Converting a product file between the text format (e.g., "products.txt") and the
+    memory-mapped binary format (e.g., "products.bin"). The format of each file is
+    chosen by its extension. Text files are read with their journal applied, and
+    the journals of a text target are removed once it is written, so changes
+    recorded for the file it replaces are not replayed over the converted products.
+
+    · Parameters:
+        sourceFileName (str): The product file to read.
+        targetFileName (str): The product file to write.
+    · Returns:
+        bool: True if the target file was written, False otherwise.
+    · Raises:
+        (Prints error messages to the console instead of raising, returns False.)
+    · Example (Only for demonstration purposes):
+        python convert.py products.txt products.bin
+        python convert.py products.bin products.txt
+    """
+    productDataDict = readProductFile(sourceFileName)
+    if not productDataDict:
+        print("Nothing to convert: no products loaded from '" + sourceFileName + "'.")
+        return False
+    if isBinaryProductFile(targetFileName):
+        converted = writeBinaryProductFile(targetFileName, productDataDict)
+    else:
+        converted = writeProductsToFile(targetFileName, productDataDict)
+        if converted:
+            # Removing the journals only now, so a failed write leaves the old file and its changes
+            journalFileName = getJournalFileName(targetFileName)
+            try:
+                for fileName in (journalFileName, getCompactingJournalFileName(journalFileName)):
+                    if os.path.exists(fileName):
+                        os.remove(fileName)
+            except OSError as e:
+                print("Error removing the journal of '" + targetFileName + "', remove it before using the file: " + str(e))
+                converted = False
+    if hasattr(productDataDict, "close"):
+        productDataDict.close()
+    if converted:
+        print("Converted " + str(len(productDataDict)) + " products from '" + sourceFileName + "' to '" + targetFileName + "'.")
+    return converted
+
+# Main Program Execution Block
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("Usage: python convert.py <source file> <target file>")
+        sys.exit(2)
+    if not convertProductFile(sys.argv[1], sys.argv[2]):
+        sys.exit(1)
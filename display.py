@@ -0,0 +1,235 @@
+# importing modules
+
+# Importing sys for writing a whole page to the console in one call
+import sys
+# Importing time for noticing when the day's price table has run out
+import time
+# Importing OrderedDict for dropping the least recently shown rows from the row cache
+from collections import OrderedDict
+
+# importing user made modules
+from pricing import DEFAULT_PRICING
+
+# Number of products shown per page
+PAGE_SIZE = 20
+# Quantity at or below which a product counts as low stock
+LOW_STOCK_THRESHOLD = 20
+# Number of pages of formatted rows kept in the row cache
+ROW_CACHE_PAGES = 4
+
+# Table titles and column headers for each price mode
+TABLE_TITLES = {
+    "selling": "---------------------------- Available Products (Selling Price) --------------------------",
+    "cost": "----------------------------- Raw Inventory Data (Cost Price) ----------------------------",
+}
+TABLE_HEADERS = {
+    "selling": "ID\tName\t\t\tBrand\t\tQty\tSelling Price\tOrigin",
+    "cost": "ID\tName\t\t\tBrand\t\tQty\tCost Price\tOrigin",
+}
+
+# Class for showing the catalogue one page at a time.
+class ProductTableView:
+    """
+    Main Class
+    Showing the product catalogue as a paged, optionally filtered table.
+    Only the rows of the visible page are formatted, the page is written to the
+    console in one buffered write, and formatted rows are cached until the product
+    they show changes (e.g., its quantity after a sale). With a ProductIndex the
+    cache is keyed on the change count of the product (see versions in search.py),
+    so a cached row costs two dictionary lookups; without one the product details
+    are compared. The cache holds the rows of the last ROW_CACHE_PAGES pages shown.
+    The current page and filter are kept between calls, so the cashier stays on the
+    same page while adding items to a cart.
+
+    · Example (Only for demonstration purposes):
+        productView = ProductTableView(product_data)
+        productView.setFilter("brand", "Cetaphil")
+        productView.render("selling")   # First page of Cetaphil products
+        productView.nextPage()
+    """
+
+    def __init__(self, productDataDict, productIndex=None, pageSize=PAGE_SIZE, pricingEngine=None):
+        self.productDataDict = productDataDict
+        self.productIndex = productIndex # Optional ProductIndex for brand/origin filters
+        self.pricingEngine = pricingEngine or DEFAULT_PRICING # Selling prices, see pricing.py
+        self.pageSize = pageSize
+        self.page = 0
+        self.filterType = None    # None, "brand", "origin" or "low"
+        self.filterValue = None
+        self.filteredIds = None   # Product IDs matching a brand/origin filter
+        self.allIds = None        # All product IDs in catalogue order
+        self.rowCache = OrderedDict() # (price mode, product ID) -> (product version, price table version, formatted row)
+
+    def setFilter(self, filterType, filterValue=None):
+        """
+        Showing only the products of one brand, one origin or with low stock.
+
+        · Parameters:
+            filterType (str): "brand", "origin", "low", or None to show all products.
+            filterValue (str or int): The brand/origin name, or the low stock threshold.
+        """
+        self.filterType = filterType
+        self.filterValue = filterValue
+        self.filteredIds = None
+        self.page = 0
+
+    def getVisibleIds(self):
+        """
+        Getting the product IDs that pass the current filter, in catalogue order.
+
+        · Returns:
+            list: The product IDs.
+        """
+        if self.allIds is None or len(self.allIds) != len(self.productDataDict):
+            self.allIds = list(self.productDataDict) # Refreshing after products were added or removed
+            self.filteredIds = None
+        if self.filterType is None:
+            return self.allIds
+        if self.filterType == "low":
+            # Stock changes with every sale, so low stock is worked out each time
+            threshold = self.filterValue
+            if hasattr(self.productDataDict, "lowStockIds"):
+                return self.productDataDict.lowStockIds(threshold)
+            return [productId for productId in self.allIds if self.productDataDict[productId][2] <= threshold]
+        if self.filteredIds is None:
+            if self.productIndex is not None:
+                self.filteredIds = self.productIndex.search(self.filterType + ":" + self.filterValue)
+            else:
+                detailIndex = 1 if self.filterType == "brand" else 4
+                wanted = self.filterValue.lower()
+                self.filteredIds = [productId for productId in self.allIds if self.productDataDict[productId][detailIndex].lower() == wanted]
+        return self.filteredIds
+
+    def getPageCount(self):
+        """
+        Counting the pages of the current (filtered) table.
+
+        · Returns:
+            int: The number of pages, at least 1.
+        """
+        return max(1, (len(self.getVisibleIds()) + self.pageSize - 1) // self.pageSize)
+
+    def nextPage(self):
+        """
+        Moving to the next page, if there is one.
+        """
+        if self.page + 1 < self.getPageCount():
+            self.page += 1
+
+    def previousPage(self):
+        """
+        Moving to the previous page, if there is one.
+        """
+        if self.page > 0:
+            self.page -= 1
+
+    def formatRow(self, productId, priceMode):
+        """
+        Formatting one table row, reusing the cached row while the product is unchanged.
+
+        · Parameters:
+            productId (int): The ID of the product.
+            priceMode (str): "selling" to show the selling price, "cost" for the cost price.
+        · Returns:
+            str: The formatted row.
+        """
+        cacheKey = (priceMode, productId)
+        if self.productIndex is not None:
+            productVersion = self.productIndex.versions.get(productId, 0)
+        else:
+            productVersion = tuple(self.productDataDict[productId]) # No change counts without an index
+        cached = self.rowCache.get(cacheKey)
+        if cached is not None and cached[0] == productVersion and cached[1] == self.pricingEngine.version:
+            self.rowCache.move_to_end(cacheKey)
+            return cached[2]
+        name, brand, qty, costPrice, origin = self.productDataDict[productId]
+        if priceMode == "selling":
+            price = self.pricingEngine.sellingPrice(productId, self.productDataDict[productId])
+        else:
+            price = costPrice
+        # Using tabs for display.
+        row = str(productId) + "\t" + name + "\t\t" + brand + "\t" + str(qty) + "\t" + str(price) + "\t\t" + origin
+        self.rowCache[cacheKey] = (productVersion, self.pricingEngine.version, row)
+        self.rowCache.move_to_end(cacheKey)
+        if len(self.rowCache) > ROW_CACHE_PAGES * self.pageSize:
+            self.rowCache.popitem(last=False) # Dropping the row shown longest ago
+        return row
+
+    def render(self, priceMode, allPages=False):
+        """
+        Writing the current page (or every page) of the table to the console in one write.
+
+        · Parameters:
+            priceMode (str): "selling" to show the selling price, "cost" for the cost price.
+            allPages (bool): If True, the whole (filtered) catalogue is written.
+        """
+        if time.time() >= self.pricingEngine.tableExpiry:
+            self.rowCache.clear() # A new day, the selling prices are worked out again
+        visibleIds = self.getVisibleIds()
+        pageCount = self.getPageCount()
+        if self.page >= pageCount:
+            self.page = pageCount - 1
+        if allPages:
+            pageIds = visibleIds
+        else:
+            pageIds = visibleIds[self.page * self.pageSize:(self.page + 1) * self.pageSize]
+        lines = ["", "=" * 90, TABLE_TITLES[priceMode], "-" * 90, TABLE_HEADERS[priceMode], "-" * 90]
+        for productId in pageIds:
+            lines.append(self.formatRow(productId, priceMode))
+        if not pageIds:
+            lines.append("No products match the current filter.")
+        lines.append("=" * 90)
+        if not allPages:
+            status = "Page " + str(self.page + 1) + " of " + str(pageCount) + " (" + str(len(visibleIds)) + " products"
+            if self.filterType == "low":
+                status += ", stock at or below " + str(self.filterValue)
+            elif self.filterType is not None:
+                status += ", " + self.filterType + ": " + self.filterValue
+            lines.append(status + ")")
+        sys.stdout.write("\n".join(lines) + "\n")
+        sys.stdout.flush()
+
+# Function for letting the user page through and filter the product table.
+def browseProducts(productView, priceMode):
+    """
+    Main Function
+    Showing the product table page by page and letting the user move between pages
+    or change the filter until they press Enter to continue.
+
+    · Parameters:
+        productView (ProductTableView): The table view to show.
+        priceMode (str): "selling" to show the selling price, "cost" for the cost price.
+    · Returns:
+        None: This function only prints to the console.
+    · Raises:
+        Nothing. Unknown commands print a short help text.
+    · Commands:
+        n / p             next / previous page
+        b <brand>         only products of a brand
+        o <origin>        only products from an origin
+        l [threshold]     only products with low stock
+        a                 all products again
+        Enter             continue
+    """
+    while True:
+        productView.render(priceMode)
+        command = input("[n]ext [p]rev [b]rand <name> [o]rigin <name> [l]ow stock [a]ll, Enter to continue: ").strip()
+        if not command:
+            return
+        action = command[0].lower()
+        argument = command[1:].strip()
+        if action == "n":
+            productView.nextPage()
+        elif action == "p":
+            productView.previousPage()
+        elif action == "b" and argument:
+            productView.setFilter("brand", argument)
+        elif action == "o" and argument:
+            productView.setFilter("origin", argument)
+        elif action == "l":
+            threshold = int(argument) if argument.isdigit() else LOW_STOCK_THRESHOLD
+            productView.setFilter("low", threshold)
+        elif action == "a":
+            productView.setFilter(None)
+        else:
+            print("Unknown command. Use n, p, b <brand>, o <origin>, l [threshold], a or Enter.")
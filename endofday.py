@@ -0,0 +1,289 @@
+# importing modules
+import argparse
+import os
+import time
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+# importing user made modules
+from archive import SalesArchive, ARCHIVE_FILE
+from read import getPeakMemoryMb
+
+# Invoice lines handed to a worker process at a time
+STATEMENT_BATCH_LINES = 2000
+# Batches waiting or being rendered per worker, which bounds the memory used
+BATCHES_PER_WORKER = 2
+
+# Helper Function for turning a customer or supplier name into part of a file name.
+def getSafeFileName(text):
+    """
+    Helper Function
+    Keeping only letters, digits, "-" and "_" of a name (others become "_"), so it
+    can be used in a file name inside the archive.
+
+    · Parameters:
+        text (str): The customer/supplier name or phone number.
+    · Returns:
+        str: The safe name, at most 40 characters, "unnamed" if nothing is left.
+    · Raises:
+        Nothing
+    """
+    safeText = "".join(character if character.isalnum() or character in "-_" else "_" for character in text)
+    return safeText[:40] or "unnamed"
+
+# Helper Function for grouping invoice lines by customer/supplier.
+def groupStatements(lineRows):
+    """
+    Helper Function
+    Grouping invoice lines that arrive ordered by party and phone (see
+    SalesArchive.iterPartyLines) into one group per customer or supplier, holding
+    only the lines of the current party.
+
+    · Parameters:
+        lineRows (iterable): (party, phone, invoice, timestamp, name, brand, quantity,
+                             paidQuantity, unitPrice, amount) tuples.
+    · Returns:
+        generator: Yields (party, phone, rows) per party, where rows are the
+                   (invoice, timestamp, name, brand, quantity, paidQuantity,
+                   unitPrice, amount) tuples of its lines.
+    · Raises:
+        Nothing
+    """
+    currentKey = None
+    rows = []
+    for row in lineRows:
+        key = row[:2]
+        if key != currentKey and rows:
+            yield currentKey[0], currentKey[1], rows
+            rows = []
+        currentKey = key
+        rows.append(row[2:])
+    if rows:
+        yield currentKey[0], currentKey[1], rows
+
+# Helper Function for splitting the day's customers and suppliers into ranges for the worker processes.
+def partitionParties(dayParties, batchLines=STATEMENT_BATCH_LINES):
+    """
+    Helper Function
+    Splitting the customers and suppliers of a day into ranges of about batchLines
+    invoice lines, so each worker process gets enough work per hand-over. Ranges
+    only end between two names, so all statements of one name stay in one range;
+    a party with more lines than batchLines gets a range of its own.
+
+    · Parameters:
+        dayParties (iterable): (kind, party, phone, lineCount) tuples ordered by kind,
+                               party and phone (see SalesArchive.iterDayParties).
+        batchLines (int): The number of invoice lines a range is closed at.
+    · Returns:
+        generator: Yields (kind, firstParty, lastParty, firstSequence) per range,
+                   firstSequence numbering the statements from 1 in archive order.
+    · Raises:
+        Nothing
+    """
+    currentRange = None # [kind, firstParty, lastParty, firstSequence]
+    lineCount = 0
+    for sequence, (kind, party, phone, partyLines) in enumerate(dayParties, start=1):
+        if currentRange is not None and (kind != currentRange[0] or (party != currentRange[2] and lineCount >= batchLines)):
+            yield tuple(currentRange)
+            currentRange = None
+            lineCount = 0
+        if currentRange is None:
+            currentRange = [kind, party, party, sequence]
+        currentRange[2] = party
+        lineCount += partyLines
+    if currentRange is not None:
+        yield tuple(currentRange)
+
+# Helper Function for building the text of one customer statement or supplier summary.
+def renderStatement(kind, party, phone, day, rows):
+    """
+    Helper Function
+    Building the statement of one customer (every sale of the day, invoice by
+    invoice) or the restock summary of one supplier.
+
+    · Parameters:
+        kind (str): "SALE" or "RESTOCK".
+        party (str): The customer or supplier name.
+        phone (str): The customer or supplier phone number.
+        day (str): The day, "YYYY-MM-DD".
+        rows (list): (invoice, timestamp, name, brand, quantity, paidQuantity,
+                     unitPrice, amount) tuples, in the order they were recorded.
+    · Returns:
+        tuple: (text, total) where total is the money paid by the customer or
+               spent with the supplier.
+    · Raises:
+        Nothing
+    """
+    if kind == "SALE":
+        statementLines = ["--- WeCare Customer Statement ---", "Customer: " + party, "Phone: " + phone, "Day: " + day, "-"*50]
+    else:
+        statementLines = ["--- WeCare Supplier Restock Summary ---", "Supplier: " + party, "Phone: " + phone, "Day: " + day, "-"*50]
+    total = 0
+    invoiceTotal = 0
+    currentInvoice = None
+    for invoice, timestamp, name, brand, quantity, paidQuantity, unitPrice, amount in rows:
+        if invoice != currentInvoice:
+            if currentInvoice is not None:
+                statementLines.append("  Invoice total: Nrs " + str(invoiceTotal))
+            statementLines.append(timestamp[11:19] + "  " + invoice)
+            currentInvoice = invoice
+            invoiceTotal = 0
+        if kind == "SALE":
+            statementLines.append("  " + name + " (" + brand + ") - Qty: " + str(quantity) + " (Paid: " + str(paidQuantity) + ") X " + str(unitPrice) + " = " + str(amount))
+        else:
+            statementLines.append("  " + name + " (" + brand + ") - Qty: " + str(quantity) + " X " + str(unitPrice) + " = " + str(amount))
+        invoiceTotal += amount
+        total += amount
+    statementLines.append("  Invoice total: Nrs " + str(invoiceTotal))
+    statementLines.extend(["-"*50, ("Total for the day: Nrs " if kind == "SALE" else "Total restock cost: Nrs ") + str(total), "-"*50])
+    return "\n".join(statementLines) + "\n", total
+
+# Helper Function for rendering the statements of a range of parties, run in a worker process.
+def renderStatementRange(archiveFileName, day, kind, firstParty, lastParty, firstSequence, lastLineId):
+    """
+    Helper Function
+    Reading the invoice lines of a range of customers or suppliers from the sales
+    archive and rendering their statements, in a worker process of the pool in
+    writeEndOfDayArchive. Each worker opens the archive itself, so the lines are
+    read in parallel and never sent between processes. Only lines up to lastLineId
+    are read, the last line when the ranges were made, so lines recorded since (e.g.,
+    a sale while the day is closed) cannot add parties or lines to a range and
+    every worker sees the same day as the ranges and their statement numbers.
+
+    · Parameters:
+        archiveFileName (str): The sales archive database file.
+        day (str): The day, "YYYY-MM-DD".
+        kind (str): "SALE" or "RESTOCK".
+        firstParty (str): The first customer/supplier name of the range.
+        lastParty (str): The last customer/supplier name of the range.
+        firstSequence (int): The number of the range's first statement.
+        lastLineId (int): The ID of the last invoice line included (see getLastLineId).
+    · Returns:
+        list: (archiveName, data, lineCount, total) per statement, data being the
+              UTF-8 encoded text.
+    · Raises:
+        sqlite3.Error: If the archive cannot be read.
+    """
+    salesArchive = SalesArchive(archiveFileName)
+    rendered = []
+    folder = "customers/" if kind == "SALE" else "suppliers/"
+    try:
+        for sequence, (party, phone, rows) in enumerate(groupStatements(salesArchive.iterPartyLines(day, kind, firstParty, lastParty, lastLineId)), start=firstSequence):
+            text, total = renderStatement(kind, party, phone, day, rows)
+            # The sequence number keeps names unique when two parties reduce to the same safe name
+            archiveName = folder + str(sequence).zfill(6) + "_" + getSafeFileName(party) + "_" + getSafeFileName(phone) + ".txt"
+            rendered.append((archiveName, text.encode("utf-8"), len(rows), total))
+    finally:
+        salesArchive.close()
+    return rendered
+
+# Function for writing the end-of-day statements of every customer and supplier.
+def writeEndOfDayArchive(archiveFileName, day, outputFileName, workers=None, batchLines=STATEMENT_BATCH_LINES):
+    """
+    Main Function
+    Writing one statement per customer and one restock summary per supplier for a
+    day into a single zip archive, instead of thousands of separate files.
+    The day's customers and suppliers are split into ranges (see partitionParties);
+    a pool of worker processes reads and renders the statements of each range,
+    while this process compresses the finished statements into the zip in order.
+    Only workers * BATCHES_PER_WORKER ranges are in flight at once, so the memory
+    used does not grow with the number of lines in the day. A summary.txt with the
+    totals closes the archive, which is written to a temporary file and renamed.
+
+    · Parameters:
+        archiveFileName (str): The sales archive to read the day's lines from.
+        day (str): The day, "YYYY-MM-DD".
+        outputFileName (str): The zip file to write (e.g., "statements_2025-05-01.zip").
+        workers (int): The number of worker processes, None for one per CPU; 1
+                       renders in this process without a pool.
+        batchLines (int): The invoice lines per range handed to a worker.
+    · Returns:
+        dict: {"customers", "suppliers", "lines", "revenue", "restockCost", "seconds",
+              "bytes"} for the throughput report, or None if the archive could not be written.
+    · Raises:
+        (Prints error messages to the console instead of raising, returns None.)
+    · Example (Only for demonstration purposes):
+        writeEndOfDayArchive("sales.db", "2025-05-01", "statements_2025-05-01.zip")
+        python endofday.py --day 2025-05-01
+    """
+    start = time.perf_counter()
+    summary = {"customers": 0, "suppliers": 0, "lines": 0, "revenue": 0, "restockCost": 0}
+    workers = workers or os.cpu_count() or 1
+    tempFileName = outputFileName + ".tmp"
+    salesArchive = None
+    pool = None
+    try:
+        salesArchive = SalesArchive(archiveFileName)
+        zipFile = zipfile.ZipFile(tempFileName, "w", zipfile.ZIP_DEFLATED)
+        try:
+            def writeRendered(kind, rendered):
+                for archiveName, data, lineCount, total in rendered:
+                    zipFile.writestr(archiveName, data)
+                    summary["lines"] += lineCount
+                    if kind == "SALE":
+                        summary["customers"] += 1
+                        summary["revenue"] += total
+                    else:
+                        summary["suppliers"] += 1
+                        summary["restockCost"] += total
+
+            # The ranges and the workers read the day up to the same line, see renderStatementRange
+            lastLineId = salesArchive.getLastLineId()
+            partyRanges = partitionParties(salesArchive.iterDayParties(day, lastLineId), batchLines)
+            if workers == 1:
+                for kind, firstParty, lastParty, firstSequence in partyRanges:
+                    writeRendered(kind, renderStatementRange(archiveFileName, day, kind, firstParty, lastParty, firstSequence, lastLineId))
+            else:
+                pool = ProcessPoolExecutor(max_workers=workers)
+                pending = deque()
+                for kind, firstParty, lastParty, firstSequence in partyRanges:
+                    pending.append((kind, pool.submit(renderStatementRange, archiveFileName, day, kind, firstParty, lastParty, firstSequence, lastLineId)))
+                    if len(pending) >= workers * BATCHES_PER_WORKER:
+                        kind, future = pending.popleft() # Waiting for the oldest range keeps the archive in order
+                        writeRendered(kind, future.result())
+                while pending:
+                    kind, future = pending.popleft()
+                    writeRendered(kind, future.result())
+            summaryLines = ["--- WeCare End of Day " + day + " ---", "Generated: " + str(datetime.now()), "-"*50,
+                            "Customers: " + str(summary["customers"]), "Suppliers: " + str(summary["suppliers"]), "Invoice lines: " + str(summary["lines"]),
+                            "Revenue: Nrs " + str(summary["revenue"]), "Restock cost: Nrs " + str(summary["restockCost"]), "-"*50]
+            zipFile.writestr("summary.txt", "\n".join(summaryLines) + "\n")
+        finally:
+            zipFile.close()
+        os.replace(tempFileName, outputFileName)
+    except Exception as e:
+        print("Error writing end-of-day archive '" + outputFileName + "': " + str(e))
+        if os.path.exists(tempFileName):
+            os.remove(tempFileName)
+        return None
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+        if salesArchive is not None:
+            salesArchive.close()
+    summary["seconds"] = time.perf_counter() - start
+    summary["bytes"] = os.path.getsize(outputFileName)
+    return summary
+
+# Main Program Execution Block
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="End-of-day customer statements and supplier restock summaries in one zip archive")
+    parser.add_argument("--archive", default=ARCHIVE_FILE, help="sales archive to read the day's transactions from")
+    parser.add_argument("--day", default=datetime.now().strftime("%Y-%m-%d"), help="day to close, YYYY-MM-DD (default today)")
+    parser.add_argument("--output", help="zip file to write (default statements_<day>.zip)")
+    parser.add_argument("--workers", type=int, help="worker processes rendering statements (default one per CPU, 1 for no pool)")
+    options = parser.parse_args()
+
+    outputFileName = options.output or "statements_" + options.day + ".zip"
+    summary = writeEndOfDayArchive(options.archive, options.day, outputFileName, options.workers)
+    if summary is None:
+        raise SystemExit(1)
+    statementCount = summary["customers"] + summary["suppliers"]
+    seconds = max(summary["seconds"], 1e-9)
+    print("Wrote " + str(summary["customers"]) + " customer statements and " + str(summary["suppliers"]) + " supplier summaries to '" + outputFileName + "'")
+    print(str(summary["lines"]) + " invoice lines in " + str(round(summary["seconds"], 2)) + " s: " + str(round(statementCount / seconds)) + " statements/s, " + str(round(summary["lines"] / seconds)) + " lines/s, " + str(round(summary["bytes"] / 1024, 1)) + " KB")
+    peakMemory = getPeakMemoryMb()
+    if peakMemory is not None:
+        print("Peak memory " + str(round(peakMemory, 1)) + " MB")
@@ -0,0 +1,845 @@
+# importing modules
+import itertools
+import threading
+import time
+from datetime import datetime
+
+# importing user made modules
+from write import commitInventoryChanges, generateInvoiceName, writeInvoice
+from pricing import DEFAULT_PRICING, countFreeItems
+
+# Largest quantity a restock line may add
+MAX_RESTOCK_QUANTITY = 999
+
+# Codes of the validation errors raised by the engine (InventoryError.code)
+EMPTY_ORDER = "empty_order"
+UNKNOWN_PRODUCT = "unknown_product"
+INVALID_QUANTITY = "invalid_quantity"
+INVALID_PRICE = "invalid_price"
+NOT_ENOUGH_STOCK = "not_enough_stock"
+INVOICE_FAILED = "invoice_failed"
+COMMIT_FAILED = "commit_failed"
+
+# How long a cart holds its stock (seconds) before other sales may take it again
+RESERVATION_SECONDS = 15 * 60
+
+# Class for the errors of a rejected transaction.
+class InventoryError(ValueError):
+    """
+    Helper Class
+    A sale or restock that was rejected, with a code a program can act on (one of
+    the codes above), the product it is about (if any) and a message for people.
+    Nothing in the inventory is changed when it is raised.
+
+    A cart rejected as a whole (see Cart.addLines) also lists every problem found.
+
+    · Example (Only for demonstration purposes):
+        try:
+            inventory.sell("Bob", "9800000000", [(1, 500)])
+        except InventoryError as e:
+            e.code        # "not_enough_stock"
+            e.productId   # 1
+            str(e)        # "Not enough stock for product ID 1: ..."
+    """
+
+    def __init__(self, code, message, productId=None, problems=None):
+        ValueError.__init__(self, message)
+        self.code = code
+        self.productId = productId
+        self.problems = problems or [] # InventoryError of every line that cannot be served
+
+# Transaction Functions (no console input, used by the engine below)
+
+# Helper Function for creating one sale line with the current prices and offers applied.
+def createSaleItem(productId, details, quantityToBuy, pricingEngine=None):
+    """
+    Helper Function
+    Creating one cart line for a sale, applying the selling price and free items of
+    the pricing engine (by default the 200% markup on the cost price and the
+    "buy 3 get 1 free" offer).
+
+    · Parameters:
+        productId (int): The ID of the product.
+        details (list): The product details [Name, Brand, Quantity, CostPrice, Origin].
+        quantityToBuy (int): The number of items paid for.
+        pricingEngine (PricingEngine): Optional pricing rules, see pricing.py.
+    · Returns:
+        dict: {"id", "name", "brand", "origin", "paidQty", "totalQty", "price", "cost"}
+              where totalQty includes the free items, price is the selling price per
+              item and cost the cost price per item at the time of the sale.
+    · Raises:
+        Nothing
+    """
+    if pricingEngine is None:
+        pricingEngine = DEFAULT_PRICING
+    costPrice, sellingPrice, bundles = pricingEngine.lookup(productId, details)
+    freeItems = countFreeItems(bundles, quantityToBuy) # Calculating free items
+    return {"id": productId, "name": details[0], "brand": details[1], "origin": details[4], "paidQty": quantityToBuy, "totalQty": quantityToBuy + freeItems, "price": sellingPrice, "cost": costPrice}
+
+# Helper Function for validating and applying a whole sales cart at once.
+def applySaleCart(productDataDict, saleLines, pricingEngine=None, reservations=None, cartId=None):
+    """
+    Helper Function
+    Validating a whole sales cart against the stock and, only if every line can be
+    served, taking the items (paid + free) out of stock.
+    Repeated product IDs are checked against the stock together. Stock held by
+    other carts (see ReservationBook) is not available to this one.
+
+    · Parameters:
+        productDataDict (dict or ProductStore): The product data, modified directly.
+        saleLines (list): (productId, quantityToBuy) pairs.
+        pricingEngine (PricingEngine): Optional pricing rules, see pricing.py.
+        reservations (ReservationBook): Optional stock held by carts; hold its lock.
+        cartId (int): The cart being sold, whose own held stock may be used.
+    · Returns:
+        tuple: (cart, previousValues) where cart is the list of sale items (see
+               createSaleItem) and previousValues maps each touched product ID to its
+               (Quantity, CostPrice) before the sale, for restoreProductValues.
+    · Raises:
+        InventoryError: If the cart is empty, a product ID is unknown, a quantity is not a
+                        natural number or there is not enough stock. Nothing is changed then.
+    """
+    if not saleLines:
+        raise InventoryError(EMPTY_ORDER, "The cart is empty.")
+    cart = []
+    required = {}
+    for productId, quantityToBuy in saleLines:
+        if productId not in productDataDict:
+            raise InventoryError(UNKNOWN_PRODUCT, "Product ID " + str(productId) + " not found in inventory.", productId)
+        if quantityToBuy < 1:
+            raise InventoryError(INVALID_QUANTITY, "Quantity for product ID " + str(productId) + " must be 1 or greater.", productId)
+        item = createSaleItem(productId, productDataDict[productId], quantityToBuy, pricingEngine)
+        cart.append(item)
+        required[productId] = required.get(productId, 0) + item["totalQty"]
+    for productId, totalItemsToRemove in required.items():
+        available = productDataDict[productId][2]
+        if reservations is not None:
+            available -= reservations.heldByOthers(productId, cartId)
+        if totalItemsToRemove > available: # Checking stock availability
+            raise InventoryError(NOT_ENOUGH_STOCK, "Not enough stock for product ID " + str(productId) + ": " + str(totalItemsToRemove) + " needed (including free items), " + str(max(available, 0)) + " available.", productId)
+    previousValues = {}
+    for productId, totalItemsToRemove in required.items():
+        details = productDataDict[productId]
+        previousValues[productId] = (details[2], details[3])
+        details[2] = details[2] - totalItemsToRemove
+    return cart, previousValues
+
+# Helper Function for validating and applying a whole restock order at once.
+def applyRestockOrder(productDataDict, restockLines):
+    """
+    Helper Function
+    Validating a whole restock order and, only if every line is valid, adding the
+    quantities to stock and setting the new cost prices.
+
+    · Parameters:
+        productDataDict (dict or ProductStore): The product data, modified directly.
+        restockLines (list): (productId, qtyToAdd, newCostPrice) tuples.
+    · Returns:
+        tuple: (restockList, previousValues) where restockList holds one
+               {"id", "name", "brand", "qty", "cost", "origin"} dict per line and
+               previousValues maps each touched product ID to its (Quantity, CostPrice)
+               before the restock, for restoreProductValues.
+    · Raises:
+        InventoryError: If the order is empty, a product ID is unknown, a quantity is not
+                        between 1 and 999 or a cost price is not a natural number.
+                        Nothing is changed then.
+    """
+    if not restockLines:
+        raise InventoryError(EMPTY_ORDER, "The restock order is empty.")
+    for productId, qtyToAdd, newCostPrice in restockLines:
+        if productId not in productDataDict:
+            raise InventoryError(UNKNOWN_PRODUCT, "Product ID " + str(productId) + " not found in inventory.", productId)
+        if qtyToAdd < 1 or qtyToAdd > MAX_RESTOCK_QUANTITY:
+            raise InventoryError(INVALID_QUANTITY, "Quantity for product ID " + str(productId) + " must be between 1 and " + str(MAX_RESTOCK_QUANTITY) + ".", productId)
+        if newCostPrice < 1:
+            raise InventoryError(INVALID_PRICE, "Cost price for product ID " + str(productId) + " must be 1 or greater.", productId)
+    restockList = []
+    previousValues = {}
+    for productId, qtyToAdd, newCostPrice in restockLines:
+        details = productDataDict[productId]
+        if productId not in previousValues:
+            previousValues[productId] = (details[2], details[3])
+        restockList.append({"id": productId, "name": details[0], "brand": details[1], "qty": qtyToAdd, "cost": newCostPrice, "origin": details[4]})
+        details[2] = details[2] + qtyToAdd
+        details[3] = newCostPrice
+    return restockList, previousValues
+
+# Helper Function for undoing the stock changes of a cart or restock order.
+def restoreProductValues(productDataDict, previousValues):
+    """
+    Helper Function
+    Putting back the quantity and cost price of products, e.g. when the invoice of
+    a cart could not be written.
+
+    · Parameters:
+        productDataDict (dict or ProductStore): The product data, modified directly.
+        previousValues (dict): Product ID -> (Quantity, CostPrice) to restore.
+    · Returns:
+        None
+    · Raises:
+        Nothing
+    """
+    for productId, (qty, cost) in previousValues.items():
+        productDataDict[productId][2] = qty
+        productDataDict[productId][3] = cost
+
+# Helper Function for passing a finished transaction on to recorders such as the sales archive.
+def notifyRecorders(recorders, methodName, *arguments):
+    """
+    Helper Function
+    Passing a finished sale or restock on to every recorder (e.g., SalesArchive) by
+    calling recorder.recordSale(...) or recorder.recordRestock(...).
+    A failing recorder never undoes the transaction, it is only reported.
+
+    · Parameters:
+        recorders (list): The recorders, or None.
+        methodName (str): "recordSale" or "recordRestock".
+        *arguments: The arguments passed on to the method:
+                    recordSale(invoiceName, customerName, customerPhone, cart, timestamp)
+                    recordRestock(invoiceName, supplierName, supplierPhone, restockList, previousValues, timestamp)
+    · Returns:
+        None
+    · Raises:
+        (Prints a warning to the console for errors raised by a recorder.)
+    """
+    for recorder in recorders or ():
+        try:
+            getattr(recorder, methodName)(*arguments)
+        except Exception as e:
+            print("Warning: Could not record transaction in " + type(recorder).__name__ + ": " + str(e))
+
+# Helper Function for building the lines of a sales invoice.
+def buildSalesInvoiceLines(customerName, customerPhone, cart):
+    """
+    Helper Function
+    Building the text lines of a sales invoice.
+
+    · Parameters:
+        customerName (str): The customer name.
+        customerPhone (str): The customer phone number.
+        cart (list): The sale items (see createSaleItem).
+    · Returns:
+        list: The invoice lines (str).
+    · Raises:
+        Nothing
+    """
+    # Initializing invoice lines including customer phone
+    invoiceLines = ["--- WeCare Sales Invoice ---", "Customer: " + customerName, "Phone: " + customerPhone, "Date: " + str(datetime.now()), "-"*50]
+    grandTotal = 0
+
+    # Processing cart items for invoice
+    for item in cart:
+        lineTotal = item["paidQty"] * item["price"]
+        grandTotal += lineTotal
+        invoiceLine = (item["name"] + " (" + item["brand"] + ") - Qty: " + str(item["totalQty"]) + " (Paid: " + str(item["paidQty"]) + ") X " + str(item["price"]) + " = " + str(lineTotal))
+        invoiceLines.append(invoiceLine)
+
+    # Extending invoice lines with footer
+    invoiceLines.extend(["-"*50, "Grand Total: Nrs " + str(grandTotal), "-"*50, "Thank you!"])
+    return invoiceLines
+
+# Helper Function for building the lines of a restock invoice.
+def buildRestockInvoiceLines(supplierName, supplierPhone, restockList):
+    """
+    Helper Function
+    Building the text lines of a restock invoice.
+
+    · Parameters:
+        supplierName (str): The supplier name.
+        supplierPhone (str): The supplier phone number.
+        restockList (list): The restock items, {"id", "name", "brand", "qty", "cost", "origin"}.
+    · Returns:
+        list: The invoice lines (str).
+    · Raises:
+        Nothing
+    """
+    # Initializing invoice lines
+    invoiceLines = ["--- WeCare Restock Invoice ---", "Supplier: " + supplierName, "Phone: " + supplierPhone,"Date: " + str(datetime.now()), "-"*50]
+    grandTotalCost = 0
+
+    # Processing restock list for invoice
+    for item in restockList:
+        itemTotal = item["qty"] * item["cost"]
+        grandTotalCost += itemTotal
+        invoiceLine = (item["name"] + " (" + item["brand"] + ") - Qty: " + str(item["qty"]) + " X " + str(item["cost"]) + " = " + str(itemTotal))
+        invoiceLines.append(invoiceLine)
+
+    # Extending invoice lines with footer
+    invoiceLines.extend(["-"*50, "Total Restock Cost: Nrs " + str(grandTotalCost), "-"*50])
+    return invoiceLines
+
+# Class for the stock held by carts that are still being filled.
+class ReservationBook:
+    """
+    Helper Class
+    Keeping track of the stock each open cart holds, so two sessions (e.g. two
+    terminals of the inventory server) cannot both promise the same items. A hold
+    lasts RESERVATION_SECONDS after the cart last changed; expired holds are
+    dropped and their stock is free again. The units held per product are kept
+    as a running total, so checking a product does not look at every cart.
+    Take the lock around checking the stock and holding or taking it out.
+    """
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.holds = {}      # Cart ID -> (expiry time, {product ID: units held})
+        self.held = {}       # Product ID -> units held by all carts
+        self.nextExpiry = None
+        self.cartIds = itertools.count(1)
+
+    def newCartId(self):
+        """
+        Getting a number for a new cart.
+
+        · Returns:
+            int: The cart ID.
+        """
+        return next(self.cartIds)
+
+    def dropExpired(self):
+        """
+        Freeing the stock of every cart whose hold has run out.
+        """
+        now = time.monotonic()
+        if self.nextExpiry is None or now < self.nextExpiry:
+            return
+        for cartId in [cartId for cartId, (expiry, units) in self.holds.items() if expiry <= now]:
+            self.release(cartId)
+        self.nextExpiry = min((expiry for expiry, units in self.holds.values()), default=None)
+
+    def heldByOthers(self, productId, cartId=None):
+        """
+        Counting the units of a product held by carts other than the given one.
+
+        · Parameters:
+            productId (int): The product.
+            cartId (int): The cart whose own hold is not counted, or None.
+        · Returns:
+            int: The units held.
+        """
+        with self.lock:
+            self.dropExpired()
+            held = self.held.get(productId, 0)
+            if cartId in self.holds:
+                held -= self.holds[cartId][1].get(productId, 0)
+            return held
+
+    def hold(self, cartId, units, holdSeconds=RESERVATION_SECONDS):
+        """
+        Replacing the hold of a cart (the stock must have been checked under the lock).
+
+        · Parameters:
+            cartId (int): The cart.
+            units (dict): Product ID -> units to hold (including free items).
+            holdSeconds (float): How long the hold lasts from now.
+        · Returns:
+            float: The time.monotonic() the hold runs out at.
+        """
+        with self.lock:
+            self.release(cartId)
+            expiry = time.monotonic() + holdSeconds
+            self.holds[cartId] = (expiry, dict(units))
+            for productId, count in units.items():
+                self.held[productId] = self.held.get(productId, 0) + count
+            if self.nextExpiry is None or expiry < self.nextExpiry:
+                self.nextExpiry = expiry
+            return expiry
+
+    def release(self, cartId):
+        """
+        Freeing the stock held by a cart, e.g. after its checkout.
+
+        · Parameters:
+            cartId (int): The cart.
+        · Returns:
+            bool: True if the cart held stock, False if it held none (or it expired).
+        """
+        with self.lock:
+            hold = self.holds.pop(cartId, None)
+            if hold is None:
+                return False
+            for productId, count in hold[1].items():
+                remaining = self.held[productId] - count
+                if remaining:
+                    self.held[productId] = remaining
+                else:
+                    del self.held[productId]
+            return True
+
+    def isHeld(self, cartId):
+        """
+        Checking whether a cart still holds its stock.
+
+        · Parameters:
+            cartId (int): The cart.
+        · Returns:
+            bool: True if the hold has not run out yet.
+        """
+        with self.lock:
+            self.dropExpired()
+            return cartId in self.holds
+
+# Class for one committed sale or restock.
+class Invoice:
+    """
+    Helper Class
+    The result of a sale or restock accepted by the Inventory: the items, the
+    invoice text and where it is written, and whether the stock changes are saved
+    in the inventory file yet.
+
+    · Example (Only for demonstration purposes):
+        invoice = inventory.sell("Bob", "9800000000", [(1, 3)])
+        invoice.lines      # The invoice text, one line per item
+        invoice.total()    # Nrs paid
+    """
+
+    def __init__(self, kind, fileName, partyName, partyPhone, items, previousValues, lines, timestamp):
+        self.kind = kind                     # "SALE" or "RESTOCK"
+        self.fileName = fileName             # See generateInvoiceName
+        self.partyName = partyName           # Customer or supplier
+        self.partyPhone = partyPhone
+        self.items = items                   # Sale items (see createSaleItem) or restock items
+        self.previousValues = previousValues # Product ID -> (Quantity, CostPrice) before
+        self.lines = lines                   # The invoice text
+        self.timestamp = timestamp
+        self.filePath = None                 # Where the invoice is (or will be) written
+        self.saved = False                   # True once the stock changes are in the inventory file
+
+    def total(self):
+        """
+        Adding up the invoice.
+
+        · Returns:
+            int: The money paid by the customer, or spent on the restock.
+        """
+        if self.kind == "SALE":
+            return sum(item["paidQty"] * item["price"] for item in self.items)
+        return sum(item["qty"] * item["cost"] for item in self.items)
+
+# Class for the inventory engine, without any console input or output.
+class Inventory:
+    """
+    Main Class
+    The core of the shop: applying sales and restock orders to the products as
+    whole transactions, writing their invoices, saving the stock changes and telling
+    the recorders (archive, running totals, reorder planner) about them.
+    It never asks for input or prints; a rejected transaction raises InventoryError
+    with a code, and nothing is changed then. The menus in operations.py, batch.py
+    and the inventory server are front-ends over it, and other programs can drive
+    it directly.
+
+    · Parameters (constructor):
+        productDataDict (dict or ProductStore): The loaded products, modified directly.
+        productFileName (str): The product file the changes are saved to.
+        pricingEngine (PricingEngine): Optional pricing rules, see pricing.py.
+        recorders (list): Optional recorders, see notifyRecorders.
+        invoiceWriter (InvoiceWriter): Optional background invoice writer; without one
+                                       invoices are written before sell/restock return.
+        productIndex (ProductIndex): Optional search index, kept up to date.
+        autoCommit (bool): If False, stock changes are only saved by commit(), e.g.
+                           once at the end of a batch.
+    Open carts (see newCart) hold their stock in reservations, and every sale
+    leaves the stock they hold alone.
+
+    · Example (Only for demonstration purposes):
+        inventory = Inventory(readProductFile("products.txt"), "products.txt")
+        invoice = inventory.sell("Bob", "9800000000", [(1, 3), (2, 1)])
+        inventory.restock("Supplier", "9800000001", [(1, 10, 480)])
+        cart = inventory.newCart()
+        cart.addLines([(1, 2), (2, 1), (1, 3)])   # Held for RESERVATION_SECONDS
+        invoice = cart.checkout("Bob", "9800000000")
+    """
+
+    def __init__(self, productDataDict, productFileName, pricingEngine=None, recorders=None, invoiceWriter=None, productIndex=None, autoCommit=True):
+        self.products = productDataDict
+        self.productFileName = productFileName
+        self.pricingEngine = pricingEngine or DEFAULT_PRICING
+        self.recorders = recorders
+        self.invoiceWriter = invoiceWriter
+        self.productIndex = productIndex
+        self.autoCommit = autoCommit
+        self.pendingIds = set() # Products changed since the last commit, when not auto-committing
+        self.reservations = ReservationBook() # Stock held by open carts
+
+    def sellingPrice(self, productId):
+        """
+        Getting the selling price per item of a product today.
+
+        · Parameters:
+            productId (int): The ID of the product.
+        · Returns:
+            int: The selling price.
+        """
+        return self.pricingEngine.sellingPrice(productId, self.products[productId])
+
+    def quoteSaleItem(self, productId, quantityToBuy):
+        """
+        Pricing one cart line without selling it.
+
+        · Parameters:
+            productId (int): The ID of the product.
+            quantityToBuy (int): The number of items paid for.
+        · Returns:
+            dict: The sale item, see createSaleItem.
+        """
+        return createSaleItem(productId, self.products[productId], quantityToBuy, self.pricingEngine)
+
+    def newCart(self, holdSeconds=RESERVATION_SECONDS):
+        """
+        Opening a cart whose lines hold their stock until checkout.
+
+        · Parameters:
+            holdSeconds (float): How long the stock stays held after the cart last changed.
+        · Returns:
+            Cart: The empty cart.
+        """
+        return Cart(self, holdSeconds)
+
+    def prepareTransaction(self, kind, partyName, partyPhone, lines, cartId=None):
+        """
+        Validating and applying a sale or restock to the products in memory and
+        building its invoice, without writing anything.
+
+        · Parameters:
+            kind (str): "SALE" or "RESTOCK".
+            partyName (str): The customer or supplier name.
+            partyPhone (str): The customer or supplier phone number.
+            lines (list): (productId, quantityToBuy) pairs for a sale,
+                          (productId, qtyToAdd, newCostPrice) tuples for a restock.
+            cartId (int): The cart being sold, whose held stock it may use.
+        · Returns:
+            Invoice: The transaction; undo it with restoreProductValues(invoice.previousValues).
+        · Raises:
+            InventoryError: If the transaction is not valid. Nothing is changed then.
+        """
+        if kind == "SALE":
+            with self.reservations.lock:
+                items, previousValues = applySaleCart(self.products, lines, self.pricingEngine, self.reservations, cartId)
+            invoiceLines = buildSalesInvoiceLines(partyName, partyPhone, items)
+            invoiceFileName = generateInvoiceName("SALES", partyName)
+        else:
+            items, previousValues = applyRestockOrder(self.products, lines)
+            invoiceLines = buildRestockInvoiceLines(partyName, partyPhone, items)
+            invoiceFileName = generateInvoiceName("RESTOCK", partyName)
+        return Invoice(kind, invoiceFileName, partyName, partyPhone, items, previousValues, invoiceLines, datetime.now())
+
+    def writeTransactionInvoice(self, invoice):
+        """
+        Writing the invoice of a transaction, or handing it to the background writer.
+
+        · Parameters:
+            invoice (Invoice): The transaction; its filePath is set when written or queued.
+        · Returns:
+            bool: True if the invoice was written or queued, False otherwise.
+        """
+        try:
+            if self.invoiceWriter is not None:
+                invoice.filePath = self.invoiceWriter.submit(invoice.fileName, invoice.lines)
+            elif writeInvoice(invoice.fileName, invoice.lines, announce=False):
+                invoice.filePath = invoice.fileName
+        except Exception:
+            pass
+        return invoice.filePath is not None
+
+    def applyTransaction(self, kind, partyName, partyPhone, lines, cartId=None):
+        """
+        Validating and applying a sale or restock to the products in memory and
+        writing (or queueing) its invoice, without saving the stock changes or
+        telling the recorders. If the invoice cannot be written the changes are undone.
+
+        · Parameters:
+            kind (str): "SALE" or "RESTOCK".
+            partyName (str): The customer or supplier name.
+            partyPhone (str): The customer or supplier phone number.
+            lines (list): (productId, quantityToBuy) pairs for a sale,
+                          (productId, qtyToAdd, newCostPrice) tuples for a restock.
+            cartId (int): The cart being sold; its held stock is freed once sold.
+        · Returns:
+            Invoice: The applied transaction.
+        · Raises:
+            InventoryError: If the transaction is not valid or its invoice could not be written.
+        """
+        invoice = self.prepareTransaction(kind, partyName, partyPhone, lines, cartId)
+        if not self.writeTransactionInvoice(invoice):
+            restoreProductValues(self.products, invoice.previousValues)
+            raise InventoryError(INVOICE_FAILED, "Invoice writing failed. Inventory not changed.")
+        if cartId is not None:
+            self.reservations.release(cartId)
+        return invoice
+
+    def commitChanges(self, changedIds):
+        """
+        Saving the stock changes of the given products, or keeping them for commit()
+        when not auto-committing.
+
+        · Parameters:
+            changedIds (iterable): The changed product IDs.
+        · Returns:
+            bool: True if the changes are saved now, False otherwise.
+        """
+        if not self.autoCommit:
+            self.pendingIds.update(changedIds)
+            return False
+        return commitInventoryChanges(self.productFileName, self.products, changedIds)
+
+    def commit(self):
+        """
+        Saving the stock changes kept back since the last commit (autoCommit False).
+
+        · Returns:
+            bool: True if everything is saved, False if saving failed.
+        """
+        if not self.pendingIds:
+            return True
+        if not commitInventoryChanges(self.productFileName, self.products, self.pendingIds):
+            return False
+        self.pendingIds = set()
+        return True
+
+    def recordTransaction(self, invoice):
+        """
+        Telling the search index and the recorders about a finished transaction.
+
+        · Parameters:
+            invoice (Invoice): The transaction.
+        """
+        if self.productIndex is not None:
+            for productId in invoice.previousValues:
+                self.productIndex.update(productId)
+        if invoice.kind == "SALE":
+            notifyRecorders(self.recorders, "recordSale", invoice.fileName, invoice.partyName, invoice.partyPhone, invoice.items, invoice.timestamp)
+        else:
+            notifyRecorders(self.recorders, "recordRestock", invoice.fileName, invoice.partyName, invoice.partyPhone, invoice.items, invoice.previousValues, invoice.timestamp)
+
+    def sell(self, customerName, customerPhone, saleLines):
+        """
+        Selling a whole cart as one transaction.
+
+        · Parameters:
+            customerName (str): The customer name.
+            customerPhone (str): The customer phone number.
+            saleLines (list): (productId, quantityToBuy) pairs.
+        · Returns:
+            Invoice: The sale; invoice.saved is False if the inventory file could not
+                     be updated (or autoCommit is off).
+        · Raises:
+            InventoryError: If the cart is rejected. Nothing is changed then.
+        """
+        invoice = self.applyTransaction("SALE", customerName, customerPhone, saleLines)
+        invoice.saved = self.commitChanges(invoice.previousValues.keys())
+        self.recordTransaction(invoice)
+        return invoice
+
+    def restock(self, supplierName, supplierPhone, restockLines):
+        """
+        Restocking a whole order as one transaction.
+
+        · Parameters:
+            supplierName (str): The supplier name.
+            supplierPhone (str): The supplier phone number.
+            restockLines (list): (productId, qtyToAdd, newCostPrice) tuples.
+        · Returns:
+            Invoice: The restock; invoice.saved is False if the inventory file could
+                     not be updated (or autoCommit is off).
+        · Raises:
+            InventoryError: If the order is rejected. Nothing is changed then.
+        """
+        invoice = self.applyTransaction("RESTOCK", supplierName, supplierPhone, restockLines)
+        invoice.saved = self.commitChanges(invoice.previousValues.keys())
+        self.recordTransaction(invoice)
+        return invoice
+
+# Class for a sales cart that holds its stock until checkout.
+class Cart:
+    """
+    Main Class
+    A sales cart for orders built up over time, e.g. wholesale orders with hundreds
+    of lines. Repeated product IDs are merged into one line, the whole cart is
+    checked against the stock in one pass, and the stock it needs (including free
+    items) is held in the inventory's ReservationBook, so no other session can sell
+    it in the meantime. The hold lasts holdSeconds after the cart last changed.
+    checkout() sells the cart as one transaction: like sell(), the invoice is written
+    first and the stock changes saved second; if either fails the stock is put back.
+
+    · Example (Only for demonstration purposes):
+        cart = inventory.newCart()
+        cart.addLines([(1, 2), (2, 1), (1, 3)])   # Product 1 becomes one line of 5
+        cart.setQuantity(2, 0)                    # Removing product 2
+        invoice = cart.checkout("Bob", "9800000000")
+    """
+
+    def __init__(self, inventory, holdSeconds=RESERVATION_SECONDS):
+        self.inventory = inventory
+        self.holdSeconds = holdSeconds
+        self.cartId = inventory.reservations.newCartId()
+        self.quantities = {} # Product ID -> units paid for, in the order first added
+
+    def lines(self):
+        """
+        Getting the cart as sale lines, one per product.
+
+        · Returns:
+            list: (productId, quantityToBuy) pairs.
+        """
+        return list(self.quantities.items())
+
+    def findProblems(self, quantities):
+        """
+        Checking merged cart lines against the stock not held by other carts, in one
+        pass. Call it with the reservation lock held.
+
+        · Parameters:
+            quantities (dict): Product ID -> units paid for.
+        · Returns:
+            tuple: (problems, needed) where problems lists an InventoryError for every
+                   line that cannot be served and needed maps product ID -> units
+                   (paid + free) for the others.
+        """
+        inventory = self.inventory
+        problems = []
+        needed = {}
+        for productId, quantityToBuy in quantities.items():
+            if productId not in inventory.products:
+                problems.append(InventoryError(UNKNOWN_PRODUCT, "Product ID " + str(productId) + " not found in inventory.", productId))
+                continue
+            if quantityToBuy < 1:
+                problems.append(InventoryError(INVALID_QUANTITY, "Quantity for product ID " + str(productId) + " must be 1 or greater.", productId))
+                continue
+            totalQty = inventory.quoteSaleItem(productId, quantityToBuy)["totalQty"]
+            available = inventory.products[productId][2] - inventory.reservations.heldByOthers(productId, self.cartId)
+            if totalQty > available:
+                problems.append(InventoryError(NOT_ENOUGH_STOCK, "Not enough stock for product ID " + str(productId) + ": " + str(totalQty) + " needed (including free items), " + str(max(available, 0)) + " available.", productId))
+                continue
+            needed[productId] = totalQty
+        return problems, needed
+
+    def holdQuantities(self, quantities):
+        """
+        Making quantities the content of the cart if all of them can be served, and
+        holding their stock. Otherwise the cart and its hold stay as they were.
+
+        · Parameters:
+            quantities (dict): Product ID -> units paid for.
+        · Raises:
+            InventoryError: For the first line that cannot be served, with every
+                            problem found in its problems list.
+        """
+        reservations = self.inventory.reservations
+        with reservations.lock:
+            problems, needed = self.findProblems(quantities)
+            if problems:
+                if len(problems) == 1:
+                    raise problems[0]
+                raise InventoryError(problems[0].code, str(len(problems)) + " lines cannot be served, first: " + str(problems[0]), problems[0].productId, problems)
+            reservations.hold(self.cartId, needed, self.holdSeconds)
+            self.quantities = quantities
+
+    def addLines(self, saleLines):
+        """
+        Adding lines to the cart, merged with the lines already in it.
+        Either every line is added or none is.
+
+        · Parameters:
+            saleLines (list): (productId, quantityToBuy) pairs.
+        · Raises:
+            InventoryError: If any merged line cannot be served (see holdQuantities).
+        """
+        quantities = dict(self.quantities)
+        for productId, quantityToBuy in saleLines:
+            quantities[productId] = quantities.get(productId, 0) + quantityToBuy
+        self.holdQuantities(quantities)
+
+    def add(self, productId, quantityToBuy):
+        """
+        Adding one line to the cart.
+
+        · Parameters:
+            productId (int): The ID of the product.
+            quantityToBuy (int): The number of items paid for.
+        · Returns:
+            dict: The merged line of the product, priced (see createSaleItem).
+        · Raises:
+            InventoryError: If the merged line cannot be served.
+        """
+        self.addLines([(productId, quantityToBuy)])
+        return self.inventory.quoteSaleItem(productId, self.quantities[productId])
+
+    def setQuantity(self, productId, quantityToBuy):
+        """
+        Changing the quantity of a product in the cart; 0 removes it.
+
+        · Parameters:
+            productId (int): The ID of the product.
+            quantityToBuy (int): The new number of items paid for.
+        · Raises:
+            InventoryError: If the new quantity cannot be served.
+        """
+        quantities = dict(self.quantities)
+        if quantityToBuy == 0:
+            quantities.pop(productId, None)
+        else:
+            quantities[productId] = quantityToBuy
+        self.holdQuantities(quantities)
+
+    def available(self, productId):
+        """
+        Counting the units of a product this cart could still hold.
+
+        · Parameters:
+            productId (int): The ID of the product.
+        · Returns:
+            int: The stock minus the units held by other carts.
+        """
+        return max(self.inventory.products[productId][2] - self.inventory.reservations.heldByOthers(productId, self.cartId), 0)
+
+    def isHeld(self):
+        """
+        Checking whether the cart still holds its stock.
+
+        · Returns:
+            bool: False if the cart is empty or its hold has run out.
+        """
+        return bool(self.quantities) and self.inventory.reservations.isHeld(self.cartId)
+
+    def release(self):
+        """
+        Emptying the cart and freeing the stock it holds.
+        """
+        self.inventory.reservations.release(self.cartId)
+        self.quantities = {}
+
+    def checkout(self, customerName, customerPhone):
+        """
+        Selling the cart as one transaction. The cart is checked again, against the
+        stock held by other carts only, so a cart whose hold ran out still sells if
+        the stock is there. Like sell(), the invoice is written (or queued) before
+        the stock changes are saved. If the invoice fails nothing is saved; if
+        saving fails the stock is put back and saved as it was, so no half-written
+        journal record is left. Nothing is recorded then and the cart keeps its hold.
+
+        · Parameters:
+            customerName (str): The customer name.
+            customerPhone (str): The customer phone number.
+        · Returns:
+            Invoice: The sale. The cart is empty afterwards.
+        · Raises:
+            InventoryError: If the cart is rejected, or could not be invoiced or saved.
+                            The stock in memory is as before then.
+        """
+        inventory = self.inventory
+        if not self.quantities:
+            raise InventoryError(EMPTY_ORDER, "The cart is empty.")
+        invoice = inventory.prepareTransaction("SALE", customerName, customerPhone, self.lines(), self.cartId)
+        if not inventory.writeTransactionInvoice(invoice):
+            restoreProductValues(inventory.products, invoice.previousValues)
+            raise InventoryError(INVOICE_FAILED, "Invoice writing failed. Inventory not changed.")
+        changedIds = list(invoice.previousValues)
+        invoice.saved = inventory.commitChanges(changedIds)
+        if inventory.autoCommit and not invoice.saved:
+            restoreProductValues(inventory.products, invoice.previousValues)
+            if not inventory.commitChanges(changedIds): # Saving the stock as it was again
+                raise InventoryError(COMMIT_FAILED, "Inventory file update failed and the stock could not be saved as it was. Restart before selling again; invoice " + invoice.fileName + " is void.")
+            raise InventoryError(COMMIT_FAILED, "Inventory file update failed. Nothing was sold; invoice " + invoice.fileName + " is void.")
+        self.release()
+        inventory.recordTransaction(invoice)
+        return invoice
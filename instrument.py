@@ -0,0 +1,210 @@
+# importing modules
+import atexit
+import collections
+import cProfile
+import functools
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+
+# Environment variables that switch the instrumentation on without a command line flag
+INSTRUMENT_ENV = "WECARE_INSTRUMENT"  # e.g. WECARE_INSTRUMENT=1
+PROFILE_ENV = "WECARE_PROFILE"        # e.g. WECARE_PROFILE=session.prof
+
+# Functions that are timed, as (module, function name) or (module, "Class.method")
+INSTRUMENTED_FUNCTIONS = [
+    ("read", "readProductFile"),
+    ("operations", "displaySellingPrice"),
+    ("operations", "sellProducts"),
+    ("operations", "restockProducts"),
+    ("display", "browseProducts"),
+    ("write", "writeInvoice"),
+    ("write", "saveInvoice"),
+    ("write", "InvoiceWriter.writeOne"),   # Invoices written by the background writer
+    ("write", "writeProductsToFile"),
+    ("write", "commitInventoryChanges"),
+]
+
+# Number of recent calls per function the histograms and percentiles are taken from
+ROLLING_WINDOW = 1000
+# Upper bounds (ms) of the histogram buckets; the last bucket holds everything slower
+HISTOGRAM_BOUNDS_MS = [1, 5, 10, 50, 100, 500, 1000]
+
+# Class for the timings of one function.
+class CallStats:
+    """
+    Helper Class
+    Counting the calls of one function, their total wall time and the durations of
+    the last ROLLING_WINDOW calls, for percentiles and a histogram of recent calls.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.lock = threading.Lock() # Invoices and snapshots are also written by background threads
+        self.calls = 0
+        self.totalMs = 0.0
+        self.recentMs = collections.deque(maxlen=ROLLING_WINDOW)
+
+    def add(self, elapsedMs):
+        """
+        Recording one call.
+
+        · Parameters:
+            elapsedMs (float): The wall time of the call in milliseconds.
+        """
+        with self.lock:
+            self.calls += 1
+            self.totalMs += elapsedMs
+            self.recentMs.append(elapsedMs)
+
+    def histogram(self):
+        """
+        Counting the recent calls per bucket of HISTOGRAM_BOUNDS_MS.
+
+        · Returns:
+            list: (label, count) pairs, e.g. ("<1ms", 12), the last being (">1000ms", count).
+        """
+        counts = [0] * (len(HISTOGRAM_BOUNDS_MS) + 1)
+        with self.lock:
+            recent = list(self.recentMs)
+        for elapsedMs in recent:
+            bucket = 0
+            while bucket < len(HISTOGRAM_BOUNDS_MS) and elapsedMs >= HISTOGRAM_BOUNDS_MS[bucket]:
+                bucket += 1
+            counts[bucket] += 1
+        labels = ["<" + str(bound) + "ms" for bound in HISTOGRAM_BOUNDS_MS] + [">" + str(HISTOGRAM_BOUNDS_MS[-1]) + "ms"]
+        return list(zip(labels, counts))
+
+# Class for timing the slow paths of the program while it runs.
+class Instrumentation:
+    """
+    Main Class
+    Timing the functions in INSTRUMENTED_FUNCTIONS by replacing them, in every
+    module that uses them, with a wrapper that records their wall time. Nothing is
+    replaced unless enable() is called, so there is no cost when it is switched off.
+    Optionally a cProfile profile is recorded for the whole session.
+
+    · Example (Only for demonstration purposes):
+        instrumentation = Instrumentation()
+        instrumentation.enable()
+        ...
+        instrumentation.printSummary()
+    """
+
+    def __init__(self, profileFileName=None):
+        self.stats = {}
+        self.profileFileName = profileFileName
+        self.profiler = None
+        self.enabled = False
+
+    def wrap(self, name, function):
+        """
+        Building the timing wrapper of one function.
+
+        · Parameters:
+            name (str): The name shown in the summary.
+            function (function): The function to time.
+        · Returns:
+            function: The wrapper.
+        """
+        callStats = self.stats.setdefault(name, CallStats(name))
+
+        @functools.wraps(function)
+        def timedFunction(*arguments, **keywordArguments):
+            start = time.perf_counter()
+            try:
+                return function(*arguments, **keywordArguments)
+            finally:
+                callStats.add((time.perf_counter() - start) * 1000)
+        return timedFunction
+
+    def enable(self):
+        """
+        Replacing the instrumented functions in every loaded module that refers to
+        them (e.g., also "from write import writeInvoice" in engine.py), starting
+        the profiler if a profile file was given, and printing the summary at exit.
+        Modules must be imported before this is called.
+        """
+        if self.enabled:
+            return
+        self.enabled = True
+        for moduleName, functionName in INSTRUMENTED_FUNCTIONS:
+            module = sys.modules.get(moduleName)
+            if "." in functionName:
+                # Methods are replaced on their class
+                className, methodName = functionName.split(".")
+                ownerClass = getattr(module, className, None)
+                if ownerClass is not None:
+                    setattr(ownerClass, methodName, self.wrap(functionName, getattr(ownerClass, methodName)))
+                continue
+            original = getattr(module, functionName, None)
+            if original is None:
+                continue
+            timedFunction = self.wrap(functionName, original)
+            for loadedModule in list(sys.modules.values()):
+                if getattr(loadedModule, functionName, None) is original:
+                    setattr(loadedModule, functionName, timedFunction)
+        if self.profileFileName:
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+        atexit.register(self.finish)
+
+    def printSummary(self):
+        """
+        Printing the calls, total and mean time, and the p50/p99/max and histogram
+        of the recent calls of every instrumented function that was called.
+
+        · Returns:
+            None: This function only prints to the console.
+        """
+        print("\n" + "=" * 100)
+        print("Function\t\t\tCalls\tTotal ms\tMean ms\tp50 ms\tp99 ms\tMax ms")
+        print("-" * 100)
+        for name, callStats in self.stats.items():
+            if not callStats.calls:
+                continue
+            with callStats.lock:
+                recent = sorted(callStats.recentMs)
+            p50 = recent[int(round(0.5 * (len(recent) - 1)))]
+            p99 = recent[int(round(0.99 * (len(recent) - 1)))]
+            print(name.ljust(32) + str(callStats.calls) + "\t" + str(round(callStats.totalMs, 1)) + "\t\t" + str(round(callStats.totalMs / callStats.calls, 2)) + "\t" + str(round(p50, 2)) + "\t" + str(round(p99, 2)) + "\t" + str(round(recent[-1], 2)))
+            print("    last " + str(len(recent)) + " calls: " + "  ".join(label + ":" + str(count) for label, count in callStats.histogram() if count))
+        print("=" * 100)
+
+    def finish(self):
+        """
+        Stopping the profiler (writing the profile and its top functions) and printing
+        the summary; run at exit.
+        """
+        if self.profiler is not None:
+            self.profiler.disable()
+            self.profiler.dump_stats(self.profileFileName)
+            output = io.StringIO()
+            pstats.Stats(self.profiler, stream=output).sort_stats("cumulative").print_stats(15)
+            print(output.getvalue())
+            print("Profile written to '" + self.profileFileName + "' (open it with: python -m pstats " + self.profileFileName + ").")
+            self.profiler = None
+        self.printSummary()
+
+# Function for switching the instrumentation on from a flag or the environment.
+def enableInstrumentation(enabled=False, profileFileName=None):
+    """
+    Main Function
+    Switching the instrumentation on if it was asked for on the command line or
+    through the WECARE_INSTRUMENT / WECARE_PROFILE environment variables.
+
+    · Parameters:
+        enabled (bool): True if the command line asked for it.
+        profileFileName (str): Optional file for a cProfile profile of the session.
+    · Returns:
+        Instrumentation: The enabled instrumentation, or None if it is switched off.
+    """
+    profileFileName = profileFileName or os.environ.get(PROFILE_ENV)
+    if not (enabled or profileFileName or os.environ.get(INSTRUMENT_ENV, "") not in ("", "0")):
+        return None
+    instrumentation = Instrumentation(profileFileName)
+    instrumentation.enable()
+    return instrumentation
@@ -0,0 +1,118 @@
+# importing modules
+import argparse
+import multiprocessing
+import os
+import random
+import tempfile
+import threading
+import time
+
+# importing user made modules
+from read import readProductFile
+from write import writeProductsToFile
+from server import createServer
+from client import InventoryClient
+
+# Function run by each simulated terminal.
+def runTerminal(port, terminalNumber, checkouts, productCount, seed):
+    """
+    Helper Function
+    Simulating one till: connecting to the server and sending a number of small
+    carts of random products.
+
+    · Parameters:
+        port (int): The TCP port of the inventory server.
+        terminalNumber (int): The number of this terminal, used in customer names.
+        checkouts (int): The number of carts to send.
+        productCount (int): The number of products in the catalogue (IDs 1..productCount).
+        seed (int): Seed for choosing products, so runs can be repeated.
+    · Returns:
+        dict: Product ID -> items taken out of stock by the accepted carts.
+    """
+    randomizer = random.Random(seed)
+    client = InventoryClient(port=port)
+    taken = {}
+    for checkout in range(checkouts):
+        productId = randomizer.randint(1, productCount)
+        quantityToBuy = randomizer.randint(1, 3)
+        response = client.sell("T" + str(terminalNumber) + "C" + str(checkout), "0", [(productId, quantityToBuy)])
+        if response["ok"]:
+            taken[productId] = taken.get(productId, 0) + quantityToBuy + quantityToBuy // 3
+    client.close()
+    return taken
+
+# Function for running the load test.
+def runLoadTest(terminalCounts, checkoutsPerTerminal, productCount, initialStock):
+    """
+    Main Function
+    Starting an inventory server on a synthetic catalogue and measuring checkout
+    throughput with an increasing number of terminals running at the same time.
+    After every round the stock held by the server, and the stock reloaded from
+    disk, are compared with the initial stock minus everything the terminals were
+    told they sold, to prove no update was lost.
+
+    · Parameters:
+        terminalCounts (list): The numbers of terminals to try, e.g. [1, 2, 4, 8].
+        checkoutsPerTerminal (int): The number of carts each terminal sends.
+        productCount (int): The number of products in the synthetic catalogue.
+        initialStock (int): The starting quantity of every product.
+    · Returns:
+        bool: True if no update was lost in any round, False otherwise.
+    """
+    workDirectory = tempfile.mkdtemp(prefix="wecare_loadtest_")
+    os.chdir(workDirectory) # The server writes its invoices into the working directory
+    productFileName = os.path.join(workDirectory, "products.txt")
+    products = {}
+    for productId in range(1, productCount + 1):
+        products[productId] = ["Product" + str(productId), "Brand" + str(productId % 50), initialStock, 100, "Origin" + str(productId % 10)]
+    writeProductsToFile(productFileName, products)
+
+    store = readProductFile(productFileName)
+    server = createServer(store, productFileName, port=0)
+    port = server.server_address[1]
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    expected = dict((productId, initialStock) for productId in range(1, productCount + 1))
+    allConsistent = True
+    print("Terminals\tCheckouts\tSeconds\tCheckouts/sec")
+    pool = multiprocessing.Pool(max(terminalCounts))
+    for roundNumber, terminalCount in enumerate(terminalCounts):
+        arguments = [(port, terminal, checkoutsPerTerminal, productCount, roundNumber * 1000 + terminal) for terminal in range(terminalCount)]
+        start = time.perf_counter()
+        results = pool.starmap(runTerminal, arguments)
+        elapsed = time.perf_counter() - start
+        for taken in results:
+            for productId, quantity in taken.items():
+                expected[productId] -= quantity
+        totalCheckouts = terminalCount * checkoutsPerTerminal
+        print(str(terminalCount) + "\t\t" + str(totalCheckouts) + "\t\t" + str(round(elapsed, 2)) + "\t" + str(round(totalCheckouts / elapsed, 1)))
+        lost = [productId for productId in expected if store[productId][2] != expected[productId]]
+        if lost:
+            allConsistent = False
+            print("Lost updates in memory for " + str(len(lost)) + " products!")
+    pool.close()
+    pool.join()
+    server.shutdown()
+    server.server_close()
+
+    # Reloading from disk (snapshot + journal) and checking it matches as well
+    reloaded = readProductFile(productFileName)
+    lostOnDisk = [productId for productId in expected if reloaded[productId][2] != expected[productId]]
+    if lostOnDisk:
+        allConsistent = False
+        print("Lost updates on disk for " + str(len(lostOnDisk)) + " products!")
+    print("No lost updates." if allConsistent else "Lost updates detected.")
+    print("Work files left in " + workDirectory)
+    return allConsistent
+
+# Main Program Execution Block
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test for the WeCare inventory server")
+    parser.add_argument("--terminals", default="1,2,4,8", help="comma-separated numbers of concurrent terminals")
+    parser.add_argument("--checkouts", type=int, default=500, help="carts sent by each terminal per round")
+    parser.add_argument("--products", type=int, default=50, help="products in the synthetic catalogue (fewer means more contention)")
+    parser.add_argument("--stock", type=int, default=1000000, help="starting quantity of every product")
+    options = parser.parse_args()
+    terminalCounts = [int(count) for count in options.terminals.split(",")]
+    if not runLoadTest(terminalCounts, options.checkouts, options.products, options.stock):
+        raise SystemExit(1)
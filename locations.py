@@ -0,0 +1,751 @@
+# importing modules
+import argparse
+import atexit
+import glob
+import itertools
+import os
+import sys
+import time
+from collections.abc import Mapping
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+# importing user made modules
+from read import readProductFile, hasCurrentCache, getValidProductId, getNaturalNumber, askToContinue
+from write import commitInventoryChanges, writeProductsToFile, generateInvoiceName, writeInvoice
+from binformat import isBinaryProductFile
+from aggregates import RunningTotals
+from engine import InventoryError, UNKNOWN_PRODUCT, INVALID_QUANTITY, NOT_ENOUGH_STOCK, INVOICE_FAILED
+
+# Codes of the transfer errors raised by LocationSet (InventoryError.code)
+UNKNOWN_LOCATION = "unknown_location"
+LOCATION_NOT_OWNED = "location_not_owned"
+CANNOT_ADD_PRODUCT = "cannot_add_product"
+
+# Counter making the names of the transfer files sent by one process unique
+transferCounter = itertools.count()
+
+# Helper Function for getting the shard file of one location.
+def getShardFileName(fileName, location):
+    """
+    Helper Function
+    Building the name of the product file (shard) of one store or warehouse, next
+    to the main product file (e.g., "products.pokhara.txt" for "products.txt").
+
+    · Parameters:
+        fileName (str): The main product file name (e.g., "products.txt").
+        location (str): The name of the location (e.g., "pokhara").
+    · Returns:
+        str: The name of the shard file.
+    · Raises:
+        Nothing
+    """
+    base, extension = os.path.splitext(fileName)
+    return base + "." + location + extension
+
+# Helper Function for finding the locations that have a shard file.
+def findLocations(fileName):
+    """
+    Helper Function
+    Finding every location with a shard file next to the main product file.
+
+    · Parameters:
+        fileName (str): The main product file name (e.g., "products.txt").
+    · Returns:
+        list: The location names, sorted; empty if the shop has a single product file.
+    · Raises:
+        Nothing
+    """
+    base, extension = os.path.splitext(fileName)
+    locations = []
+    for shardFileName in glob.glob(glob.escape(base) + ".*" + extension):
+        location = shardFileName[len(base) + 1:len(shardFileName) - len(extension)]
+        if location:
+            locations.append(location)
+    return sorted(locations)
+
+# Helper Function for checking the name of a new location.
+def isValidLocationName(location):
+    """
+    Helper Function
+    Checking that a location name can be used in a file name (letters, digits, "-"
+    and "_" only), so every shard is found again by findLocations.
+
+    · Parameters:
+        location (str): The name of the location.
+    · Returns:
+        bool: True if the name can be used, False otherwise.
+    · Raises:
+        Nothing
+    """
+    return bool(location) and all(character.isalnum() or character in "-_" for character in location)
+
+# Helper Function for loading one shard in a worker process.
+def loadShard(shardFileName, useCache=True):
+    """
+    Helper Function
+    Loading one shard, run in a worker process of the pool in LocationSet.load.
+
+    · Parameters:
+        shardFileName (str): The shard file.
+        useCache (bool): False to parse the shard even if its snapshot cache is current.
+    · Returns:
+        tuple: (products, how they were loaded), as the loadedFrom attribute is not
+               sent back from the worker.
+    """
+    productDataDict = readProductFile(shardFileName, useCache=useCache)
+    return productDataDict, getattr(productDataDict, "loadedFrom", "parsed")
+
+# Helper Function for claiming a location for this process.
+def claimLocation(shardFileName, force=False):
+    """
+    Helper Function
+    Marking this process as the owner of a shard, by writing its process ID to the
+    "<shard>.owner" file. Only the owner writes the shard's journal and snapshot;
+    other processes send it stock through its transfer inbox (see sendTransfer).
+
+    · Parameters:
+        shardFileName (str): The shard file (batch.py and server.py claim any product
+                             file they write the same way).
+        force (bool): True to take the shard over even if another process claimed it
+                      (e.g., one that crashed without removing its marker).
+    · Returns:
+        bool: True if this process now owns the shard, False if another process
+              claimed it (or the marker could not be written).
+    · Raises:
+        (Prints an error message if the marker cannot be written.)
+    """
+    ownerFileName = shardFileName + ".owner"
+    try:
+        if force and os.path.exists(ownerFileName):
+            os.remove(ownerFileName)
+        # Creating the marker only if it does not exist, in one step, so two processes
+        # starting together cannot both own the shard
+        descriptor = os.open(ownerFileName, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+    except FileExistsError:
+        return False
+    except OSError as e:
+        print("Error claiming '" + shardFileName + "': " + str(e))
+        return False
+    with os.fdopen(descriptor, "w") as file:
+        file.write(str(os.getpid()) + "\n")
+    return True
+
+# Helper Function for giving a location up again.
+def releaseLocation(shardFileName):
+    """
+    Helper Function
+    Removing the owner marker of a shard written by claimLocation, if it is still
+    this process's.
+
+    · Parameters:
+        shardFileName (str): The shard file.
+    · Returns:
+        None
+    · Raises:
+        Nothing
+    """
+    ownerFileName = shardFileName + ".owner"
+    try:
+        with open(ownerFileName) as file:
+            ownerId = file.read().strip()
+        if ownerId == str(os.getpid()):
+            os.remove(ownerFileName)
+    except OSError:
+        pass
+
+# Helper Function for sending stock to the transfer inbox of a location.
+def sendTransfer(shardFileName, fromLocation, productId, details, quantity):
+    """
+    Helper Function
+    Sending units of a product to another location as one file in the inbox of its
+    shard ("<shard>.transfers/"), holding the units moved rather than a quantity.
+    The process that owns the shard adds them to its stock (see receiveTransfers),
+    so its journal and snapshot are only ever written by one process.
+    The file is written under a temporary name and then renamed, so the owner never
+    reads half of it.
+
+    · Parameters:
+        shardFileName (str): The shard file of the destination.
+        fromLocation (str): The location the units leave.
+        productId (int): The SKU (product ID).
+        details (list): The product details at the source [name, brand, qty, cost, origin].
+        quantity (int): The units moved.
+    · Returns:
+        bool: True if the transfer was sent, False otherwise.
+    · Raises:
+        (Prints an error message if the file cannot be written.)
+    """
+    inboxName = shardFileName + ".transfers"
+    transferFileName = os.path.join(inboxName, str(time.time_ns()) + "-" + str(os.getpid()) + "-" + str(next(transferCounter)) + ".txt")
+    try:
+        os.makedirs(inboxName, exist_ok=True)
+        with open(transferFileName + ".tmp", "w") as file:
+            file.write(fromLocation + "," + str(productId) + "," + str(quantity) + "," + str(details[3]) + "," + details[0] + "," + details[1] + "," + details[4] + "\n")
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(transferFileName + ".tmp", transferFileName)
+        return True
+    except OSError as e:
+        print("Error sending the transfer to '" + shardFileName + "': " + str(e))
+        return False
+
+# Helper Function for reading the transfers waiting in the inbox of a location.
+def readPendingTransfers(shardFileName, includeReceiving=False):
+    """
+    Helper Function
+    Reading the transfers sent to a shard that its owner has not added yet, oldest first.
+    A transfer the owner is adding is renamed to "<file>.receiving-<quantity before>"
+    (or "-new" for a product the shard did not carry) first, see receiveTransfers.
+
+    · Parameters:
+        shardFileName (str): The shard file.
+        includeReceiving (bool): True to include the transfers being added (the owner
+                                 checks them after a crash), False to leave them out.
+    · Returns:
+        list: (transfer file, from location, product ID, quantity, [name, brand, qty, cost, origin],
+              quantity before) for every transfer, where the quantity before is None for
+              transfers not being added yet, "new" or an int; unreadable files are skipped.
+    · Raises:
+        Nothing
+    """
+    inboxName = shardFileName + ".transfers"
+    transferFileNames = glob.glob(os.path.join(glob.escape(inboxName), "*.txt"))
+    if includeReceiving:
+        transferFileNames += glob.glob(os.path.join(glob.escape(inboxName), "*.txt.receiving-*"))
+    transfers = []
+    for transferFileName in sorted(transferFileNames):
+        try:
+            with open(transferFileName) as file:
+                fromLocation, productId, quantity, costPrice, name, brand, origin = file.read().strip().split(",")
+            before = None
+            if ".receiving-" in transferFileName:
+                before = transferFileName.rsplit(".receiving-", 1)[1]
+                before = before if before == "new" else int(before)
+            transfers.append((transferFileName, fromLocation, int(productId), int(quantity), [name, brand, int(quantity), int(costPrice), origin], before))
+        except (OSError, ValueError):
+            # A file removed by the owner in the meantime
+            continue
+    return transfers
+
+# Helper Function for removing a transfer file that has been added.
+def removeTransferFile(transferFileName):
+    """
+    Helper Function
+    Removing a transfer file from an inbox once its stock is saved.
+
+    · Parameters:
+        transferFileName (str): The transfer file.
+    · Returns:
+        None
+    · Raises:
+        (Prints a warning if the file cannot be removed.)
+    """
+    try:
+        os.remove(transferFileName)
+    except OSError as e:
+        print("Warning: Could not remove the received transfer '" + transferFileName + "': " + str(e))
+
+# Class for a read-only view over the stock of every location.
+class MergedProducts(Mapping):
+    """
+    Helper Class
+    Showing the catalogues of several locations as one, without copying them: a
+    product's details come from the first location that has it, with the quantity
+    added up over all locations. It can be browsed with ProductTableView like a
+    single catalogue.
+    """
+
+    def __init__(self, stores):
+        self.stores = stores # Location -> products
+        self.sizes = None    # Shard sizes the cached count was taken at
+        self.count = 0
+
+    def __getitem__(self, productId):
+        details = None
+        totalQuantity = 0
+        for productDataDict in self.stores.values():
+            if productId in productDataDict:
+                if details is None:
+                    details = list(productDataDict[productId])
+                totalQuantity += productDataDict[productId][2]
+        if details is None:
+            raise KeyError(productId)
+        details[2] = totalQuantity
+        return details
+
+    def __contains__(self, productId):
+        return any(productId in productDataDict for productDataDict in self.stores.values())
+
+    def __iter__(self):
+        seenStores = []
+        for productDataDict in self.stores.values():
+            for productId in productDataDict:
+                if not any(productId in seenStore for seenStore in seenStores):
+                    yield productId
+            seenStores.append(productDataDict)
+
+    def __len__(self):
+        # Counting the distinct products again only when a shard gained or lost products
+        sizes = tuple(len(productDataDict) for productDataDict in self.stores.values())
+        if sizes != self.sizes:
+            self.count = sum(1 for productId in self)
+            self.sizes = sizes
+        return self.count
+
+# Class for the shards of every store and warehouse of the shop.
+class LocationSet:
+    """
+    Main Class
+    Holding the stock of every location, each in its own shard file with its own
+    journal, snapshot cache and running totals, so a sale at one location only
+    appends to that location's journal. Stock can be looked up across locations
+    and moved between two of them without rewriting the other shards.
+    Each shard is written by one process only, the one selling from it (its owner,
+    see claimLocation): stock moved to another location is sent to that location's
+    transfer inbox and added by its owner, so no process writes a journal or
+    snapshot from a copy of the stock that another process has since changed.
+
+    · Example (Only for demonstration purposes):
+        locationSet = LocationSet.load("products.txt", ownLocation="kathmandu")
+        locationSet.stockByLocation(3)              # {"kathmandu": 40, "pokhara": 12}
+        locationSet.transfer(3, 10, "kathmandu", "pokhara")
+    """
+
+    def __init__(self, fileName, stores, pricingEngine=None, ownLocation=None, useCache=True):
+        self.fileName = fileName
+        self.stores = stores             # Location -> products, in location order
+        self.pricingEngine = pricingEngine
+        self.ownLocation = ownLocation   # The location this process sells from and writes
+        self.useCache = useCache
+        self.runningTotals = {}          # Location -> RunningTotals, loaded when first needed
+        self.loadedFrom = {}             # Location -> "cache", "parsed", ...
+        self.pending = {}                # Location -> transfers sent to it but not added yet
+        self.merged = MergedProducts(stores)
+
+    @classmethod
+    def load(cls, fileName, locations=None, workers=None, pricingEngine=None, ownLocation=None, lazy=False, useCache=True):
+        """
+        Loading the shards of the given locations (all of them by default).
+        Shards with an up-to-date snapshot cache are loaded directly, which takes
+        milliseconds; the others are parsed in parallel in a process pool. The
+        shard of ownLocation is loaded in this process, lazily if asked for.
+
+        · Parameters:
+            fileName (str): The main product file name (e.g., "products.txt").
+            locations (list): The locations to load, or None for every shard found.
+            workers (int): The most worker processes, or None for one per CPU.
+            pricingEngine (PricingEngine): Optional pricing rules, see pricing.py.
+            ownLocation (str): The location this process sells from, or None if it
+                               only looks at the stock.
+            lazy (bool): True to parse the products of ownLocation only when first used.
+            useCache (bool): False to parse every shard even if its cache is current.
+        · Returns:
+            LocationSet: The loaded locations.
+        """
+        if locations is None:
+            locations = findLocations(fileName)
+        locationSet = cls(fileName, dict((location, None) for location in locations), pricingEngine, ownLocation, useCache)
+        toParse = []
+        for location in locations:
+            shardFileName = getShardFileName(fileName, location)
+            if location == ownLocation:
+                # A lazily loaded shard cannot be sent between processes either
+                productDataDict = readProductFile(shardFileName, lazy=lazy, useCache=useCache)
+            elif isBinaryProductFile(shardFileName) or (useCache and hasCurrentCache(shardFileName)):
+                # Memory-mapped shards cannot be sent between processes, cached ones need no pool
+                productDataDict = readProductFile(shardFileName, useCache=useCache)
+            else:
+                toParse.append(location)
+                continue
+            locationSet.stores[location] = productDataDict
+            locationSet.loadedFrom[location] = getattr(productDataDict, "loadedFrom", "parsed")
+        if len(toParse) == 1:
+            productDataDict, loadedFrom = loadShard(getShardFileName(fileName, toParse[0]), useCache)
+            locationSet.stores[toParse[0]] = productDataDict
+            locationSet.loadedFrom[toParse[0]] = loadedFrom
+        elif toParse:
+            pool = ProcessPoolExecutor(max_workers=min(workers or os.cpu_count() or 1, len(toParse)))
+            try:
+                shardFileNames = [getShardFileName(fileName, location) for location in toParse]
+                for location, (productDataDict, loadedFrom) in zip(toParse, pool.map(loadShard, shardFileNames, [useCache] * len(toParse))):
+                    locationSet.stores[location] = productDataDict
+                    locationSet.loadedFrom[location] = loadedFrom
+            finally:
+                pool.shutdown()
+        for location in locations:
+            locationSet.pending[location] = readPendingTransfers(getShardFileName(fileName, location))
+        return locationSet
+
+    def shardFileName(self, location):
+        """
+        Getting the shard file of a location.
+
+        · Parameters:
+            location (str): The location.
+        · Returns:
+            str: The shard file name.
+        """
+        return getShardFileName(self.fileName, location)
+
+    def refresh(self, location):
+        """
+        Reading the stock of a location this process does not own again, as its owner
+        may have sold, restocked or received stock since it was loaded, together with
+        the transfers still waiting in its inbox. A memory-mapped shard always shows
+        the current stock, so only its inbox is read again.
+
+        · Parameters:
+            location (str): The location.
+        · Returns:
+            None
+        """
+        shardFileName = self.shardFileName(location)
+        if location != self.ownLocation and not isBinaryProductFile(shardFileName):
+            productDataDict = readProductFile(shardFileName, useCache=self.useCache)
+            self.stores[location] = productDataDict
+            self.loadedFrom[location] = getattr(productDataDict, "loadedFrom", "parsed")
+        self.pending[location] = readPendingTransfers(shardFileName)
+
+    def refreshOthers(self):
+        """
+        Refreshing every location but the one this process owns (see refresh).
+
+        · Returns:
+            None
+        """
+        for location in self.stores:
+            if location != self.ownLocation:
+                self.refresh(location)
+
+    def totalsOf(self, location):
+        """
+        Getting the running totals of a location, loading them the first time.
+        The same object is returned every time, so the menus and transfers share it.
+
+        · Parameters:
+            location (str): The location.
+        · Returns:
+            RunningTotals: The totals of the location's shard.
+        """
+        if location not in self.runningTotals:
+            self.runningTotals[location] = RunningTotals.load(self.shardFileName(location), self.stores[location], self.pricingEngine)
+        return self.runningTotals[location]
+
+    def stockByLocation(self, productId):
+        """
+        Getting the quantity of a product at every location that carries it,
+        counting the units on their way to a location as already there.
+
+        · Parameters:
+            productId (int): The SKU (product ID).
+        · Returns:
+            dict: Location -> quantity, in location order.
+        """
+        stock = {}
+        for location, productDataDict in self.stores.items():
+            inTransit = [transfer[3] for transfer in self.pending.get(location, []) if transfer[2] == productId]
+            if productId in productDataDict or inTransit:
+                stock[location] = (productDataDict[productId][2] if productId in productDataDict else 0) + sum(inTransit)
+        return stock
+
+    def locationsWithStock(self, productId, quantity):
+        """
+        Finding the locations that can serve a quantity of a product on their own.
+
+        · Parameters:
+            productId (int): The SKU (product ID).
+            quantity (int): The quantity needed.
+        · Returns:
+            list: The locations, the one with the most stock first.
+        """
+        stock = self.stockByLocation(productId)
+        return sorted((location for location in stock if stock[location] >= quantity), key=lambda location: -stock[location])
+
+    def transfer(self, productId, quantity, fromLocation, toLocation, invoiceWriter=None):
+        """
+        Moving stock of one product from the location this process owns to another.
+        A transfer note is written first (like an invoice), then the change is
+        appended to the journal of the source shard and the units are sent to the
+        transfer inbox of the destination, whose owner adds them to its stock (see
+        receiveTransfers); the destination shard and the other shards are not
+        written here. If the units cannot be sent, the source is put back.
+
+        · Parameters:
+            productId (int): The SKU (product ID).
+            quantity (int): The units to move.
+            fromLocation (str): The location the units leave, the one this process owns.
+            toLocation (str): The location the units arrive at.
+            invoiceWriter (InvoiceWriter): Optional background writer for the note.
+        · Returns:
+            bool: True if the source was saved and the units sent, False if saving
+                  failed (the stock at the source is then as before the transfer).
+        · Raises:
+            InventoryError: If the locations, product or quantity are not valid, the
+                            source is not owned by this process, or the destination
+                            cannot take the product. Nothing is changed then.
+        """
+        if fromLocation not in self.stores or toLocation not in self.stores or fromLocation == toLocation:
+            raise InventoryError(UNKNOWN_LOCATION, "Choose two different locations from: " + ", ".join(self.stores) + ".", productId)
+        if fromLocation != self.ownLocation:
+            raise InventoryError(LOCATION_NOT_OWNED, "Stock can only be moved out of the location this terminal sells from" + (" (" + self.ownLocation + ")." if self.ownLocation else "."), productId)
+        source = self.stores[fromLocation]
+        if productId not in source:
+            raise InventoryError(UNKNOWN_PRODUCT, "Product ID " + str(productId) + " not found at " + fromLocation + ".", productId)
+        if quantity < 1:
+            raise InventoryError(INVALID_QUANTITY, "Quantity for product ID " + str(productId) + " must be 1 or greater.", productId)
+        details = list(source[productId])
+        sourceQuantity = details[2]
+        if quantity > sourceQuantity:
+            raise InventoryError(NOT_ENOUGH_STOCK, "Not enough stock for product ID " + str(productId) + " at " + fromLocation + ": " + str(quantity) + " needed, " + str(sourceQuantity) + " available.", productId)
+        destinationFileName = self.shardFileName(toLocation)
+        if isBinaryProductFile(destinationFileName) and productId not in self.stores[toLocation]:
+            # A binary product file has a fixed set of products, so its owner could not add this one
+            raise InventoryError(CANNOT_ADD_PRODUCT, toLocation + " does not carry product ID " + str(productId) + " and its binary product file cannot take new products. Convert it to a text file first (see convert.py).", productId)
+
+        # Loading the totals before the stock changes, so they are not worked out from the changed stock
+        sourceTotals = self.totalsOf(fromLocation)
+        name, brand, sourceQuantity, costPrice, origin = details
+        noteLines = ["--- WeCare Stock Transfer ---", "From: " + fromLocation, "To: " + toLocation, "Date: " + str(datetime.now()), "-"*50, name + " (" + brand + ") - Qty: " + str(quantity) + " X " + str(costPrice) + " = " + str(quantity * costPrice), "-"*50]
+        noteFileName = generateInvoiceName("TRANSFER", fromLocation + "-" + toLocation)
+        try:
+            if invoiceWriter is not None:
+                invoiceWriter.submit(noteFileName, noteLines)
+            elif not writeInvoice(noteFileName, noteLines, announce=False):
+                raise IOError("transfer note not written")
+        except Exception:
+            raise InventoryError(INVOICE_FAILED, "Transfer note writing failed. Inventory not changed.", productId)
+
+        source[productId][2] = sourceQuantity - quantity
+        if not commitInventoryChanges(self.shardFileName(fromLocation), source, [productId]):
+            source[productId][2] = sourceQuantity
+            return False
+        if not sendTransfer(destinationFileName, fromLocation, productId, details, quantity):
+            # Putting the units back at the source, so no stock is lost between the shards
+            source[productId][2] = sourceQuantity
+            commitInventoryChanges(self.shardFileName(fromLocation), source, [productId])
+            return False
+        # The transfer moves value out of the source at its cost price, the destination records it on arrival
+        sourceTotals.recordStockChange(brand, -quantity, costPrice)
+        self.pending[toLocation] = readPendingTransfers(destinationFileName)
+        return True
+
+    def receiveTransfers(self, location):
+        """
+        Adding the stock sent to a location this process owns, one transfer at a
+        time, oldest first. Each transfer is saved like a restock (appended to the
+        journal, or a new snapshot for a product the location did not carry) and
+        then removed from the inbox. If a transfer cannot be saved, it is left in
+        the inbox for the next call and the later ones wait behind it.
+        Before it is saved, a transfer file is renamed to hold the quantity the
+        product had before it (see readPendingTransfers). A file left in that state
+        by a crash is added only if the stock still shows that quantity, so a
+        transfer saved just before a crash is not added twice.
+
+        · Parameters:
+            location (str): The location, the one this process owns.
+        · Returns:
+            list: The product IDs whose stock changed.
+        · Raises:
+            InventoryError: If the location is not owned by this process.
+        """
+        if location != self.ownLocation:
+            raise InventoryError(LOCATION_NOT_OWNED, "Only the terminal selling from " + location + " can add the stock sent to it.")
+        shardFileName = self.shardFileName(location)
+        productDataDict = self.stores[location]
+        # Loading the totals before the stock changes, so they are not worked out from the changed stock
+        runningTotals = self.totalsOf(location)
+        changedIds = []
+        for transferFileName, fromLocation, productId, quantity, details, before in readPendingTransfers(shardFileName, True):
+            isNewProduct = productId not in productDataDict
+            currentQuantity = "new" if isNewProduct else productDataDict[productId][2]
+            if isNewProduct and isBinaryProductFile(shardFileName):
+                print("Error: Product ID " + str(productId) + " sent from " + fromLocation + " cannot be added to the binary product file '" + shardFileName + "'.")
+                break
+            if before is not None:
+                # Left by a crash while it was being added: saved if the stock already shows it
+                if (before == "new" and not isNewProduct) or (before != "new" and currentQuantity == before + quantity):
+                    removeTransferFile(transferFileName)
+                    continue
+                if currentQuantity != before:
+                    print("Warning: Cannot tell if the transfer '" + transferFileName + "' was added, check the stock of product ID " + str(productId) + " and remove the file.")
+                    continue
+                receivingFileName = transferFileName
+            else:
+                receivingFileName = transferFileName + ".receiving-" + str(currentQuantity)
+                try:
+                    os.replace(transferFileName, receivingFileName)
+                except OSError as e:
+                    print("Error: Could not add the transfer '" + transferFileName + "': " + str(e))
+                    break
+            if isNewProduct:
+                productDataDict[productId] = details
+                saved = writeProductsToFile(shardFileName, productDataDict)
+            else:
+                productDataDict[productId][2] += quantity
+                saved = commitInventoryChanges(shardFileName, productDataDict, [productId])
+            if not saved:
+                # The file keeps the quantity before, so the next call adds it again
+                if isNewProduct:
+                    del productDataDict[productId]
+                else:
+                    productDataDict[productId][2] -= quantity
+                break
+            runningTotals.recordStockChange(details[1], quantity, productDataDict[productId][3], 1 if isNewProduct else 0)
+            removeTransferFile(receivingFileName)
+            if productId not in changedIds:
+                changedIds.append(productId)
+        self.pending[location] = readPendingTransfers(shardFileName)
+        return changedIds
+
+    def createLocation(self, location, templateProducts):
+        """
+        Adding a new location whose shard holds the given catalogue with no stock.
+
+        · Parameters:
+            location (str): The name of the new location.
+            templateProducts (dict or ProductStore): The catalogue to copy.
+        · Returns:
+            bool: True if the shard was written, False otherwise.
+        """
+        if not isValidLocationName(location):
+            print("Error: A location name may only hold letters, digits, '-' and '_'.")
+            return False
+        productDataDict = {}
+        for productId, details in templateProducts.items():
+            productDataDict[productId] = [details[0], details[1], 0, details[3], details[4]]
+        if not writeProductsToFile(self.shardFileName(location), productDataDict):
+            return False
+        self.stores[location] = readProductFile(self.shardFileName(location))
+        self.pending[location] = []
+        return True
+
+# Helper Function for asking the user for one of the locations.
+def getLocationName(prompt, locations):
+    """
+    Helper Function
+    Getting the name of an existing location from the user.
+
+    · Parameters:
+        prompt (str): The message displayed to the user.
+        locations (iterable): The valid location names.
+    · Returns:
+        str: The location entered.
+    · Raises:
+        (Prompts again if the location is not known.)
+    """
+    while True:
+        location = input(prompt + " (" + ", ".join(locations) + "): ").strip()
+        if location in locations:
+            return location
+        print("Error: Unknown location. Please try again.")
+
+# Function for showing the stock of a product at every location.
+def showLocationStock(locationSet, currentLocation, invoiceWriter=None):
+    """
+    Main Function
+    Showing how many units of a product each location holds, and optionally moving
+    units from this terminal's location to another one.
+
+    · Parameters:
+        locationSet (LocationSet): The loaded locations.
+        currentLocation (str): The location this terminal sells from.
+        invoiceWriter (InvoiceWriter): Optional background writer for transfer notes.
+    · Returns:
+        int: The product ID if a transfer changed the stock at currentLocation, else None.
+    · Raises:
+        (Prints error messages for rejected or failed transfers instead of raising.)
+    """
+    # The other terminals may have changed their stock since it was loaded
+    locationSet.refreshOthers()
+    productId = getValidProductId("Enter Product ID:", locationSet.merged)
+    details = locationSet.merged[productId]
+    stock = locationSet.stockByLocation(productId)
+    print("\n" + details[0] + " (" + details[1] + ")")
+    print("Location\t\tQty")
+    print("-" * 40)
+    for location, quantity in stock.items():
+        print(location + ("  (this terminal)" if location == currentLocation else "") + "\t\t" + str(quantity))
+    print("-" * 40)
+    print("Total\t\t\t" + str(sum(stock.values())))
+    if len(locationSet.stores) < 2 or currentLocation not in stock or not askToContinue("Transfer stock of this product from " + currentLocation + " to another location?"):
+        return None
+    toLocation = getLocationName("Transfer to", [location for location in locationSet.stores if location != currentLocation])
+    quantity = getNaturalNumber("Enter quantity to transfer:")
+    try:
+        if not locationSet.transfer(productId, quantity, currentLocation, toLocation, invoiceWriter):
+            print("Error: The transfer could not be saved. Stock not changed.")
+            return None
+    except InventoryError as e:
+        print("Error: " + str(e))
+        return None
+    print(str(quantity) + " " + details[0] + " sent from " + currentLocation + " to " + toLocation + ".")
+    return productId
+
+# Main Program Execution Block
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stock across the WeCare stores and warehouses (one product file per location)")
+    parser.add_argument("--file", default="products.txt", help="main product file, shards are named like products.<location>.txt")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("list", help="list the locations and their number of products and units")
+    stockParser = subparsers.add_parser("stock", help="stock of one product at every location")
+    stockParser.add_argument("sku", type=int)
+    transferParser = subparsers.add_parser("transfer", help="move stock of one product between two locations")
+    transferParser.add_argument("sku", type=int)
+    transferParser.add_argument("quantity", type=int)
+    transferParser.add_argument("fromLocation")
+    transferParser.add_argument("toLocation")
+    transferParser.add_argument("--force", action="store_true", help="move the stock even if a terminal seems to be selling from the source location")
+    createParser = subparsers.add_parser("create", help="add a location, copying the catalogue of the main product file with no stock")
+    createParser.add_argument("location")
+    options = parser.parse_args()
+
+    # a transfer acts for the source location, which no running terminal may be writing
+    ownLocation = None
+    if options.command == "transfer" and options.fromLocation in findLocations(options.file):
+        ownLocation = options.fromLocation
+        if not claimLocation(getShardFileName(options.file, ownLocation), options.force):
+            print("A terminal seems to be selling from '" + ownLocation + "' (see '" + getShardFileName(options.file, ownLocation) + ".owner'). Move the stock from that terminal (menu option 6), or use --force if it is no longer running.")
+            sys.exit(1)
+        atexit.register(releaseLocation, getShardFileName(options.file, ownLocation))
+
+    start = time.perf_counter()
+    locationSet = LocationSet.load(options.file, ownLocation=ownLocation)
+    loadTime = (time.perf_counter() - start) * 1000
+    if options.command == "create":
+        if options.location in locationSet.stores:
+            print("Location '" + options.location + "' already exists.")
+            sys.exit(1)
+        if not locationSet.createLocation(options.location, readProductFile(options.file)):
+            sys.exit(1)
+        print("Created '" + locationSet.shardFileName(options.location) + "'.")
+    elif not locationSet.stores:
+        print("No locations found. Create one with: python locations.py create <location>")
+        sys.exit(1)
+    elif options.command == "list":
+        print("Loaded " + str(len(locationSet.stores)) + " locations in " + str(round(loadTime, 1)) + " ms")
+        print("Location\t\tProducts\tUnits\tIn transit\tLoaded via")
+        for location, productDataDict in locationSet.stores.items():
+            units = productDataDict.totalUnits() if hasattr(productDataDict, "totalUnits") else sum(details[2] for details in productDataDict.values())
+            inTransit = sum(transfer[3] for transfer in locationSet.pending[location])
+            print(location + "\t\t" + str(len(productDataDict)) + "\t\t" + str(units) + "\t" + str(inTransit) + "\t\t" + locationSet.loadedFrom.get(location, "parsed"))
+    elif options.command == "stock":
+        stock = locationSet.stockByLocation(options.sku)
+        if not stock:
+            print("Product ID " + str(options.sku) + " not found at any location.")
+            sys.exit(1)
+        for location, quantity in stock.items():
+            print(location + "\t" + str(quantity))
+        print("Total\t" + str(sum(stock.values())))
+    elif options.command == "transfer":
+        try:
+            # adding the stock sent to the source first, as no terminal is there to do it
+            if ownLocation is not None:
+                locationSet.receiveTransfers(ownLocation)
+            if not locationSet.transfer(options.sku, options.quantity, options.fromLocation, options.toLocation):
+                print("Error: The transfer could not be saved. Stock not changed.")
+                sys.exit(1)
+        except InventoryError as e:
+            print("Error: " + str(e))
+            sys.exit(1)
+        print("Sent " + str(options.quantity) + " of product ID " + str(options.sku) + " from " + options.fromLocation + " to " + options.toLocation + ".")
@@ -1,47 +1,174 @@
 # importing modules
-from read import readProductFile, getNaturalNumber
-from operations import displayInventory, sellProducts, restockProducts
+import argparse
+import atexit
+import time
+from datetime import datetime
+from read import readProductFile, getNaturalNumber, getPeakMemoryMb, askToContinue
+from operations import sellProducts, restockProducts
+from search import ProductIndex
+from display import ProductTableView, browseProducts
+from write import InvoiceWriter
+from archive import SalesArchive
+from aggregates import RunningTotals, displayDashboard
+from reorder import ReorderPlanner, displayReorderSuggestions
+from pricing import PricingEngine, PRICING_FILE
+from instrument import enableInstrumentation
+from engine import Inventory
+from locations import LocationSet, findLocations, getShardFileName, getLocationName, claimLocation, releaseLocation, showLocationStock
 
 # Main Program Execution Block
 if __name__ == "__main__":
-    # setting product file name to a variable for passing to functions 
-    productFileName = "products.txt" 
     # designing CLI
     print("======================================")
     print("   WeCare Inventory Management System ")
     print("======================================")
     
+    # reading command line options
+    parser = argparse.ArgumentParser(description="WeCare Inventory Management System")
+    parser.add_argument("--lazy", action="store_true", help="parse each product only when it is first used")
+    parser.add_argument("--file", default="products.txt", help="product file to use, a .bin file is opened as a memory-mapped binary product file")
+    parser.add_argument("--no-cache", dest="useCache", action="store_false", help="parse the product file even if its cached snapshot is up to date")
+    parser.add_argument("--pricing", default=PRICING_FILE, help="pricing rules (markups, bundles, promotions)")
+    parser.add_argument("--location", help="store or warehouse this terminal sells from, when the stock is kept in one file per location (products.<location>.txt)")
+    parser.add_argument("--instrument", action="store_true", help="time the slow paths and print a summary at exit (or set WECARE_INSTRUMENT=1)")
+    parser.add_argument("--profile", help="also write a cProfile profile of the session to this file (or set WECARE_PROFILE)")
+    options = parser.parse_args()
+    # timing of readProductFile, writeInvoice, writeProductsToFile etc., off unless asked for
+    instrumentation = enableInstrumentation(options.instrument, options.profile)
+    # setting product file name to a variable for passing to functions 
+    productFileName = options.file
+
+    # one product file per location if the shop has several, see locations.py
+    locations = findLocations(productFileName)
+    if options.location is not None and options.location not in locations:
+        print("Unknown location '" + options.location + "'. Create it with: python locations.py create " + options.location)
+        raise SystemExit(1)
+    location = options.location
+    if location is None and locations:
+        # every terminal sells from one location, picking one silently could sell stock it does not have
+        location = getLocationName("Which location does this terminal sell from?", locations)
+    if location is not None:
+        # only this terminal writes the location's product file, the others send it stock (see locations.py)
+        shardFileName = getShardFileName(productFileName, location)
+        if not claimLocation(shardFileName):
+            print("Warning: Another terminal seems to be selling from '" + location + "' (see '" + shardFileName + ".owner').")
+            if not askToContinue("Continue only if that terminal is no longer running. Continue?"):
+                raise SystemExit(1)
+            claimLocation(shardFileName, force=True)
+        atexit.register(releaseLocation, shardFileName)
+    # selling prices and offers, compiled into a price table as products are priced
+    pricingEngine = PricingEngine.load(options.pricing)
+
     # storing product info in a variable 
-    allProducts = readProductFile(productFileName) 
+    loadStart = time.perf_counter()
+    locationSet = None
+    if location is None:
+        allProducts = readProductFile(productFileName, lazy=options.lazy, useCache=options.useCache) 
+    else:
+        # loading every location's shard in parallel, this terminal sells from one of them
+        locationSet = LocationSet.load(productFileName, locations, pricingEngine=pricingEngine, ownLocation=location, lazy=options.lazy, useCache=options.useCache)
+        allProducts = locationSet.stores[location]
+        productFileName = shardFileName
+    loadTime = (time.perf_counter() - loadStart) * 1000
+    # reporting startup time and peak memory
+    peakMemory = getPeakMemoryMb()
+    loadReport = "Loaded " + str(len(allProducts)) + " products in " + str(round(loadTime, 1)) + " ms via " + getattr(allProducts, "loadedFrom", "parsed")
+    if peakMemory is not None:
+        loadReport += " (peak memory " + str(round(peakMemory, 1)) + " MB)"
+    print(loadReport)
+    if locationSet is not None:
+        print("Selling from '" + location + "' (" + str(len(locations)) + " locations loaded)")
+    # search index over the products, built on the first search
+    productIndex = ProductIndex(allProducts)
+    # paged table view, keeps its page, filter and formatted rows between menu choices
+    productView = ProductTableView(allProducts, productIndex, pricingEngine=pricingEngine)
+    # background invoice writer, files invoices in invoices/<date>/
+    invoiceWriter = InvoiceWriter()
+    # structured archive of every sale and restock, for reports (see archive.py)
+    salesArchive = SalesArchive()
+    # stock value, revenue and margin kept up to date by every transaction (see aggregates.py)
+    if locationSet is None:
+        runningTotals = RunningTotals.load(productFileName, allProducts, pricingEngine)
+    else:
+        # shared with the location set, so transfers and received stock update the same totals
+        runningTotals = locationSet.totalsOf(location)
+    # products ordered by how soon they run out, for restock suggestions (see reorder.py)
+    reorderPlanner = ReorderPlanner(allProducts, salesArchive)
+    recorders = [salesArchive, runningTotals, reorderPlanner]
+    # the inventory engine the sell and restock menus work through (see engine.py)
+    inventory = Inventory(allProducts, productFileName, pricingEngine, recorders, invoiceWriter, productIndex)
     # main code loop 
     while True:
+        if locationSet is not None:
+            # adding the stock the other locations sent to this one since the last menu
+            receivedIds = locationSet.receiveTransfers(location)
+            for receivedId in receivedIds:
+                productIndex.update(receivedId)
+                with reorderPlanner.lock:
+                    reorderPlanner.updateProduct(receivedId)
+            if receivedIds:
+                print("Received stock sent from other locations for " + str(len(receivedIds)) + " products.")
         print("\n+------------ MAIN MENU -------------+")
         print("| 1. Show Stock (Cost Price)         |") 
         print("| 2. Sell Products                   |") 
         print("| 3. Restock Products                |") 
-        print("| 4. Exit                            |") 
+        print("| 4. Dashboard                       |") 
+        print("| 5. Suggested Restock               |") 
+        print("| 6. Stock by Location               |") 
+        print("| 7. Exit                            |") 
         print("+------------------------------------+")
         
         # getting natural number as input 
-        choice = getNaturalNumber("Enter choice (1-4):") 
-        # call displayInventory function 
+        choice = getNaturalNumber("Enter choice (1-7):") 
+        # call browseProducts function 
         if choice == 1:
-            displayInventory(allProducts) 
+            browseProducts(productView, "cost") 
 
         # call sellProducts function 
         elif choice == 2:
-            sellProducts(allProducts, productFileName) 
+            sellProducts(inventory, productView) 
             
         # call restockProducts function 
         elif choice == 3:
-            restockProducts(allProducts, productFileName) 
+            restockProducts(inventory, productView) 
             
-        # exit the system 
+        # call displayDashboard function 
         elif choice == 4:
+            displayDashboard(runningTotals, datetime.now().strftime("%Y-%m-%d")) 
+
+        # show the suggested restock and start an order from it 
+        elif choice == 5:
+            suggestions = reorderPlanner.suggestRestock()
+            displayReorderSuggestions(suggestions)
+            if suggestions and askToContinue("Start a restock order with these quantities?"):
+                suggestedOrder = [(suggestion["id"], suggestion["qty"], suggestion["cost"]) for suggestion in suggestions]
+                restockProducts(inventory, productView, suggestedOrder)
+
+        # show a product's stock at every location and send stock to another one 
+        elif choice == 6:
+            if locationSet is None:
+                print("The stock is kept in a single product file. Add locations with: python locations.py create <location>")
+            else:
+                changedId = showLocationStock(locationSet, location, invoiceWriter)
+                if changedId is not None:
+                    # the transfer changed this location's stock, refreshing what depends on it
+                    productIndex.update(changedId)
+                    with reorderPlanner.lock:
+                        reorderPlanner.updateProduct(changedId)
+
+        # hidden option: timing summary, when instrumentation is on 
+        elif choice == 9 and instrumentation is not None:
+            instrumentation.printSummary()
+
+        # exit the system 
+        elif choice == 7:
+            # writing the invoices still waiting in the background
+            invoiceWriter.close()
+            salesArchive.close()
             print("\nExiting System. Goodbye!") 
             break 
         else:
-            print("Invalid choice. Please enter 1-4.") 
+            print("Invalid choice. Please enter 1-7.") 
         
-        if choice != 4: # Pause, only if not exiting
+        if choice != 7: # Pause, only if not exiting
              input("\n... Press Enter to continue ...")
\ No newline at end of file
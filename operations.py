@@ -1,254 +1,281 @@
-#importing modules
-
-from datetime import datetime
-
 # importing user made modules
 
-from read import getValidProductId, askToContinue, getNaturalNumber
-from write import writeProductsToFile, generateInvoiceName, writeInvoice
+from read import getValidProductId, getProductIdWithSearch, askToContinue, getNaturalNumber
+from display import ProductTableView, browseProducts
+from engine import InventoryError, MAX_RESTOCK_QUANTITY, restoreProductValues
 
 # Display Functions 
 
 # Function for displaying products with calculated Selling Price
-def displaySellingPrice(productDataDict):
+def displaySellingPrice(productDataDict, productView=None):
     """
     Main Function
     Displaying the products from the inventory with their calculated selling price
-    (200% markup on the cost price) in a formatted table on the console.
+    (from the pricing engine of the view, by default a 200% markup on the cost price)
+    in a formatted table on the console.
+    The whole table is built first and written in one go; for large catalogues use
+    browseProducts, which shows one page at a time.
 
     · Parameters:
-        productDataDict (dict): The dictionary containing product data, where keys are
+        productDataDict (dict or ProductStore): The dictionary containing product data, where keys are
                                 product IDs and values are lists of product details
                                 including the cost price at index 3.
+        productView (ProductTableView): Optional view whose cached rows are reused.
     · Returns:
         None: This function only prints to the console.
     · Raises:
         Nothing
     """
-
-    # design CLI for user
-    print("\n" + "=" * 90) 
-    print("---------------------------- Available Products (Selling Price) --------------------------")
-    print("-" * 90)
-    print("ID\tName\t\t\tBrand\t\tQty\tSelling Price\tOrigin") 
-    print("-" * 90)
-    
-    for productId, details in productDataDict.items():
-        sellingPrice = details[3] * 2 # CostPrice is at index 3
-        # Using tabs for display.
-        print(str(productId) + "\t" + details[0] + "\t\t" + details[1] + "\t" + str(details[2]) + "\t" + str(sellingPrice) + "\t\t" + details[4])
-            
-    print("=" * 90)
+    if productView is None:
+        productView = ProductTableView(productDataDict)
+    productView.render("selling", allPages=True)
 
 # Function for displaying products with Cost Price.
-def displayInventory(productDataDict):
+def displayInventory(productDataDict, productView=None):
     """
     Main Function
     Displaying the products from the inventory with their original cost price
     in a formatted table on the console.
+    The whole table is built first and written in one go; for large catalogues use
+    browseProducts, which shows one page at a time.
 
     · Parameters:
-        productDataDict (dict): The dictionary containing product data, where keys are
+        productDataDict (dict or ProductStore): The dictionary containing product data, where keys are
                                 product IDs and values are lists of product details
                                 including the cost price at index 3.
+        productView (ProductTableView): Optional view whose cached rows are reused.
     · Returns:
         None: This function only prints to the console.
     · Raises:
         Nothing
     """
-    # design CLI for user 
-    print("\n" + "=" * 90) 
-    print("----------------------------- Raw Inventory Data (Cost Price) ----------------------------")
-    print("-" * 90)
-    print("ID\tName\t\t\tBrand\t\tQty\tCost Price\tOrigin") 
-    print("-" * 90)
-    
+    if productView is None:
+        productView = ProductTableView(productDataDict)
+    productView.render("cost", allPages=True)
+
+# Core Logic Functions (console front-ends over the Inventory engine, see engine.py)
 
-    for productId, details in productDataDict.items():
-        # Displaying product details with original cost price.
-        print(str(productId) + "\t" + details[0] + "\t\t" + details[1] + "\t" + str(details[2]) + "\t" + str(details[3]) + "\t\t" + details[4])
-            
-    print("=" * 90)
+# Helper Function for showing the result of a checkout.
+def showInvoice(invoice, title):
+    """
+    Helper Function
+    Printing where an invoice is written, its lines, and a warning if the stock
+    changes could not be saved.
 
-# Core Logic Functions
+    · Parameters:
+        invoice (Invoice): The finished transaction.
+        title (str): The heading printed above the invoice lines.
+    · Returns:
+        None: This function only prints to the console.
+    """
+    if invoice.filePath == invoice.fileName:
+        print("Invoice file generated successfully: " + invoice.fileName)
+    else:
+        print("Invoice file queued for writing: " + invoice.filePath)
+    print("\n" + title)
+    for line_to_print in invoice.lines:
+        print(line_to_print)
+    print("---------------------------------------------")
+    if not invoice.saved:
+        print("Warning: Invoice generated & displayed, but inventory file update failed!")
 
 # Function for handling selling products.
-def sellProducts(productDataDict, productFileName):
+def sellProducts(inventory, productView=None):
     """
     Main Function
-    Managing the entire process of selling products to a customer.
+    Managing the entire process of selling products to a customer at the console.
     This includes:
-    - Displaying available products with selling prices.
-    - Allowing the user to add multiple products to a cart.
-    - Applying a "buy 3 get 1 free" offer.
-    - Validating stock availability.
-    - Updating stock levels in memory immediately after an item is added to the cart
-      for live display updates.
+    - Displaying available products with selling prices, one page at a time.
+    - Allowing the user to add multiple products to a cart (see Cart in engine.py);
+      a product added twice becomes one line.
+    - Showing the selling prices and free-item offers of the pricing engine
+      (by default a 200% markup and "buy 3 get 1 free").
+    - Validating stock availability, holding the stock of each line added so it
+      cannot be sold elsewhere while the cart is being built.
     - Collecting customer name and phone number.
-    - Generating a sales invoice file with a unique name.
-    - Displaying the generated invoice content to the terminal.
-    - Adding the final stock changes to the inventory file.
+    - Selling the whole cart through the Inventory engine (journal, invoice,
+      recorders) and displaying the invoice content to the terminal.
 
     · Parameters:
-        productDataDict (dict): The main inventory dictionary. This dictionary is
-                                modified directly by this function to reflect stock changes.
-                                Keys are product IDs (int), values are lists:
-                                [Name (str), Brand (str), Quantity (int), CostPrice (int), Origin (str)].
-        productFileName (str): The name of the text file where inventory data is stored
-                               (e.g., "products.txt"), used for saving the updated inventory.
+        inventory (Inventory): The inventory engine the cart is sold through.
+        productView (ProductTableView): Optional paged table view, kept between calls so
+                                        the page, filter and cached rows are reused.
     · Returns:
         None: This function handles all operations and outputs directly.
     · Raises:
         (Internally handles errors like invalid input using helper functions.
          Prints warnings or error messages to the console for issues like insufficient
-         stock, problems updating stock in memory, or failures in writing invoice/inventory
-         files. Dosent disturb the flow of program)
+         stock, a rejected cart, or failures in writing invoice/inventory files.
+         Dosent disturb the flow of program)
     · Example (Only for demonstration purposes):
         product_data = {1: ['Serum', 'Garnier', 10, 500, 'France']}
-        sellProducts(product_data, "products.txt")
+        sellProducts(Inventory(product_data, "products.txt"))
             User is prompted for customer name, phone, product ID (e.g., 1), quantity (e.g., 3).
             User can continue to add more products with 'y', 'yes' or checkout with 'n', 'no'.
+            The 4 items (3 paid + 1 free) are held for the cart until checkout.
             The product_data in memory becomes {1: ['Serum', 'Garnier', 6, 500, 'France']} (10 - (3 paid + 1 free)).
-            If successful, an invoice "SALES_CustomerName_YYYY-M-D_H-M.txt" is created.
+            If successful, an invoice "SALES_CustomerName_YYYY-M-D_H-M-S_PID-N.txt" is created.
             The invoice details are printed to the terminal.
-            The "products.txt" file is updated with the new stock level.
+            The new stock level is appended to the "products.txt.journal" file.
     """
+    productDataDict = inventory.products
 
     # Checking if inventory is empty at the beginning of the function
     if not productDataDict: 
         print("\nInventory is empty. Cannot sell any products at the moment.")
         return 
 
-    cart = [] # Initializing cart for this transaction
+    cart = inventory.newCart() # Merges repeated products and holds their stock until checkout
     
     # Getting customer details first
     customerName = input("Enter customer name for invoice: ")
     customerPhone = input("Enter customer phone number: ") # Getting phone number
 
+    if productView is None:
+        productView = ProductTableView(productDataDict, inventory.productIndex, pricingEngine=inventory.pricingEngine)
+    browseProducts(productView, "selling") # Displaying a page of products with selling price
+
     while True: # Looping for adding items to cart
-        displaySellingPrice(productDataDict) # Displaying products with selling price
-        
         # Getting product ID from user
-        productId = getValidProductId("Enter Product ID to sell:", productDataDict)
+        if inventory.productIndex is not None:
+            productId = getProductIdWithSearch("Enter Product ID to sell:", productDataDict, inventory.productIndex)
+        else:
+            productId = getValidProductId("Enter Product ID to sell:", productDataDict)
         
         # Getting product details
         details = productDataDict[productId] 
         name, brand, currentStock, costPrice, origin  = details 
-        sellingPrice = costPrice * 2
+        sellingPrice = inventory.sellingPrice(productId)
+        heldByCart = inventory.quoteSaleItem(productId, cart.quantities[productId])["totalQty"] if productId in cart.quantities else 0
+        availableStock = cart.available(productId) - heldByCart # Stock not held by this or other carts
         
-        print("\nSelected: " + name + ", Stock: " + str(currentStock) + ", Selling Price: " + str(sellingPrice) + ", Origin: " + str(origin))
-        if currentStock == 0: 
+        print("\nSelected: " + name + ", Stock: " + str(availableStock) + ", Selling Price: " + str(sellingPrice) + ", Origin: " + str(origin))
+        if availableStock <= 0: 
             print("This item is currently out of stock.")
         else:
             quantityToBuy = getNaturalNumber("Enter quantity to buy:")
-            freeItems = quantityToBuy // 3 # Calculating free items
-            totalItemsToRemove = quantityToBuy + freeItems # Calculating total items to remove from stock
-            
-            if totalItemsToRemove > currentStock: # Checking stock availability
-                print("Error: Not enough stock for " + str(quantityToBuy) + " + " + str(freeItems) + " free.")
+            try:
+                item = cart.add(productId, quantityToBuy) # Merging with the product's line and holding the stock
+            except InventoryError as e:
+                print("Error: " + str(e))
             else:
-                # Adding item to cart
-                cart.append({"id": productId, "name": name, "brand": brand, "paidQty": quantityToBuy, "totalQty": totalItemsToRemove, "price": sellingPrice})
-                print(str(quantityToBuy) + "(+" + str(freeItems) + " free) " + name + " added to cart.")
-                
-                # Update stock only in memory for just display
-                try:
-                    productDataDict[productId][2] = currentStock - totalItemsToRemove 
-                except Exception as e:
-                    #handly any type of exception
-                    print("Error temporarily updating stock in memory for display for ID " + str(productId) + ": " + str(e))
-        
+                freeItems = item["totalQty"] - item["paidQty"]
+                print(str(item["paidQty"]) + "(+" + str(freeItems) + " free) " + name + " in cart.")
         
         # Asking if user wants to add another product
         if not askToContinue("Add another product to the cart?"):
             break # Exiting loop to checkout
 
     # Checkout Process
-    
-    # Generating invoice filename including customer name
-    invoiceFileName = generateInvoiceName("SALES", customerName) 
-    # Initializing invoice lines including customer phone
-    invoiceLines = ["--- WeCare Sales Invoice ---", "Customer: " + customerName, "Phone: " + customerPhone, "Date: " + str(datetime.now()), "-"*50]
-    grandTotal = 0
 
-    # Processing cart items for invoice and updating stock
-    for item in cart:
-        lineTotal = item["paidQty"] * item["price"]
-        grandTotal += lineTotal
-        invoiceLine = (item["name"] + " (" + item["brand"] + ") - Qty: " + str(item["totalQty"]) + " (Paid: " + str(item["paidQty"]) + ") X " + str(item["price"]) + " = " + str(lineTotal))
-        invoiceLines.append(invoiceLine)
+    if not cart.quantities:
+        print("\nThe cart is empty. Nothing was sold.")
+        return
+    try:
+        invoice = cart.checkout(customerName, customerPhone)
+    except InventoryError as e:
+        cart.release()
+        print("Error: " + str(e) + " Nothing was sold.")
+        return
+    showInvoice(invoice, "--- Invoice Details (Printed to Terminal) ---")
 
-    # Extending invoice lines with footer
-    invoiceLines.extend(["-"*50, "Grand Total: Nrs " + str(grandTotal), "-"*50, "Thank you!"])
+# Helper Function for adding one line to a restock order being entered.
+def addToRestockOrder(productDataDict, restockLines, previousValues, productId, qtyToAdd, newCostPrice):
+    """
+    Helper Function
+    Adding one product to the restock order and showing its new stock and cost
+    price in memory right away, so the tables shown while the order is entered are current.
 
-    # Writing invoice to file and displaying in terminal
-    if writeInvoice(invoiceFileName, invoiceLines):
-        print("\n--- Invoice Details (Printed to Terminal) ---")
-        for line_to_print in invoiceLines: 
-            print(line_to_print)
-        print("---------------------------------------------")
-        # Writing updated inventory to file
-        if not writeProductsToFile(productFileName, productDataDict):
-            print("Warning: Invoice generated & displayed, but inventory file update failed!")
-    else:
-        print("Warning: Invoice writing failed. Inventory file not updated.")
+    · Parameters:
+        productDataDict (dict or ProductStore): The product data, modified directly.
+        restockLines (list): The (productId, qtyToAdd, newCostPrice) lines so far, appended to.
+        previousValues (dict): Product ID -> (Quantity, CostPrice) before the order, filled in.
+        productId (int): The product to restock.
+        qtyToAdd (int): The quantity to add.
+        newCostPrice (int): The new cost price per item.
+    · Returns:
+        None
+    """
+    name, brand, currentStock, currentCost, origin = productDataDict[productId]
+    # Adding item details to restock order
+    restockLines.append((productId, qtyToAdd, newCostPrice))
+    print(str(qtyToAdd) + " " + name + " marked for restock.")
+    # Update stock and price only in memory for  display 
+    if productId not in previousValues:
+        previousValues[productId] = (currentStock, currentCost)
+    productDataDict[productId][2] = currentStock + qtyToAdd 
+    productDataDict[productId][3] = newCostPrice # Update cost price as well
 
 # Function for handling restocking.
-def restockProducts(productDataDict, productFileName):
+def restockProducts(inventory, productView=None, suggestedOrder=None):
     """
     Main Function
-    Managing the process of restocking products from a supplier.
+    Managing the process of restocking products from a supplier at the console.
     This includes:
-    - Displaying the current raw inventory with cost prices.
-    - Allowing the user to add multiple products to restock in a restock list.
+    - Displaying the current raw inventory with cost prices, one page at a time.
+    - Allowing the user to add multiple products to restock in a restock order.
     - Inputting the quantity being added and the new cost price for each item.
-    - Updating stock levels and cost prices in memory immediately after an item is
-      processed for live display updates.
+    - Showing the new stock levels and cost prices in the tables while the order
+      is being entered.
     - Collecting supplier name and phone number.
-    - Generating a restock invoice file with a unique name.
-    - Displaying the generated invoice content to the terminal.
-    - Adding the final stock and price changes to the inventory file.
+    - Restocking the whole order through the Inventory engine (invoice, journal,
+      recorders) and displaying the invoice content to the terminal.
 
     · Parameters:
-        productDataDict (dict): The main inventory dictionary. This dictionary is
-                                modified directly by this function.
-                                Keys are product IDs (int), values are lists:
-                                [Name (str), Brand (str), Quantity (int), CostPrice (int), Origin (str)].
-        productFileName (str): The name of the text file where inventory data is stored
-                               (e.g., "products.txt"), used for saving the updated inventory.
+        inventory (Inventory): The inventory engine the order is restocked through.
+        productView (ProductTableView): Optional paged table view, kept between calls so
+                                        the page, filter and cached rows are reused.
+        suggestedOrder (list): Optional (productId, qtyToAdd, newCostPrice) lines the
+                               order starts with, e.g. from ReorderPlanner.suggestRestock.
     · Returns:
         None: This function handles all operations and outputs directly.
     · Raises:
         (Internally handles errors like invalid input using helper functions.
-         Prints warnings or error messages to the console for issues like problems
-         updating stock/price in memory, or failures in writing invoice/inventory files.
+         Prints warnings or error messages to the console for issues like a rejected
+         order, or failures in writing invoice/inventory files.
          Dosent disturb the flow of program.)
     · Example (Only for demonstration purposes):
         product_data = {1: ['Serum', 'Garnier', 6, 500, 'France']}
-        restockProducts(product_data, "products.txt")
+        restockProducts(Inventory(product_data, "products.txt"))
             User is prompted for supplier name, phone, product ID (e.g., 1),
             quantity to add (e.g., 10), and new cost price (e.g., 480).
             User can continue to add more products to restock with 'y', 'yes' or checkout with 'n', 'no'.
             The product_data in memory becomes {1: ['Serum', 'Garnier', 16, 480, 'France']}.
-            If successful, an invoice "RESTOCK_SupplierName_YYYY-M-D_H-M.txt" is created.
+            If successful, an invoice "RESTOCK_SupplierName_YYYY-M-D_H-M-S_PID-N.txt" is created.
             The invoice details are printed to the terminal.
-            The "products.txt" file is updated with the new stock and cost price.
+            The new stock and cost price are appended to the "products.txt.journal" file.
     """
+    productDataDict = inventory.products
+
     # Checking if inventory is empty at the beginning
     if not productDataDict:
         print("\nInventory is empty. add products to the file to restock it.")
         return
 
-    restockList = [] 
+    restockLines = [] 
+    previousValues = {} # Quantity and cost price of each product before this order
     supplierName = input("Enter supplier name for invoice: ") # Getting supplier name once
     supplierPhone = input("Enter supplier phone number: ") # Getting phone number
     
 
-    while True: # Looping for adding items to restock list
-        displayInventory(productDataDict) # Displaying current raw inventory
+    if productView is None:
+        productView = ProductTableView(productDataDict, inventory.productIndex, pricingEngine=inventory.pricingEngine)
+
+    # Starting from a suggested order (see reorder.py), if one was given
+    for productId, qtyToAdd, newCostPrice in suggestedOrder or ():
+        addToRestockOrder(productDataDict, restockLines, previousValues, productId, qtyToAdd, newCostPrice)
+        if inventory.productIndex is not None:
+            inventory.productIndex.update(productId) # The table shows the new values
+    addMore = not restockLines or askToContinue("Add another product to this restock order?")
+
+    while addMore: # Looping for adding items to restock order
+        browseProducts(productView, "cost") # Displaying a page of the current raw inventory
         
         # Getting product ID from user for restocking
-        productId = getValidProductId("Enter Product ID to restock:", productDataDict)
+        if inventory.productIndex is not None:
+            productId = getProductIdWithSearch("Enter Product ID to restock:", productDataDict, inventory.productIndex)
+        else:
+            productId = getValidProductId("Enter Product ID to restock:", productDataDict)
         
         # Getting product details
         details = productDataDict[productId] # productId is guaranteed to be valid here
@@ -256,53 +283,31 @@ def restockProducts(productDataDict, productFileName):
 
         print("\nRestocking: " + name + ", Current Stock: " + str(currentStock) + ", Current Cost: " + str(currentCost) + ", Origin: " + str(origin))
         qtyToAdd = getNaturalNumber("Enter quantity to add:")
-        if qtyToAdd > 999:
-            print("Cannot Add Quantity above 999")
+        if qtyToAdd > MAX_RESTOCK_QUANTITY:
+            print("Cannot Add Quantity above " + str(MAX_RESTOCK_QUANTITY))
         else:
 
             newCostPrice = getNaturalNumber("Enter new cost price per item for this batch:")
-            # Adding item details to restock list
-            restockList.append({"id": productId, "name": name, "brand": brand, "qty": qtyToAdd, "cost": newCostPrice, "origin": origin})
-            print(str(qtyToAdd) + " " + name + " marked for restock.")
-            # Update stock and price only in memory for  display 
-            try:
-                productDataDict[productId][2] = currentStock + qtyToAdd 
-                productDataDict[productId][3] = newCostPrice # Update cost price as well
-            except Exception as e:
-                print("Error temporarily updating stock/price in memory for display for ID " + str(productId) + ": " + str(e))
+            addToRestockOrder(productDataDict, restockLines, previousValues, productId, qtyToAdd, newCostPrice)
+            if inventory.productIndex is not None:
+                inventory.productIndex.update(productId) # The table shows the new values
 
         # Asking if user wants to add another product to this restock order
-        if not askToContinue("Add another product to this restock order?"):
-            break # Exiting loop to finalize restock
+        addMore = askToContinue("Add another product to this restock order?")
 
     # Finalizing Restock
-    if not restockList: # Checking if any items were added
+    if not restockLines: # Checking if any items were added
         print("\nNothing selected to restock. Restock operation cancelled.") 
         return
 
-    # Generating invoice filename including supplier name
-    invoiceFileName = generateInvoiceName("RESTOCK", supplierName) 
-    # Initializing invoice lines
-    invoiceLines = ["--- WeCare Restock Invoice ---", "Supplier: " + supplierName, "Phone: " + supplierPhone,"Date: " + str(datetime.now()), "-"*50]
-    grandTotalCost = 0
-
-    # Processing restock list for invoice and updating dictionary
-    for item in restockList:
-        itemTotal = item["qty"] * item["cost"]
-        grandTotalCost += itemTotal
-        invoiceLine = (item["name"] + " (" + item["brand"] + ") - Qty: " + str(item["qty"]) + " X " + str(item["cost"]) + " = " + str(itemTotal))
-        invoiceLines.append(invoiceLine)
-
-    # Extending invoice lines with footer
-    invoiceLines.extend(["-"*50, "Total Restock Cost: Nrs " + str(grandTotalCost), "-"*50])
-    
-    # Writing invoice to file and displaying in terminal
-    if writeInvoice(invoiceFileName, invoiceLines):
-        print("\nInvoice Details (Printed to Terminal) ---")
-        for line_to_print in invoiceLines: print(line_to_print)
-        print("---------------------------------------------")
-        # Writing updated inventory to file
-        if not writeProductsToFile(productFileName, productDataDict):
-            print("Warning: Invoice generated & displayed, but inventory file update failed!")
-    else:
-        print("Warning: Invoice writing failed. Inventory file not updated.")
\ No newline at end of file
+    # Putting back the values shown during the order, the engine applies the whole order itself
+    restoreProductValues(productDataDict, previousValues)
+    if inventory.productIndex is not None:
+        for productId in previousValues:
+            inventory.productIndex.update(productId) # In case the order is rejected
+    try:
+        invoice = inventory.restock(supplierName, supplierPhone, restockLines)
+    except InventoryError as e:
+        print("Error: " + str(e) + " Nothing was restocked.")
+        return
+    showInvoice(invoice, "Invoice Details (Printed to Terminal) ---")
@@ -0,0 +1,232 @@
+# importing modules
+import json
+import threading
+import time
+from datetime import datetime, timedelta
+
+# Default file the pricing rules are read from
+PRICING_FILE = "pricing.json"
+
+# Rules used when there is no pricing file: 200% markup and "buy 3 get 1 free"
+DEFAULT_PRICING_RULES = {
+    "markup": 2,
+    "brandMarkups": {},
+    "bundles": [{"buy": 3, "free": 1}],
+    "promotions": [],
+}
+
+# Helper Function for checking a list of bundle tiers.
+def parseBundles(bundles):
+    """
+    Helper Function
+    Checking bundle tiers and sorting them from the largest to the smallest.
+
+    · Parameters:
+        bundles (list): {"buy": int, "free": int} tiers, e.g. [{"buy": 3, "free": 1}].
+    · Returns:
+        tuple: (buy, free) pairs, largest "buy" first.
+    · Raises:
+        ValueError: If a tier is not a natural "buy" with a non-negative "free".
+    """
+    tiers = []
+    for bundle in bundles:
+        buy = int(bundle["buy"])
+        free = int(bundle.get("free", 0))
+        if buy < 1 or free < 0:
+            raise ValueError("Invalid bundle " + json.dumps(bundle) + ": 'buy' must be 1 or greater and 'free' 0 or greater.")
+        tiers.append((buy, free))
+    return tuple(sorted(tiers, reverse=True))
+
+# Helper Function for counting the free items of a quantity.
+def countFreeItems(bundles, quantityToBuy):
+    """
+    Helper Function
+    Applying the largest bundle tier the quantity reaches, as often as it fits.
+
+    · Parameters:
+        bundles (tuple): (buy, free) pairs, largest "buy" first (see parseBundles).
+        quantityToBuy (int): The number of items paid for.
+    · Returns:
+        int: The number of free items.
+    """
+    for buy, free in bundles:
+        if quantityToBuy >= buy:
+            return (quantityToBuy // buy) * free
+    return 0
+
+# Class for working out selling prices and free items.
+class PricingEngine:
+    """
+    Main Class
+    Working out the selling price and the free items of every product from rules in
+    a pricing file (see PRICING_FILE), instead of the fixed 200% markup and
+    "buy 3 get 1 free":
+    - "markup": the markup on the cost price of every product (2 means cost * 2),
+    - "brandMarkups": a different markup for some brands, e.g. {"Cetaphil": 2.5},
+    - "bundles": tiers of free items, e.g. [{"buy": 3, "free": 1}, {"buy": 10, "free": 5}];
+      the largest tier the quantity reaches is applied as often as it fits,
+    - "promotions": date-bounded offers, e.g. {"from": "2025-10-01", "to": "2025-10-15",
+      "brand": "Cetaphil", "discountPercent": 10, "bundles": [{"buy": 2, "free": 1}]};
+      "brand", "origin" and "productIds" narrow down the products, all are optional.
+    The rules are compiled into a price table (product ID -> cost price, selling
+    price, bundle tiers) the first time a product is priced, so pricing a cart line
+    is one dictionary lookup. An entry is only compiled again when the cost price of
+    the product changed (a restock) or when the day changes (promotions start or end).
+
+    · Example (Only for demonstration purposes):
+        pricingEngine = PricingEngine.load("pricing.json")
+        pricingEngine.sellingPrice(1, product_data[1])
+        pricingEngine.freeItems(1, product_data[1], 3)
+    """
+
+    def __init__(self, rules=None):
+        allRules = dict(DEFAULT_PRICING_RULES)
+        allRules.update(rules or {})
+        self.markup = float(allRules["markup"])
+        self.brandMarkups = dict((brand, float(markup)) for brand, markup in allRules["brandMarkups"].items())
+        if self.markup <= 0 or any(markup <= 0 for markup in self.brandMarkups.values()):
+            raise ValueError("Markups must be greater than 0.")
+        self.bundles = parseBundles(allRules["bundles"])
+        self.promotions = []
+        for promotion in allRules["promotions"]:
+            promotion = dict(promotion)
+            if "bundles" in promotion:
+                promotion["bundles"] = parseBundles(promotion["bundles"])
+            if not 0 <= promotion.get("discountPercent", 0) <= 100:
+                raise ValueError("Invalid promotion " + json.dumps(promotion) + ": 'discountPercent' must be between 0 and 100.")
+            self.promotions.append(promotion)
+        self.lock = threading.Lock() # The inventory server prices carts from several threads
+        self.priceTable = {}         # Product ID -> (cost price, selling price, bundle tiers)
+        self.tableDay = None         # Day the price table was compiled for
+        self.tableExpiry = 0.0       # Time (time.time()) the next day starts
+        self.activePromotions = []
+        self.version = 0             # Changes whenever the whole table is thrown away
+
+    @classmethod
+    def load(cls, fileName=PRICING_FILE):
+        """
+        Loading the pricing rules from a JSON file. Without the file, the default
+        rules are used.
+
+        · Parameters:
+            fileName (str): The pricing file (e.g., "pricing.json").
+        · Returns:
+            PricingEngine: The engine.
+        · Raises:
+            (Prints an error and uses the default rules if the file is not valid.)
+        """
+        try:
+            pricingFile = open(fileName, "r")
+            rules = json.load(pricingFile)
+            pricingFile.close()
+            return cls(rules)
+        except FileNotFoundError:
+            return cls()
+        except Exception as e:
+            print("Error reading pricing file '" + fileName + "': " + str(e) + ". Using the default prices.")
+            return cls()
+
+    def markupFor(self, brand):
+        """
+        Getting the markup of a brand, without promotions.
+
+        · Parameters:
+            brand (str): The brand.
+        · Returns:
+            float: The markup (e.g., 2.0).
+        """
+        return self.brandMarkups.get(brand, self.markup)
+
+    def listPrice(self, brand, costPrice):
+        """
+        Getting the regular selling price of an item (markup only, no promotions).
+
+        · Parameters:
+            brand (str): The brand of the product.
+            costPrice (int): The cost price per item.
+        · Returns:
+            int: The selling price per item.
+        """
+        return round(costPrice * self.markupFor(brand))
+
+    def compileEntry(self, productId, details):
+        """
+        Applying the rules to one product for the day of the price table.
+
+        · Parameters:
+            productId (int): The ID of the product.
+            details (list): The product details [Name, Brand, Quantity, CostPrice, Origin].
+        · Returns:
+            tuple: (cost price, selling price, bundle tiers).
+        """
+        brand = details[1]
+        costPrice = details[3]
+        discount = 0
+        bundles = self.bundles
+        for promotion in self.activePromotions:
+            if "brand" in promotion and promotion["brand"] != brand:
+                continue
+            if "origin" in promotion and promotion["origin"] != details[4]:
+                continue
+            if "productIds" in promotion and productId not in promotion["productIds"]:
+                continue
+            discount = max(discount, promotion.get("discountPercent", 0))
+            bundles = promotion.get("bundles", bundles)
+        return (costPrice, round(costPrice * self.markupFor(brand) * (100 - discount) / 100), bundles)
+
+    def lookup(self, productId, details):
+        """
+        Getting the price table entry of a product, compiling it if it is missing
+        or was compiled for another cost price.
+
+        · Parameters:
+            productId (int): The ID of the product.
+            details (list): The product details [Name, Brand, Quantity, CostPrice, Origin].
+        · Returns:
+            tuple: (cost price, selling price, bundle tiers).
+        """
+        entry = self.priceTable.get(productId)
+        if entry is not None and entry[0] == details[3] and time.time() < self.tableExpiry:
+            return entry
+        with self.lock:
+            if time.time() >= self.tableExpiry:
+                # Promotions may have started or ended, starting a new table
+                now = datetime.now()
+                today = now.strftime("%Y-%m-%d")
+                nextDay = now.replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=1)
+                self.tableDay = today
+                self.tableExpiry = nextDay.timestamp()
+                self.activePromotions = [promotion for promotion in self.promotions if promotion.get("from", today) <= today <= promotion.get("to", today)]
+                self.priceTable = {}
+                self.version += 1
+            entry = self.compileEntry(productId, details)
+            self.priceTable[productId] = entry
+        return entry
+
+    def sellingPrice(self, productId, details):
+        """
+        Getting the selling price per item of a product today.
+
+        · Parameters:
+            productId (int): The ID of the product.
+            details (list): The product details [Name, Brand, Quantity, CostPrice, Origin].
+        · Returns:
+            int: The selling price per item.
+        """
+        return self.lookup(productId, details)[1]
+
+    def freeItems(self, productId, details, quantityToBuy):
+        """
+        Getting the number of free items given with a quantity of a product today.
+
+        · Parameters:
+            productId (int): The ID of the product.
+            details (list): The product details [Name, Brand, Quantity, CostPrice, Origin].
+            quantityToBuy (int): The number of items paid for.
+        · Returns:
+            int: The number of free items.
+        """
+        return countFreeItems(self.lookup(productId, details)[2], quantityToBuy)
+
+# Engine used when no other engine is passed in: 200% markup and "buy 3 get 1 free"
+DEFAULT_PRICING = PricingEngine()
@@ -1,3 +1,35 @@
+# Importing zlib for validating the checksum stored in the snapshot footer
+import zlib
+# Importing os for flushing the migrated product file to disk and renaming it
+import os
+# Importing pickle for the cache of the parsed snapshot
+import pickle
+# Importing sys for interning repeated strings
+import sys
+# Importing resource for reporting peak memory use (not available on Windows)
+try:
+    import resource
+except ImportError:
+    resource = None
+# Importing MutableMapping as the base of the lazily parsed product dictionary
+from collections.abc import MutableMapping
+
+# importing user made modules
+from store import ProductStore
+from binformat import isBinaryProductFile, openBinaryProductFile
+
+# Number of characters read per chunk while loading the product file
+LOAD_CHUNK_SIZE = 1024 * 1024
+# Number of search results listed at once
+SEARCH_RESULT_LIMIT = 20
+
+# Marker of the footer line holding the record count and checksum of a snapshot
+SNAPSHOT_FOOTER = "#END"
+# First line of a product file whose lines start with a stable SKU (the product ID)
+PRODUCT_FILE_HEADER = "#SKU,Name,Brand,Quantity,CostPrice,Origin"
+# Version of the snapshot cache layout, a cache of another version is ignored
+SNAPSHOT_CACHE_VERSION = 1
+
 # Input Validation Functions
 
 # Helper Function for getting a Natural number from the user.
@@ -38,7 +70,7 @@ def getValidProductId(prompt, productDataDict):
 
     · Parameters:
         prompt (str): The message displayed to the user, asking for the product ID.
-        productDataDict (dict): A dictionary containing product information, where keys
+        productDataDict (dict or ProductStore): A dictionary containing product information, where keys
                                 are product IDs (int) and values are lists of product details.
     · Returns:
         int: The valid product ID (an existing key in productDataDict) entered by the user.
@@ -57,47 +89,612 @@ def getValidProductId(prompt, productDataDict):
             # Printing an error message if ID is not found.
             print("Error: Product ID not found in inventory. Please try again.")
 
+# Helper Function for getting a product ID from the user, who may also search by name, brand or origin.
+def getProductIdWithSearch(prompt, productDataDict, productIndex):
+    """
+    Helper Function
+    Getting a product ID from the user like getValidProductId, but any input that is
+    not a number is used as a search in the product index and the matching products
+    are listed, so the cashier can find an ID without scrolling the whole catalogue.
+
+    · Parameters:
+        prompt (str): The message displayed to the user, asking for the product ID.
+        productDataDict (dict or ProductStore): The product data, keyed by product ID.
+        productIndex (ProductIndex): The search index over productDataDict.
+    · Returns:
+        int: The valid product ID (an existing key in productDataDict) entered by the user.
+    · Raises:
+        (Prompts again if the ID is not found or the search has no results.)
+    """
+    while True:
+        value = input(prompt + " (or name / brand:<brand> / origin:<origin> to search) ").strip()
+        if not value:
+            continue
+        if value.isdigit():
+            productId = int(value)
+            if productId in productDataDict:
+                return productId # Returning the valid ID.
+            print("Error: Product ID not found in inventory. Please try again.")
+            continue
+        # Searching and listing the matching products
+        matches = productIndex.search(value)
+        if not matches:
+            print("No products found for '" + value + "'.")
+            continue
+        print("ID\tName\t\t\tBrand\t\tQty\tOrigin")
+        for productId in matches[:SEARCH_RESULT_LIMIT]:
+            details = productDataDict[productId]
+            print(str(productId) + "\t" + details[0] + "\t\t" + details[1] + "\t" + str(details[2]) + "\t" + details[4])
+        if len(matches) > SEARCH_RESULT_LIMIT:
+            print("... " + str(len(matches) - SEARCH_RESULT_LIMIT) + " more, refine the search to see them.")
+
 # File Handling Functions
 
 # Helper Function for reading the product data from the specified text file.
-def readProductFile(fileName):
+def readProductFile(fileName, lazy=False, useCache=True):
     """
     Helper Function
-    Reading product data from a specified text file and loading it into a dictionary.
-    Each line in the file is expected to represent a product with comma-separated values.
+    Reading product data from a specified text file and loading it into a ProductStore.
+    Each line in the file is expected to represent a product with comma-separated values,
+    starting with its SKU, below the PRODUCT_FILE_HEADER line. The SKU is the product
+    ID, so IDs stay the same when lines are added, removed or moved in the file.
+    Files without the header (from before SKUs existed) are loaded with their line
+    numbers as IDs and migrated to the SKU format on the spot (see migrateProductFile).
+    The file is streamed in chunks of LOAD_CHUNK_SIZE characters instead of being read
+    into memory at once, and repeated brand and origin strings are interned so every
+    product shares the same string objects.
+    The parsed snapshot is cached next to the file (e.g., "products.txt.cache", see
+    readCachedSnapshot). While the size, modification time and footer of the file
+    are unchanged, the next start loads the cache instead of parsing the file again.
+
+    Files ending in ".bin" are opened as memory-mapped binary product files instead
+    (see binformat.py).
 
     · Parameters:
         fileName (str): The name of the text file (e.g., "products.txt") to read from.
+        lazy (bool): If True, only the raw lines are kept and each product is parsed the
+                     first time its ID is accessed (see LazyProductDict). The cache is
+                     not used then.
+        useCache (bool): If False, the file is parsed even if the cache is up to date
+                         (the cache is still refreshed).
     · Returns:
-        dict: A dictionary where keys are auto-incrementing integer product IDs and
-              values are lists of product details:
+        ProductStore: A columnar store used like a dictionary, where keys are
+              the integer SKUs (product IDs) and values behave like lists of
+              product details:
               [Name (str), Brand (str), Quantity (int), CostPrice (int), Origin (str)].
-              Returns an empty or partially filled dictionary if errors occur during reading
-              or if the file is empty/corrupted.
+              A LazyProductDict with the same interface is returned if lazy is True.
+              Changes recorded in the transaction journal since the last snapshot
+              are already applied. Its loadedFrom attribute tells how it was loaded:
+              "cache", "parsed", "lazy" or "binary".
+              Returns an empty or partially filled store if errors occur during reading
+              or if the file is empty. Returns an empty store if the record count or
+              checksum in the "#END,count,crc32" footer does not match the file, or
+              if a file with the SKU header has no footer (it was cut short).
     · Raises:
         (Prints error messages to the console for FileNotFoundError or other general
          exceptions encountered during file reading or data parsing, returns the current state of the productDataDict.)
     """
-    productDataDict = {} # Initializing dictionary
-    productId = 1        # Starting ID
+    if isBinaryProductFile(fileName):
+        # Binary product files are memory-mapped and updated in place, they have no journal
+        try:
+            productDataDict = openBinaryProductFile(fileName)
+            productDataDict.loadedFrom = "binary"
+            return productDataDict
+        except Exception as e:
+            print("An error occurred reading the file '" + fileName + "': " + str(e))
+            return ProductStore()
+
+    snapshotKey = None
+    if not lazy:
+        snapshotKey = getSnapshotKey(fileName)
+        if useCache and snapshotKey is not None:
+            cachedStore = readCachedSnapshot(fileName, snapshotKey)
+            if cachedStore is not None:
+                cachedStore.loadedFrom = "cache"
+                return replayJournals(fileName, cachedStore)
+
+    productDataDict = LazyProductDict() if lazy else ProductStore() # Initializing product store
+    productId = 1        # ID of the next line in files without SKUs (its line number)
+    hasSkus = False      # True once the SKU header line has been read
+    loadFailed = False
+    checksum = 0         # Running CRC32 of the product lines, compared with the footer
+    footerParts = None   # Footer line of the snapshot, if the file has one
     try:
         file = open(fileName, "r")      # Opening file for reading
-        allLines = file.readlines()     # Reading all lines
-        file.close()                    # Closing file
-        for line in allLines:
-            # Removing newline and splitting by comma.
-            cleanedLineParts = line.replace("\n", "").split(",") 
-            # converting parts to int
-            name = cleanedLineParts[0]
-            brand = cleanedLineParts[1]
-            qty = int(cleanedLineParts[2])     
-            price = int(cleanedLineParts[3])
-            origin = cleanedLineParts[4]
-            productDataDict[productId] = [name, brand, qty, price, origin]
-            productId += 1 # Incrementing ID
+        try:
+            for line in iterFileLines(file, LOAD_CHUNK_SIZE):
+                if line.startswith("#"):
+                    if line.startswith(SNAPSHOT_FOOTER):
+                        footerParts = line.replace("\n", "").split(",")
+                    elif line.startswith(PRODUCT_FILE_HEADER):
+                        hasSkus = True
+                    continue
+                checksum = zlib.crc32(line.encode("utf-8"), checksum)
+                if hasSkus:
+                    # The SKU in front of the line is the product ID, it never changes
+                    sku, separator, line = line.partition(",")
+                    productId = int(sku)
+                    if productId in productDataDict:
+                        print("Warning: SKU " + sku + " appears more than once in '" + fileName + "', the last line is used.")
+                if lazy:
+                    productDataDict.addRawLine(productId, line) # Parsing later, on first access
+                else:
+                    productDataDict[productId] = parseProductLine(line)
+                productId += 1 # Incrementing ID
+        finally:
+            file.close()                # Closing file
+        # Validating the snapshot against its footer (files written before footers existed have none)
+        if footerParts is None and hasSkus:
+            # Every file with the SKU header was written with a footer, so it was cut short
+            print("Error: The file '" + fileName + "' is corrupted (footer missing, the file may be truncated). No products loaded.")
+            return LazyProductDict() if lazy else ProductStore()
+        if footerParts is not None:
+            if int(footerParts[1]) != len(productDataDict) or int(footerParts[2]) != checksum:
+                print("Error: The file '" + fileName + "' is corrupted (record count or checksum mismatch). No products loaded.")
+                return LazyProductDict() if lazy else ProductStore()
     except Exception as e: # General catch for other file reading issues
+        loadFailed = True
         print("An error occurred reading the file '" + fileName + "': " + str(e))
-    return productDataDict # Returning the dictionary
+    if not hasSkus and not loadFailed and len(productDataDict):
+        # Files from before SKUs existed get their line numbers as SKUs, which are
+        # the IDs their journal and invoices already use
+        migrateProductFile(fileName)
+    elif snapshotKey is not None and not loadFailed and len(productDataDict):
+        # Caching the snapshot as parsed, before the journal is applied to it
+        writeCachedSnapshot(fileName, snapshotKey, productDataDict)
+    productDataDict.loadedFrom = "lazy" if lazy else "parsed"
+    return replayJournals(fileName, productDataDict)
+
+# Helper Function for applying the journals of a product file to its loaded snapshot.
+def replayJournals(fileName, productDataDict):
+    """
+    Helper Function
+    Applying the committed carts recorded after the last snapshot. A journal left
+    over from an interrupted background compaction goes first.
+
+    · Parameters:
+        fileName (str): The name of the product file (e.g., "products.txt").
+        productDataDict (dict or ProductStore): The loaded snapshot, modified directly.
+    · Returns:
+        dict or ProductStore: The same productDataDict, for returning it directly.
+    """
+    journalFileName = getJournalFileName(fileName)
+    replayJournal(getCompactingJournalFileName(journalFileName), productDataDict)
+    replayJournal(journalFileName, productDataDict)
+    return productDataDict # Returning the product store
+
+# Helper Function for getting the cache file name belonging to a product file.
+def getCacheFileName(fileName):
+    """
+    Helper Function
+    Building the name of the parsed snapshot cache that belongs to a product file
+    (e.g., "products.txt.cache").
+
+    · Parameters:
+        fileName (str): The name of the product file (e.g., "products.txt").
+    · Returns:
+        str: The name of the cache file.
+    · Raises:
+        Nothing
+    """
+    return fileName + ".cache"
+
+# Helper Function for identifying the current contents of a product file.
+def getSnapshotKey(fileName):
+    """
+    Helper Function
+    Building the key a cache must match to be used for a product file: the size
+    and modification time of the file and its "#END,count,crc32" footer line, whose
+    checksum covers every product line. Only the last bytes of the file are read.
+
+    · Parameters:
+        fileName (str): The name of the product file (e.g., "products.txt").
+    · Returns:
+        tuple: (cache version, size, modification time in ns, footer line), or None
+               if the file cannot be read.
+    · Raises:
+        Nothing
+    """
+    try:
+        fileStats = os.stat(fileName)
+        file = open(fileName, "rb")
+        try:
+            file.seek(max(fileStats.st_size - 128, 0))
+            lastLine = file.read().rstrip(b"\n").rsplit(b"\n", 1)[-1]
+        finally:
+            file.close()
+    except OSError:
+        return None
+    footer = lastLine.decode("utf-8", "replace") if lastLine.startswith(SNAPSHOT_FOOTER.encode("utf-8")) else None
+    return (SNAPSHOT_CACHE_VERSION, fileStats.st_size, fileStats.st_mtime_ns, footer)
+
+# Helper Function for loading the cached parsed snapshot of a product file.
+def readCachedSnapshot(fileName, snapshotKey):
+    """
+    Helper Function
+    Loading the pickled ProductStore of a product file, if the cache was written for
+    exactly the current file (see getSnapshotKey). The key is stored in front of the
+    store, so an out-of-date cache is rejected without loading the store.
+
+    · Parameters:
+        fileName (str): The name of the product file (e.g., "products.txt").
+        snapshotKey (tuple): The current key of the file.
+    · Returns:
+        ProductStore: The snapshot as parsed (without the journal), or None if there
+                      is no cache or it is out of date or unreadable.
+    · Raises:
+        Nothing
+    """
+    try:
+        cacheFile = open(getCacheFileName(fileName), "rb")
+    except OSError:
+        return None
+    try:
+        if pickle.load(cacheFile) != snapshotKey:
+            return None
+        productDataDict = pickle.load(cacheFile)
+        return productDataDict if isinstance(productDataDict, ProductStore) else None
+    except Exception:
+        return None # A damaged cache is simply parsed again
+    finally:
+        cacheFile.close()
+
+# Helper Function for checking if a product file can be loaded from its cache.
+def hasCurrentCache(fileName):
+    """
+    Helper Function
+    Checking if the snapshot cache of a product file is up to date, reading only
+    the key at its start (see readCachedSnapshot).
+
+    · Parameters:
+        fileName (str): The name of the product file (e.g., "products.txt").
+    · Returns:
+        bool: True if readProductFile would load the cache, False otherwise.
+    · Raises:
+        Nothing
+    """
+    snapshotKey = getSnapshotKey(fileName)
+    if snapshotKey is None:
+        return False
+    try:
+        cacheFile = open(getCacheFileName(fileName), "rb")
+    except OSError:
+        return False
+    try:
+        return pickle.load(cacheFile) == snapshotKey
+    except Exception:
+        return False
+    finally:
+        cacheFile.close()
+
+# Helper Function for caching the parsed snapshot of a product file.
+def writeCachedSnapshot(fileName, snapshotKey, productDataDict):
+    """
+    Helper Function
+    Pickling a ProductStore as the cache of a product file, under the key of the
+    file it was parsed from. Written to a temporary file and renamed, so a reader
+    never sees half a cache.
+
+    · Parameters:
+        fileName (str): The name of the product file (e.g., "products.txt").
+        snapshotKey (tuple): The key of the file the store holds (see getSnapshotKey).
+        productDataDict (ProductStore): The snapshot, without journal changes.
+    · Returns:
+        bool: True if the cache was written, False otherwise.
+    · Raises:
+        (Prints a warning instead of raising; without a cache the file is parsed.)
+    """
+    cacheFileName = getCacheFileName(fileName)
+    tempFileName = cacheFileName + ".tmp"
+    try:
+        cacheFile = open(tempFileName, "wb")
+        pickle.dump(snapshotKey, cacheFile, pickle.HIGHEST_PROTOCOL)
+        pickle.dump(productDataDict, cacheFile, pickle.HIGHEST_PROTOCOL)
+        cacheFile.close()
+        os.replace(tempFileName, cacheFileName)
+        return True
+    except Exception as e:
+        print("Warning: Could not write the cache '" + cacheFileName + "': " + str(e))
+        return False
+
+# Helper Function for adding SKUs to a product file written before SKUs existed.
+def migrateProductFile(fileName):
+    """
+    Helper Function
+    Rewriting a product file without SKUs in the SKU format: the PRODUCT_FILE_HEADER
+    line first, then every product line with its line number in front as its SKU (the
+    ID it was loaded with, so journal records and invoices keep pointing at the same
+    products), and a new "#END,count,crc32" footer. Like a snapshot, the new file is
+    written to a temporary file, flushed to disk and renamed over the old one.
+
+    · Parameters:
+        fileName (str): The name of the text file (e.g., "products.txt") to migrate.
+    · Returns:
+        bool: True if the file was migrated, False otherwise.
+    · Raises:
+        (Prints error messages to the console instead of raising, returns False. The
+         old file is left untouched in that case and migrated on the next load.)
+    """
+    tempFileName = fileName + ".tmp"
+    try:
+        oldFile = open(fileName, "r")
+        newFile = open(tempFileName, "w")
+        try:
+            newFile.write(PRODUCT_FILE_HEADER + "\n")
+            checksum = 0
+            sku = 0
+            for line in iterFileLines(oldFile, LOAD_CHUNK_SIZE):
+                if line.startswith("#"):
+                    continue # The old footer, a new one is written below
+                sku += 1
+                if not line.endswith("\n"):
+                    line += "\n"
+                line = str(sku) + "," + line
+                newFile.write(line)
+                checksum = zlib.crc32(line.encode("utf-8"), checksum)
+            newFile.write(SNAPSHOT_FOOTER + "," + str(sku) + "," + str(checksum) + "\n")
+            newFile.flush()
+            os.fsync(newFile.fileno())
+        finally:
+            oldFile.close()
+            newFile.close()
+        os.replace(tempFileName, fileName)
+        print("Migrated '" + fileName + "' to stable SKUs (SKU = old line number).")
+        return True
+    except Exception as e:
+        print("Error migrating '" + fileName + "' to SKUs: " + str(e))
+        return False
+
+# Helper Function for reading a text file line by line in fixed-size chunks.
+def iterFileLines(file, chunkSize):
+    """
+    Helper Function
+    Reading an open text file in chunks of a fixed number of characters and yielding
+    one complete line at a time (including its newline), so memory use does not
+    depend on the size of the file.
+
+    · Parameters:
+        file (file): The open text file to read from.
+        chunkSize (int): The number of characters read per chunk.
+    · Returns:
+        generator: Yields each line (str). The last line is yielded without a newline
+                   if the file does not end with one. Empty lines are skipped.
+    · Raises:
+        (Errors while reading are passed on to the caller.)
+    """
+    remainder = ""
+    while True:
+        chunk = file.read(chunkSize)
+        if not chunk:
+            break
+        lines = (remainder + chunk).split("\n")
+        remainder = lines.pop() # The last piece may be the start of a line in the next chunk
+        for line in lines:
+            if line:
+                yield line + "\n"
+    if remainder:
+        yield remainder
+
+# Helper Function for turning one line of the product file into a list of product details.
+def parseProductLine(line):
+    """
+    Helper Function
+    Parsing one comma-separated line of the product file into a list of product details.
+    Brand and origin strings are interned, as the same few values repeat across the
+    whole catalogue.
+
+    · Parameters:
+        line (str): One line of the product file, e.g. "Serum,Garnier,10,500,France\\n".
+    · Returns:
+        list: [Name (str), Brand (str), Quantity (int), CostPrice (int), Origin (str)].
+    · Raises:
+        IndexError, ValueError: If the line does not hold five fields or the
+                                quantity/price are not integers.
+    """
+    # Removing newline and splitting by comma.
+    cleanedLineParts = line.replace("\n", "").split(",")
+    # converting parts to int
+    name = cleanedLineParts[0]
+    brand = sys.intern(cleanedLineParts[1])
+    qty = int(cleanedLineParts[2])
+    price = int(cleanedLineParts[3])
+    origin = sys.intern(cleanedLineParts[4])
+    return [name, brand, qty, price, origin]
+
+# Class for a product dictionary that parses each product only when it is first used.
+class LazyProductDict(MutableMapping):
+    """
+    Helper Class
+    A dictionary of products that keeps the raw line of every product and only parses
+    it into a list of details the first time that product ID is accessed.
+    It can be used everywhere a normal product dictionary is used: looking up an ID
+    returns the usual list [Name, Brand, Quantity, CostPrice, Origin], and changes made
+    to that list are kept. Checking whether an ID exists never parses anything.
+
+    · Example (Only for demonstration purposes):
+        products = readProductFile("products.txt", lazy=True)
+        products[1][2] -= 4   # Only product 1 is parsed.
+    """
+
+    def __init__(self):
+        self._entries = {}  # Product ID -> raw line (str) or parsed details (list)
+
+    def addRawLine(self, productId, line):
+        """
+        Storing the unparsed line of a product.
+
+        · Parameters:
+            productId (int): The ID of the product.
+            line (str): The raw line from the product file.
+        """
+        self._entries[productId] = line
+
+    def __getitem__(self, productId):
+        details = self._entries[productId]
+        if isinstance(details, str): # Parsing on first access
+            details = parseProductLine(details)
+            self._entries[productId] = details
+        return details
+
+    def __setitem__(self, productId, details):
+        self._entries[productId] = details
+
+    def __delitem__(self, productId):
+        del self._entries[productId]
+
+    def __contains__(self, productId):
+        return productId in self._entries
+
+    def __iter__(self):
+        return iter(self._entries)
+
+    def __len__(self):
+        return len(self._entries)
+
+# Helper Function for getting the journal file name belonging to a product file.
+def getJournalFileName(fileName):
+    """
+    Helper Function
+    Building the name of the transaction journal that belongs to a product file.
+    The journal sits next to the product file (e.g., "products.txt.journal").
+
+    · Parameters:
+        fileName (str): The name of the product file (e.g., "products.txt").
+    · Returns:
+        str: The name of the journal file.
+    · Raises:
+        Nothing
+    """
+    return fileName + ".journal"
+
+# Helper Function for getting the name a journal is moved to while it is being compacted.
+def getCompactingJournalFileName(journalFileName):
+    """
+    Helper Function
+    Building the name a journal is renamed to while a background compaction folds
+    it into a fresh snapshot (e.g., "products.txt.journal.compacting").
+
+    · Parameters:
+        journalFileName (str): The name of the journal file.
+    · Returns:
+        str: The name of the journal file being compacted.
+    · Raises:
+        Nothing
+    """
+    return journalFileName + ".compacting"
+
+# Helper Function for applying the journal records on top of the loaded snapshot.
+def replayJournal(journalFileName, productDataDict):
+    """
+    Helper Function
+    Reading the append-only transaction journal and applying every committed cart
+    to the product dictionary loaded from the last snapshot.
+    Each journal line is one committed cart in the form
+    "timestamp|id:qty:cost;id:qty:cost", holding the final quantity and cost price
+    of every product touched by that cart, so replaying a record twice is harmless.
+
+    · Parameters:
+        journalFileName (str): The name of the journal file (e.g., "products.txt.journal").
+        productDataDict (dict): The product dictionary loaded from the snapshot.
+                                This dictionary is modified directly.
+    · Returns:
+        int: The number of journal records applied.
+    · Raises:
+        (A missing journal file simply means nothing to replay. An incomplete last
+         line, left behind by a crash during an append, is skipped. Other errors are
+         printed to the console and the records applied so far are kept.)
+    """
+    appliedRecords = 0
+    try:
+        file = open(journalFileName, "r") # Opening journal for reading
+    except FileNotFoundError:
+        return appliedRecords # Nothing has been committed since the last snapshot
+    try:
+        for line in file:
+            if not line.endswith("\n"):
+                # Skipping a record that was cut off by a crash while appending
+                print("Warning: Ignoring incomplete journal record in '" + journalFileName + "'.")
+                break
+            recordParts = line.replace("\n", "").split("|")
+            for change in recordParts[1].split(";"):
+                changeParts = change.split(":")
+                productId = int(changeParts[0])
+                if productId in productDataDict:
+                    productDataDict[productId][2] = int(changeParts[1]) # Quantity
+                    productDataDict[productId][3] = int(changeParts[2]) # CostPrice
+                else:
+                    print("Warning: Journal refers to unknown product ID " + str(productId) + ".")
+            appliedRecords += 1
+    except Exception as e: # General catch for corrupted journal records
+        print("An error occurred replaying the journal '" + journalFileName + "': " + str(e))
+    finally:
+        file.close()
+    return appliedRecords
+
+# Helper Function for reading the stamp of the last record of a journal.
+def readLastJournalStamp(journalFileName):
+    """
+    Helper Function
+    Reading the timestamp of the last complete record of a journal. Only the end of
+    the file is read, going back a block at a time until the record's start is found.
+
+    · Parameters:
+        journalFileName (str): The name of the journal file (e.g., "products.txt.journal").
+    · Returns:
+        str: The timestamp, or None if the journal is missing or holds no complete record.
+    · Raises:
+        Nothing
+    """
+    try:
+        file = open(journalFileName, "rb")
+    except OSError:
+        return None
+    try:
+        position = file.seek(0, os.SEEK_END)
+        tail = b""
+        while position > 0:
+            blockSize = min(position, 4096)
+            position -= blockSize
+            file.seek(position)
+            tail = file.read(blockSize) + tail
+            recordEnd = tail.rfind(b"\n") # An incomplete last record is ignored, like in replayJournal
+            if recordEnd >= 0 and (position == 0 or tail.rfind(b"\n", 0, recordEnd) >= 0):
+                record = tail[tail.rfind(b"\n", 0, recordEnd) + 1:recordEnd]
+                return record.split(b"|", 1)[0].decode("utf-8", "replace")
+        return None
+    except OSError:
+        return None
+    finally:
+        file.close()
+
+# Helper Function for reading the commit stamp of a product file.
+def readCommitStamp(fileName):
+    """
+    Helper Function
+    Reading the commit stamp of the last change saved to a product file: the
+    timestamp of the last journal record, or of the last record of the journal
+    being compacted, or else the stamp in the "#END,count,crc32,stamp" footer of
+    the snapshot. Folding the journal into a snapshot keeps the stamp, so it only
+    changes when the stock does.
+
+    · Parameters:
+        fileName (str): The name of the product file (e.g., "products.txt").
+    · Returns:
+        str: The stamp, or None for files without one (binary files and snapshots
+             written before footers held a stamp, with no journal).
+    · Raises:
+        Nothing
+    """
+    journalFileName = getJournalFileName(fileName)
+    for name in (journalFileName, getCompactingJournalFileName(journalFileName)):
+        commitStamp = readLastJournalStamp(name)
+        if commitStamp is not None:
+            return commitStamp
+    snapshotKey = getSnapshotKey(fileName)
+    if snapshotKey is None or snapshotKey[3] is None:
+        return None
+    footerParts = snapshotKey[3].split(",")
+    return footerParts[3] if len(footerParts) > 3 else None
 
 
 # Helper function for asking user if they want to continue
@@ -128,3 +725,26 @@ def askToContinue(prompt):
         else:
             print("Invalid input. Please enter 'y' for yes or 'n' for no.")
 
+
+# Diagnostic Functions
+
+# Helper Function for getting the peak memory use of the program.
+def getPeakMemoryMb():
+    """
+    Helper Function
+    Getting the peak resident memory (RSS) used by the program so far.
+
+    · Parameters:
+        None
+    · Returns:
+        float: The peak memory use in megabytes, or None if the platform does not
+               report it (e.g., Windows).
+    · Raises:
+        Nothing
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == "darwin":
+        return peak / (1024 * 1024) # Reported in bytes on macOS
+    return peak / 1024 # Reported in kilobytes on Linux
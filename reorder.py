@@ -0,0 +1,178 @@
+# importing modules
+import heapq
+import math
+import threading
+from datetime import datetime, timedelta
+
+# importing user made modules
+from engine import MAX_RESTOCK_QUANTITY
+
+# Number of past days the sales rate of a product is worked out over
+RATE_WINDOW_DAYS = 28
+# Products with fewer days of cover than this are suggested for restocking
+REORDER_COVER_DAYS = 14
+# Suggested quantities bring a product back up to this many days of cover
+TARGET_COVER_DAYS = 30
+
+# Class for finding the products that are running out, without scanning the catalogue.
+class ReorderPlanner:
+    """
+    Main Class
+    Keeping the products that sell in a min-heap ordered by days of cover (how many
+    days the current stock lasts at the current sales rate), so the products that
+    run out first can be read from the top of the heap.
+    The sales rate of a product is the units sold since the start of the rate window
+    divided by the days since then. Every product is divided by the same number of
+    days, so the order of the heap only depends on stock / units sold and does not
+    change as time passes; the days of cover are worked out when they are shown.
+    It is used as a recorder (see notifyRecorders in engine.py): every sale and
+    restock pushes a new heap entry for the products it touched, and entries that are
+    out of date are skipped when they reach the top (lazy deletion).
+    The units sold before the program started are read from the sales archive.
+
+    · Example (Only for demonstration purposes):
+        reorderPlanner = ReorderPlanner(product_data, salesArchive)
+        reorderPlanner.suggestRestock()
+    """
+
+    def __init__(self, productDataDict, salesArchive=None, windowDays=RATE_WINDOW_DAYS):
+        self.productDataDict = productDataDict
+        self.lock = threading.Lock() # The inventory server records from several threads
+        today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        self.windowStart = today - timedelta(days=windowDays)
+        self.unitsSold = {}
+        if salesArchive is not None:
+            self.unitsSold = salesArchive.unitsSoldByProduct(self.windowStart.strftime("%Y-%m-%d"))
+        self.versions = {} # Product ID -> number of its only valid heap entry
+        self.heap = []
+        for productId in self.unitsSold:
+            if productId in self.productDataDict:
+                self.versions[productId] = 0
+                self.heap.append((self.coverKey(productId), 0, productId))
+        heapq.heapify(self.heap)
+
+    def coverKey(self, productId):
+        """
+        Ordering key of a product: stock divided by units sold, i.e. days of cover
+        per day of the rate window.
+
+        · Parameters:
+            productId (int): The product.
+        · Returns:
+            float: The key, smallest for the product that runs out first.
+        """
+        return self.productDataDict[productId][2] / self.unitsSold[productId]
+
+    def elapsedDays(self):
+        """
+        Days since the start of the rate window (at least one).
+
+        · Returns:
+            float: The number of days.
+        """
+        return max((datetime.now() - self.windowStart).total_seconds() / 86400, 1.0)
+
+    def updateProduct(self, productId):
+        """
+        Pushing a new heap entry for a product whose stock or sales changed; its older
+        entries become out of date.
+
+        · Parameters:
+            productId (int): The product.
+        """
+        if not self.unitsSold.get(productId):
+            return # Products that never sell never need a reorder
+        version = self.versions.get(productId, -1) + 1
+        self.versions[productId] = version
+        heapq.heappush(self.heap, (self.coverKey(productId), version, productId))
+        if len(self.heap) > 2 * len(self.versions) + 1024:
+            # Dropping the out-of-date entries once they outnumber the valid ones
+            self.heap = [entry for entry in self.heap if self.versions.get(entry[2]) == entry[1]]
+            heapq.heapify(self.heap)
+
+    def recordSale(self, invoiceName, customerName, customerPhone, cart, timestamp):
+        """
+        Adding the units of a sale to the sales rate and reordering its products.
+
+        · Parameters:
+            invoiceName, customerName, customerPhone (str): Unused.
+            cart (list): The sale items (see createSaleItem in engine.py).
+            timestamp (datetime): When the sale happened (unused).
+        """
+        with self.lock:
+            for item in cart:
+                self.unitsSold[item["id"]] = self.unitsSold.get(item["id"], 0) + item["totalQty"]
+            for item in cart:
+                self.updateProduct(item["id"])
+
+    def recordRestock(self, invoiceName, supplierName, supplierPhone, restockList, previousValues, timestamp):
+        """
+        Reordering the products of a restock, which now last longer.
+
+        · Parameters:
+            invoiceName, supplierName, supplierPhone (str): Unused.
+            restockList (list): The restock items {"id", "name", "brand", "qty", "cost", "origin"}.
+            previousValues (dict): Product ID -> (Quantity, CostPrice) before the restock.
+            timestamp (datetime): When the restock happened (unused).
+        """
+        with self.lock:
+            for productId in previousValues:
+                self.updateProduct(productId)
+
+    def suggestRestock(self, coverDays=REORDER_COVER_DAYS, targetDays=TARGET_COVER_DAYS, limit=20):
+        """
+        Reading the products with fewer than coverDays days of cover from the top of
+        the heap, with the quantity that brings each one up to targetDays of cover.
+        Only the products returned (and out-of-date entries) are looked at.
+
+        · Parameters:
+            coverDays (int): Products lasting fewer days than this are suggested.
+            targetDays (int): Days of cover the suggested quantity aims for.
+            limit (int): The most products to suggest.
+        · Returns:
+            list: {"id", "name", "stock", "rate", "daysOfCover", "qty", "cost"} dicts,
+                  the product that runs out first coming first.
+        """
+        suggestions = []
+        with self.lock:
+            elapsedDays = self.elapsedDays()
+            keptEntries = []
+            while self.heap and len(suggestions) < limit:
+                key, version, productId = self.heap[0]
+                if self.versions.get(productId) != version:
+                    heapq.heappop(self.heap) # Out of date, dropped for good
+                    continue
+                if key * elapsedDays >= coverDays:
+                    break
+                keptEntries.append(heapq.heappop(self.heap))
+                name, brand, stock, cost, origin = self.productDataDict[productId]
+                rate = self.unitsSold[productId] / elapsedDays
+                quantity = min(max(math.ceil(rate * targetDays) - stock, 1), MAX_RESTOCK_QUANTITY)
+                suggestions.append({"id": productId, "name": name, "stock": stock, "rate": rate, "daysOfCover": key * elapsedDays, "qty": quantity, "cost": cost})
+            for entry in keptEntries:
+                heapq.heappush(self.heap, entry)
+        return suggestions
+
+# Function for showing the suggested restock report.
+def displayReorderSuggestions(suggestions):
+    """
+    Main Function
+    Showing the products that are running out, with their sales rate, days of cover
+    and the suggested quantity to order.
+
+    · Parameters:
+        suggestions (list): The result of ReorderPlanner.suggestRestock.
+    · Returns:
+        None: This function only prints to the console.
+    """
+    print("\n" + "=" * 100)
+    print("---------------------------------------- Suggested Restock ----------------------------------------")
+    print("-" * 100)
+    if not suggestions:
+        print("No product runs out within " + str(REORDER_COVER_DAYS) + " days at its current sales rate.")
+    else:
+        print("ID\tName\t\t\tStock\tSold/Day\tDays Left\tSuggested Qty\tCost Price")
+        print("-" * 100)
+        for suggestion in suggestions:
+            print(str(suggestion["id"]) + "\t" + suggestion["name"] + "\t\t" + str(suggestion["stock"]) + "\t" + str(round(suggestion["rate"], 2)) + "\t\t" + str(round(suggestion["daysOfCover"], 1)) + "\t\t" + str(suggestion["qty"]) + "\t\t" + str(suggestion["cost"]))
+    print("=" * 100)
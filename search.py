@@ -0,0 +1,156 @@
+# importing modules
+
+# Importing bisect for prefix searches in the sorted name index
+from bisect import bisect_left, insort
+
+# Class for finding products by name, brand or origin without scanning the catalogue.
+class ProductIndex:
+    """
+    Main Class
+    Keeping in-memory indexes over the product catalogue so products can be found
+    by name, brand or origin instead of scrolling the whole list:
+    - a hash index from brand to product IDs,
+    - a hash index from origin to product IDs,
+    - a sorted index of every word in the product names, searched by prefix.
+    All searches are case-insensitive. The indexes are built on the first search
+    (so a lazily loaded catalogue is not parsed at startup) and kept up to date
+    through update(), which the Inventory engine calls for every product a sale or
+    restock changes. update() also counts the changes of each product in versions,
+    so ProductTableView knows a cached row is still current without comparing it.
+
+    · Example (Only for demonstration purposes):
+        productIndex = ProductIndex(product_data)
+        productIndex.search("sun")             # IDs of products with a name word starting with "sun"
+        productIndex.search("brand:cetaphil")  # IDs of all Cetaphil products
+        productIndex.search("origin:usa")      # IDs of all products from the USA
+    """
+
+    def __init__(self, productDataDict):
+        self.productDataDict = productDataDict
+        self.built = False
+        self.byBrand = {}        # Lowercase brand -> set of product IDs
+        self.byOrigin = {}       # Lowercase origin -> set of product IDs
+        self.nameWords = []      # Sorted list of (lowercase name word, product ID)
+        self.indexedFields = {}  # Product ID -> (name, brand, origin) as indexed
+        self.versions = {}       # Product ID -> number of changes reported through update()
+
+    def build(self):
+        """
+        Building all indexes from the catalogue in one pass.
+        """
+        self.byBrand = {}
+        self.byOrigin = {}
+        self.indexedFields = {}
+        nameWords = []
+        for productId, details in self.productDataDict.items():
+            name, brand, origin = details[0], details[1], details[4]
+            self.byBrand.setdefault(brand.lower(), set()).add(productId)
+            self.byOrigin.setdefault(origin.lower(), set()).add(productId)
+            for word in name.lower().split():
+                nameWords.append((word, productId))
+            self.indexedFields[productId] = (name, brand, origin)
+        nameWords.sort()
+        self.nameWords = nameWords
+        self.built = True
+
+    def update(self, productId):
+        """
+        Updating the indexes for one product after it was added or changed, and
+        counting the change in versions. Quantity and cost changes do not touch the
+        indexes, so a usual sale or restock costs two dictionary lookups.
+
+        · Parameters:
+            productId (int): The ID of the added or changed product.
+        """
+        self.versions[productId] = self.versions.get(productId, 0) + 1
+        if not self.built:
+            return # Everything is indexed on the first search anyway
+        details = self.productDataDict[productId]
+        fields = (details[0], details[1], details[4])
+        oldFields = self.indexedFields.get(productId)
+        if oldFields == fields:
+            return
+        if oldFields is not None:
+            self.remove(productId)
+        name, brand, origin = fields
+        self.byBrand.setdefault(brand.lower(), set()).add(productId)
+        self.byOrigin.setdefault(origin.lower(), set()).add(productId)
+        for word in name.lower().split():
+            insort(self.nameWords, (word, productId))
+        self.indexedFields[productId] = fields
+
+    def remove(self, productId):
+        """
+        Removing one product from the indexes.
+
+        · Parameters:
+            productId (int): The ID of the product to remove.
+        """
+        oldFields = self.indexedFields.pop(productId, None)
+        if oldFields is None:
+            return
+        name, brand, origin = oldFields
+        self.byBrand.get(brand.lower(), set()).discard(productId)
+        self.byOrigin.get(origin.lower(), set()).discard(productId)
+        for word in name.lower().split():
+            position = bisect_left(self.nameWords, (word, productId))
+            if position < len(self.nameWords) and self.nameWords[position] == (word, productId):
+                del self.nameWords[position]
+
+    def prefixRange(self, prefix):
+        """
+        Finding the slice of the sorted name index holding the words that start with
+        the given prefix, with two binary searches.
+
+        · Parameters:
+            prefix (str): The start of a word in the product name (lowercase).
+        · Returns:
+            tuple: (start, end) positions in nameWords.
+        """
+        start = bisect_left(self.nameWords, (prefix,))
+        end = bisect_left(self.nameWords, (prefix + "\uffff",), start)
+        return start, end
+
+    def searchNamePrefix(self, prefix):
+        """
+        Finding products with a name word starting with the given prefix.
+
+        · Parameters:
+            prefix (str): The start of a word in the product name.
+        · Returns:
+            list: The matching product IDs, sorted, without duplicates.
+        """
+        start, end = self.prefixRange(prefix.lower())
+        return sorted(set(productId for word, productId in self.nameWords[start:end]))
+
+    def search(self, query):
+        """
+        Searching the catalogue. "brand:<brand>" and "origin:<origin>" look up the exact
+        brand or origin, anything else is matched as a prefix of the words in the
+        product names (every word of the query has to match).
+
+        · Parameters:
+            query (str): The search text typed by the user.
+        · Returns:
+            list: The matching product IDs, sorted.
+        """
+        if not self.built:
+            self.build()
+        query = query.strip().lower()
+        if query.startswith("brand:"):
+            return sorted(self.byBrand.get(query[6:].strip(), ()))
+        if query.startswith("origin:"):
+            return sorted(self.byOrigin.get(query[7:].strip(), ()))
+        words = query.split()
+        if not words:
+            return []
+        # Starting from the word with the fewest index entries and checking the
+        # other words on those candidates only
+        ranges = sorted((self.prefixRange(word) + (word,) for word in words), key=lambda r: r[1] - r[0])
+        start, end, firstWord = ranges[0]
+        matches = set()
+        for word, productId in self.nameWords[start:end]:
+            nameWords = self.indexedFields[productId][0].lower().split()
+            if all(any(nameWord.startswith(other) for nameWord in nameWords) for otherStart, otherEnd, other in ranges[1:]):
+                matches.add(productId)
+        return sorted(matches)
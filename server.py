@@ -0,0 +1,461 @@
+# importing modules
+import argparse
+import atexit
+import json
+import queue
+import socketserver
+import sys
+import threading
+
+# importing user made modules
+from read import readProductFile, getJournalFileName
+from write import formatJournalRecord, appendJournalRecords, compactJournalIfNeeded, isJournalCompactionDue
+from engine import Inventory, InventoryError
+from archive import SalesArchive
+from aggregates import RunningTotals
+from pricing import PricingEngine, PRICING_FILE
+from locations import claimLocation, releaseLocation
+
+# Number of locks the products are spread over (product ID % LOCK_STRIPES)
+LOCK_STRIPES = 1024
+# Default address of the inventory server
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 5050
+
+# Class for writing the journal records of many terminals with one disk flush.
+class JournalCommitter(threading.Thread):
+    """
+    Helper Class
+    A background thread that appends journal records for the inventory server.
+    Every transaction hands over its record and waits; the thread takes all records
+    that are waiting at that moment, appends them together and flushes the journal
+    to disk once for the whole group (group commit), so more terminals do not mean
+    more fsync calls per second.
+    """
+
+    def __init__(self, productDataDict, productFileName, productLocks=None):
+        threading.Thread.__init__(self, daemon=True)
+        self.productDataDict = productDataDict
+        self.productFileName = productFileName
+        self.journalFileName = getJournalFileName(productFileName)
+        self.productLocks = productLocks or [] # Every stripe lock of the service, taken to compact
+        self.pending = queue.Queue()
+
+    def submit(self, record):
+        """
+        Handing over one journal record to be written.
+
+        · Parameters:
+            record (str): The journal line (see formatJournalRecord), or None.
+        · Returns:
+            dict: A ticket; pass it to wait() to know when the record is on disk.
+        """
+        ticket = {"done": threading.Event(), "ok": False}
+        self.pending.put((record, ticket))
+        return ticket
+
+    def wait(self, ticket):
+        """
+        Waiting until a submitted record has been written.
+
+        · Parameters:
+            ticket (dict): The ticket returned by submit().
+        · Returns:
+            bool: True if the record is safely on disk, False otherwise.
+        """
+        ticket["done"].wait()
+        return ticket["ok"]
+
+    def takeGroup(self, block):
+        """
+        Taking every record waiting at this moment.
+
+        · Parameters:
+            block (bool): True to wait for the first record.
+        · Returns:
+            list: (record, ticket) pairs, possibly empty if block is False.
+        """
+        group = [self.pending.get()] if block else []
+        while True:
+            try:
+                group.append(self.pending.get_nowait())
+            except queue.Empty:
+                return group
+
+    def writeGroup(self, group):
+        """
+        Writing a group of records with one disk flush and telling their terminals.
+
+        · Parameters:
+            group (list): (record, ticket) pairs.
+        · Returns:
+            bool: True if the whole group is on disk.
+        """
+        if hasattr(self.productDataDict, "flushChanges"):
+            # Binary product files are updated in place, flushing covers the whole group
+            written = self.productDataDict.flushChanges()
+        else:
+            records = [record for record, ticket in group if record is not None]
+            written = appendJournalRecords(self.journalFileName, records) if records else True
+        for record, ticket in group:
+            ticket["ok"] = written
+            ticket["done"].set()
+        return written
+
+    def compactCommitted(self):
+        """
+        Compacting the journal from a snapshot of committed changes only. Every
+        stripe lock is taken, so no transaction is half-applied, and the records
+        queued meanwhile are written first, so every change in the snapshot is
+        already in the journal. If they cannot be written the compaction is skipped.
+        """
+        for lock in self.productLocks:
+            lock.acquire()
+        try:
+            if self.writeGroup(self.takeGroup(False)):
+                compactJournalIfNeeded(self.productFileName, self.productDataDict)
+        finally:
+            for lock in reversed(self.productLocks):
+                lock.release()
+
+    def run(self):
+        while True:
+            written = self.writeGroup(self.takeGroup(True)) # Waiting for the first record of the next group
+            if written and not hasattr(self.productDataDict, "flushChanges") and isJournalCompactionDue(self.productFileName):
+                self.compactCommitted()
+
+# Class holding the inventory and applying transactions from all terminals.
+class InventoryService:
+    """
+    Main Class
+    Owning the product store of the shop and applying sales and restocks sent by
+    several terminals as atomic transactions.
+    Each transaction locks only the products it touches (through LOCK_STRIPES
+    striped locks, always taken in the same order so terminals cannot deadlock),
+    validates and applies the whole cart through the Inventory engine (see engine.py),
+    which writes the invoice, and hands the journal record to the JournalCommitter.
+    If the invoice or the journal record cannot be written the stock changes are
+    rolled back, so no cart is ever half-applied or kept in memory only.
+    A terminal can also build a cart line by line ("reserve"): the stock of its
+    lines is held for it (see Cart in engine.py), so other terminals cannot sell
+    it before its "checkout".
+    """
+
+    def __init__(self, productDataDict, productFileName, recorders=None, pricingEngine=None):
+        self.productDataDict = productDataDict
+        self.productFileName = productFileName
+        # Invoices are written by each terminal thread, recorders (e.g. SalesArchive) are told
+        # about every committed transaction; the stock changes go through the committer below
+        self.inventory = Inventory(productDataDict, productFileName, pricingEngine, recorders)
+        self.productLocks = [threading.Lock() for index in range(LOCK_STRIPES)]
+        self.committer = JournalCommitter(productDataDict, productFileName, self.productLocks)
+        self.committer.start()
+        self.carts = {} # Cart ID -> Cart being built by a terminal
+        self.cartsLock = threading.Lock()
+
+    def lockProducts(self, productIds):
+        """
+        Locking the stripes of the given products in a fixed order.
+
+        · Parameters:
+            productIds (iterable): The product IDs to lock.
+        · Returns:
+            list: The locks taken, for unlockProducts.
+        """
+        locks = [self.productLocks[stripe] for stripe in sorted(set(productId % LOCK_STRIPES for productId in productIds))]
+        for lock in locks:
+            lock.acquire()
+        return locks
+
+    def unlockProducts(self, locks):
+        """
+        Releasing locks taken by lockProducts.
+
+        · Parameters:
+            locks (list): The locks to release.
+        """
+        for lock in reversed(locks):
+            lock.release()
+
+    def runTransaction(self, kind, partyName, partyPhone, lines, cartId=None):
+        """
+        Applying one sale or restock as an atomic transaction.
+
+        · Parameters:
+            kind (str): "sell" or "restock".
+            partyName (str): The customer or supplier name.
+            partyPhone (str): The customer or supplier phone number.
+            lines (list): (productId, quantity) pairs for a sale,
+                          (productId, quantity, costPrice) tuples for a restock.
+            cartId (int): The cart being sold, whose held stock it may use.
+        · Returns:
+            dict: {"ok": True, "invoice": [lines]} or {"ok": False, "error": message},
+                  with "code" (see InventoryError) if the transaction was rejected.
+        """
+        locks = self.lockProducts([line[0] for line in lines])
+        try:
+            try:
+                invoice = self.inventory.applyTransaction("SALE" if kind == "sell" else "RESTOCK", partyName, partyPhone, lines, cartId)
+            except InventoryError as e:
+                return {"ok": False, "error": str(e), "code": e.code}
+            appliedValues = dict((productId, (self.productDataDict[productId][2], self.productDataDict[productId][3])) for productId in invoice.previousValues)
+            # Queueing the journal record while still holding the locks keeps the
+            # records of one product in the order the changes were made
+            ticket = self.committer.submit(formatJournalRecord(self.productDataDict, invoice.previousValues.keys()))
+        finally:
+            self.unlockProducts(locks)
+        if not self.committer.wait(ticket):
+            if not self.undoTransaction(invoice, appliedValues):
+                return {"ok": False, "error": "Invoice written, but the inventory file update failed and the stock could not be saved as it was. Restart the server before selling again!", "invoice": invoice.lines}
+            return {"ok": False, "error": "Invoice written, but the inventory file update failed! Stock not changed.", "invoice": invoice.lines}
+        invoice.saved = True
+        self.inventory.recordTransaction(invoice)
+        return {"ok": True, "invoice": invoice.lines}
+
+    def undoTransaction(self, invoice, appliedValues):
+        """
+        Taking back the stock change of a transaction whose journal record could not
+        be written, under the locks of its products, and journalling the products
+        again. Transactions committed after it may have changed the same products,
+        so only its own change is taken back: the quantity by the units it moved,
+        the cost price only if it is still the one it set.
+
+        · Parameters:
+            invoice (Invoice): The transaction (see applyTransaction in engine.py).
+            appliedValues (dict): Product ID -> (Quantity, CostPrice) right after it was applied.
+        · Returns:
+            bool: True if the products were saved as they are now, False otherwise.
+        """
+        locks = self.lockProducts(invoice.previousValues)
+        try:
+            for productId, (previousQty, previousCost) in invoice.previousValues.items():
+                appliedQty, appliedCost = appliedValues[productId]
+                details = self.productDataDict[productId]
+                details[2] -= appliedQty - previousQty
+                if details[3] == appliedCost:
+                    details[3] = previousCost
+            ticket = self.committer.submit(formatJournalRecord(self.productDataDict, invoice.previousValues.keys()))
+        finally:
+            self.unlockProducts(locks)
+        return self.committer.wait(ticket)
+
+    def reserveCart(self, cartId, lines):
+        """
+        Adding lines to a terminal's cart and holding their stock, opening a new
+        cart if cartId is None. Carts whose hold ran out are forgotten.
+
+        · Parameters:
+            cartId (int): The cart, or None for a new one.
+            lines (list): (productId, quantity) pairs, merged with the cart's lines.
+        · Returns:
+            dict: {"ok": True, "cart": cartId, "items": [[productId, quantity], ...],
+                  "holdSeconds": seconds} or an error with "code".
+        """
+        with self.cartsLock:
+            for expiredId in [openId for openId, openCart in self.carts.items() if openId != cartId and not openCart.isHeld()]:
+                del self.carts[expiredId]
+            if cartId is None:
+                cart = self.inventory.newCart()
+                self.carts[cart.cartId] = cart
+            elif cartId in self.carts:
+                cart = self.carts[cartId]
+            else:
+                return {"ok": False, "error": "Cart " + str(cartId) + " not found.", "code": "unknown_cart"}
+        try:
+            cart.addLines(lines)
+        except InventoryError as e:
+            return {"ok": False, "error": str(e), "code": e.code, "cart": cart.cartId}
+        return {"ok": True, "cart": cart.cartId, "items": [list(line) for line in cart.lines()], "holdSeconds": cart.holdSeconds}
+
+    def checkoutCart(self, cartId, customerName, customerPhone):
+        """
+        Selling a terminal's cart as one transaction (see runTransaction).
+
+        · Parameters:
+            cartId (int): The cart.
+            customerName (str): The customer name.
+            customerPhone (str): The customer phone number.
+        · Returns:
+            dict: As runTransaction; the cart is forgotten once sold.
+        """
+        with self.cartsLock:
+            cart = self.carts.get(cartId)
+        if cart is None:
+            return {"ok": False, "error": "Cart " + str(cartId) + " not found.", "code": "unknown_cart"}
+        response = self.runTransaction("sell", customerName, customerPhone, cart.lines(), cartId)
+        if response["ok"]:
+            with self.cartsLock:
+                self.carts.pop(cartId, None)
+        return response
+
+    def releaseCart(self, cartId):
+        """
+        Dropping a terminal's cart and freeing the stock it holds.
+
+        · Parameters:
+            cartId (int): The cart.
+        · Returns:
+            dict: {"ok": True}.
+        """
+        with self.cartsLock:
+            cart = self.carts.pop(cartId, None)
+        if cart is not None:
+            cart.release()
+        return {"ok": True}
+
+    def getProduct(self, productId):
+        """
+        Reading the details of one product.
+
+        · Parameters:
+            productId (int): The ID of the product.
+        · Returns:
+            dict: {"ok": True, "product": [id, name, brand, qty, cost, origin]} or an error.
+        """
+        if productId not in self.productDataDict:
+            return {"ok": False, "error": "Product ID " + str(productId) + " not found in inventory."}
+        return {"ok": True, "product": [productId] + list(self.productDataDict[productId])}
+
+    def listProducts(self, offset, limit):
+        """
+        Reading one page of the catalogue.
+
+        · Parameters:
+            offset (int): The number of products to skip.
+            limit (int): The most products to return.
+        · Returns:
+            dict: {"ok": True, "total": count, "products": [[id, name, brand, qty, cost, origin], ...]}.
+        """
+        products = []
+        for position, productId in enumerate(self.productDataDict):
+            if position >= offset + limit:
+                break
+            if position >= offset:
+                products.append([productId] + list(self.productDataDict[productId]))
+        return {"ok": True, "total": len(self.productDataDict), "products": products}
+
+    def handleRequest(self, request):
+        """
+        Dispatching one decoded request from a terminal.
+
+        · Parameters:
+            request (dict): {"op": "sell" | "restock" | "reserve" | "checkout" | "release" | "get" | "list", ...}.
+        · Returns:
+            dict: The response to send back.
+        """
+        try:
+            operation = request.get("op")
+            if operation == "sell":
+                lines = [(int(line[0]), int(line[1])) for line in request["items"]]
+                return self.runTransaction("sell", str(request.get("customer", "")), str(request.get("phone", "")), lines)
+            if operation == "restock":
+                lines = [(int(line[0]), int(line[1]), int(line[2])) for line in request["items"]]
+                return self.runTransaction("restock", str(request.get("supplier", "")), str(request.get("phone", "")), lines)
+            if operation == "reserve":
+                lines = [(int(line[0]), int(line[1])) for line in request["items"]]
+                return self.reserveCart(None if request.get("cart") is None else int(request["cart"]), lines)
+            if operation == "checkout":
+                return self.checkoutCart(int(request["cart"]), str(request.get("customer", "")), str(request.get("phone", "")))
+            if operation == "release":
+                return self.releaseCart(int(request["cart"]))
+            if operation == "get":
+                return self.getProduct(int(request["id"]))
+            if operation == "list":
+                return self.listProducts(int(request.get("offset", 0)), int(request.get("limit", 20)))
+            return {"ok": False, "error": "Unknown operation: " + str(operation)}
+        except (KeyError, TypeError, ValueError, IndexError) as e:
+            return {"ok": False, "error": "Malformed request: " + str(e)}
+
+# Class for handling one connected terminal.
+class TerminalHandler(socketserver.StreamRequestHandler):
+    """
+    Helper Class
+    Reading JSON requests from one terminal, one per line, and writing one JSON
+    response line for each.
+    """
+
+    def handle(self):
+        for rawLine in self.rfile:
+            try:
+                request = json.loads(rawLine.decode("utf-8"))
+                response = self.server.inventoryService.handleRequest(request)
+            except ValueError as e:
+                response = {"ok": False, "error": "Malformed request: " + str(e)}
+            self.wfile.write((json.dumps(response) + "\n").encode("utf-8"))
+            self.wfile.flush()
+
+# Class for the TCP inventory server, one thread per terminal.
+class InventoryTCPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+# Unix domain socket server, where the platform supports it
+if hasattr(socketserver, "ThreadingUnixStreamServer"):
+    class InventoryUnixServer(socketserver.ThreadingUnixStreamServer):
+        daemon_threads = True
+else:
+    InventoryUnixServer = None
+
+# Function for creating the inventory server.
+def createServer(productDataDict, productFileName, host=DEFAULT_HOST, port=DEFAULT_PORT, unixPath=None, recorders=None, pricingEngine=None):
+    """
+    Main Function
+    Creating an inventory server that owns the products and serves terminals over
+    TCP or, if unixPath is given, over a Unix domain socket.
+
+    · Parameters:
+        productDataDict (dict or ProductStore): The products served.
+        productFileName (str): The product file the changes are journalled to.
+        host (str): The TCP address to listen on.
+        port (int): The TCP port to listen on (0 picks a free port).
+        unixPath (str): Optional path of a Unix domain socket to listen on instead.
+        recorders (list): Optional recorders (e.g., SalesArchive) told about every
+                          committed transaction.
+        pricingEngine (PricingEngine): Optional pricing rules, see pricing.py.
+    · Returns:
+        socketserver.BaseServer: The server; call serve_forever() to run it.
+    · Raises:
+        OSError: If the address is in use or Unix sockets are not supported.
+    """
+    if unixPath is not None:
+        if InventoryUnixServer is None:
+            raise OSError("Unix domain sockets are not supported on this platform.")
+        server = InventoryUnixServer(unixPath, TerminalHandler)
+    else:
+        server = InventoryTCPServer((host, port), TerminalHandler)
+    server.inventoryService = InventoryService(productDataDict, productFileName, recorders, pricingEngine)
+    return server
+
+# Main Program Execution Block
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="WeCare inventory server for several terminals")
+    parser.add_argument("--file", default="products.txt", help="product file owned by the server")
+    parser.add_argument("--host", default=DEFAULT_HOST, help="TCP address to listen on")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="TCP port to listen on")
+    parser.add_argument("--unix", help="listen on this Unix domain socket instead of TCP")
+    parser.add_argument("--archive", default="sales.db", help="sales archive every transaction is recorded in")
+    parser.add_argument("--pricing", default=PRICING_FILE, help="pricing rules (markups, bundles, promotions)")
+    parser.add_argument("--force", action="store_true", help="serve the product file even if another program seems to be writing it")
+    options = parser.parse_args()
+
+    # the server is the only writer of its product file, e.g. a location's shard (see locations.py)
+    if not claimLocation(options.file, options.force):
+        print("Another program seems to be using '" + options.file + "' (see '" + options.file + ".owner'). Stop it first, or use --force if it is no longer running.")
+        sys.exit(1)
+    atexit.register(releaseLocation, options.file)
+    allProducts = readProductFile(options.file)
+    salesArchive = SalesArchive(options.archive)
+    pricingEngine = PricingEngine.load(options.pricing)
+    runningTotals = RunningTotals.load(options.file, allProducts, pricingEngine)
+    server = createServer(allProducts, options.file, options.host, options.port, options.unix, [salesArchive, runningTotals], pricingEngine)
+    if options.unix:
+        print("Serving " + str(len(allProducts)) + " products on " + options.unix)
+    else:
+        print("Serving " + str(len(allProducts)) + " products on " + options.host + ":" + str(server.server_address[1]))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nStopping server.")
+    finally:
+        server.server_close()
+        salesArchive.close()
@@ -0,0 +1,267 @@
+# importing modules
+
+# Importing mmap for searching the index without reading it into memory
+import mmap
+# Importing os for file sizes, modification times and atomic renames
+import os
+# Importing struct for the header and for reading single index entries
+import struct
+# Importing sys for the byte order of the index columns
+import sys
+# Importing time for timing a lookup from the command line
+import time
+# Importing array for compact columns of SKUs and offsets
+from array import array
+
+# importing user made modules
+from read import parseProductLine, getJournalFileName, getCompactingJournalFileName, PRODUCT_FILE_HEADER
+
+# Index File Layout
+#   Header : magic (8 bytes), size (uint64) and modification time in nanoseconds
+#            (uint64) of the product file it belongs to, entry count (uint64)
+#   SKUs   : one int64 per product, in ascending order
+#   Offsets: one int64 per product, the byte position of its line in the product file
+INDEX_MAGIC = b"WECAREI1"
+INDEX_HEADER_FORMAT = "<8sQQQ"
+INDEX_HEADER_SIZE = struct.calcsize(INDEX_HEADER_FORMAT)
+
+# Helper Function for getting the index file name belonging to a product file.
+def getIndexFileName(fileName):
+    """
+    Helper Function
+    Building the name of the SKU index that belongs to a product file.
+    The index sits next to the product file (e.g., "products.txt.idx").
+
+    · Parameters:
+        fileName (str): The name of the product file (e.g., "products.txt").
+    · Returns:
+        str: The name of the index file.
+    · Raises:
+        Nothing
+    """
+    return fileName + ".idx"
+
+# Helper Function for writing the SKU index of a product file.
+def writeSkuIndex(fileName, skus, offsets):
+    """
+    Helper Function
+    Writing the index from SKU to the byte position of its line in a product file.
+    The size and modification time of the product file are stored in the header, so
+    an index left behind by a hand edit of the file is recognised as out of date.
+    Like the product file, the index goes to a temporary file that is renamed over
+    the old one.
+
+    · Parameters:
+        fileName (str): The name of the product file the index belongs to, already written.
+        skus (array): The SKUs, array("q"), in the order of the file.
+        offsets (array): The byte position of each SKU's line, array("q").
+    · Returns:
+        bool: True if the index was written, False otherwise.
+    · Raises:
+        (Prints error messages to the console instead of raising, returns False.
+         Lookups rebuild a missing or out-of-date index, so nothing is lost.)
+    """
+    indexFileName = getIndexFileName(fileName)
+    tempFileName = indexFileName + ".tmp"
+    try:
+        if any(skus[position] >= skus[position + 1] for position in range(len(skus) - 1)):
+            # Sorting by SKU, only needed if the products were not written in SKU order
+            order = sorted(range(len(skus)), key=skus.__getitem__)
+            skus = array("q", (skus[position] for position in order))
+            offsets = array("q", (offsets[position] for position in order))
+        if sys.byteorder == "big":
+            # Keeping the columns little-endian, like the header
+            skus = array("q", skus)
+            skus.byteswap()
+            offsets = array("q", offsets)
+            offsets.byteswap()
+        fileStats = os.stat(fileName)
+        file = open(tempFileName, "wb")
+        file.write(struct.pack(INDEX_HEADER_FORMAT, INDEX_MAGIC, fileStats.st_size, fileStats.st_mtime_ns, len(skus)))
+        skus.tofile(file)
+        offsets.tofile(file)
+        file.close()
+        os.replace(tempFileName, indexFileName)
+        return True
+    except Exception as e:
+        print("Error writing SKU index '" + indexFileName + "': " + str(e))
+        return False
+
+# Helper Function for building the SKU index by scanning a product file.
+def buildSkuIndex(fileName):
+    """
+    Helper Function
+    Scanning a product file once and writing its SKU index, e.g. after the file was
+    edited by hand or migrated.
+
+    · Parameters:
+        fileName (str): The name of the product file (e.g., "products.txt").
+    · Returns:
+        bool: True if the index was written, False otherwise.
+    · Raises:
+        (Prints error messages to the console instead of raising, returns False.)
+    """
+    skus = array("q")
+    offsets = array("q")
+    try:
+        file = open(fileName, "rb")
+        try:
+            offset = 0
+            for line in file:
+                if line.strip() and not line.startswith(b"#"):
+                    skus.append(int(line[:line.index(b",")]))
+                    offsets.append(offset)
+                offset += len(line)
+        finally:
+            file.close()
+    except Exception as e:
+        print("Error indexing '" + fileName + "': " + str(e))
+        return False
+    return writeSkuIndex(fileName, skus, offsets)
+
+# Helper Function for finding the byte position of one product in a product file.
+def findRecordOffset(fileName, sku):
+    """
+    Helper Function
+    Looking up the byte position of a product's line with a binary search over the
+    memory-mapped index, reading only a few entries of it. An index that is missing
+    or does not belong to the current product file is rebuilt first.
+
+    · Parameters:
+        fileName (str): The name of the product file (e.g., "products.txt").
+        sku (int): The SKU (product ID) to find.
+    · Returns:
+        int: The byte position of the product's line, or None if the SKU is not in the file.
+    · Raises:
+        (Prints error messages to the console and returns None if the index cannot be built.)
+    """
+    indexFileName = getIndexFileName(fileName)
+    for attempt in range(2):
+        try:
+            fileStats = os.stat(fileName)
+            indexFile = open(indexFileName, "rb")
+        except FileNotFoundError:
+            indexFile = None
+        if indexFile is not None:
+            try:
+                header = indexFile.read(INDEX_HEADER_SIZE)
+                if len(header) == INDEX_HEADER_SIZE:
+                    magic, fileSize, fileTime, count = struct.unpack(INDEX_HEADER_FORMAT, header)
+                    if magic == INDEX_MAGIC and fileSize == fileStats.st_size and fileTime == fileStats.st_mtime_ns:
+                        if count == 0:
+                            return None
+                        mappedIndex = mmap.mmap(indexFile.fileno(), 0, access=mmap.ACCESS_READ)
+                        try:
+                            low = 0
+                            high = count - 1
+                            while low <= high:
+                                middle = (low + high) // 2
+                                middleSku = struct.unpack_from("<q", mappedIndex, INDEX_HEADER_SIZE + middle * 8)[0]
+                                if middleSku == sku:
+                                    return struct.unpack_from("<q", mappedIndex, INDEX_HEADER_SIZE + (count + middle) * 8)[0]
+                                if middleSku < sku:
+                                    low = middle + 1
+                                else:
+                                    high = middle - 1
+                            return None
+                        finally:
+                            mappedIndex.close()
+            finally:
+                indexFile.close()
+        if attempt == 0 and not buildSkuIndex(fileName): # Missing or out of date, rebuilding once
+            return None
+    return None
+
+# Helper Function for finding the latest journalled quantity and cost price of one product.
+def findJournalChange(fileName, sku):
+    """
+    Helper Function
+    Reading the journals of a product file (at most JOURNAL_COMPACT_SIZE bytes each,
+    see write.py) for the last committed quantity and cost price of one product.
+
+    · Parameters:
+        fileName (str): The name of the product file (e.g., "products.txt").
+        sku (int): The SKU (product ID).
+    · Returns:
+        tuple: (Quantity, CostPrice) of the latest record, or None if the product
+               was not changed since the last snapshot.
+    · Raises:
+        (Unreadable or incomplete records are skipped.)
+    """
+    journalFileName = getJournalFileName(fileName)
+    prefix = str(sku) + ":"
+    latest = None
+    for name in (getCompactingJournalFileName(journalFileName), journalFileName):
+        try:
+            file = open(name, "r")
+        except FileNotFoundError:
+            continue
+        try:
+            for line in file:
+                if not line.endswith("\n") or "|" not in line:
+                    continue
+                for change in line.replace("\n", "").split("|")[1].split(";"):
+                    if change.startswith(prefix):
+                        changeParts = change.split(":")
+                        latest = (int(changeParts[1]), int(changeParts[2]))
+        finally:
+            file.close()
+    return latest
+
+# Function for reading one product without loading the catalogue.
+def lookupProduct(fileName, sku):
+    """
+    Main Function
+    Reading the current details of one product from a text product file: its line is
+    found through the SKU index and read on its own, and the changes journalled since
+    the last snapshot are applied, so the whole catalogue is never parsed.
+
+    · Parameters:
+        fileName (str): The name of the product file (e.g., "products.txt").
+        sku (int): The SKU (product ID).
+    · Returns:
+        list: [Name, Brand, Quantity, CostPrice, Origin], or None if the SKU is not
+              in the file or the file could not be read.
+    · Raises:
+        (Prints error messages to the console instead of raising, returns None.)
+    · Example (Only for demonstration purposes):
+        lookupProduct("products.txt", 3)   # ['Sunscreen', 'Himalaya', 100, 550, 'Australia']
+        python skuindex.py products.txt 3
+    """
+    offset = findRecordOffset(fileName, sku)
+    if offset is None:
+        return None
+    try:
+        file = open(fileName, "rb")
+        try:
+            file.seek(offset)
+            line = file.readline().decode("utf-8")
+        finally:
+            file.close()
+        lineSku, separator, fields = line.partition(",")
+        if int(lineSku) != sku:
+            # The file changed between the index check and the read
+            return None
+        details = parseProductLine(fields)
+    except Exception as e:
+        print("Error reading SKU " + str(sku) + " from '" + fileName + "': " + str(e))
+        return None
+    journalChange = findJournalChange(fileName, sku)
+    if journalChange is not None:
+        details[2], details[3] = journalChange
+    return details
+
+# Main Program Execution Block
+if __name__ == "__main__":
+    if len(sys.argv) != 3 or not sys.argv[2].isdigit():
+        print("Usage: python skuindex.py <product file> <SKU>")
+        sys.exit(2)
+    start = time.perf_counter()
+    details = lookupProduct(sys.argv[1], int(sys.argv[2]))
+    elapsed = (time.perf_counter() - start) * 1000
+    if details is None:
+        print("SKU " + sys.argv[2] + " not found in '" + sys.argv[1] + "'.")
+        sys.exit(1)
+    print(PRODUCT_FILE_HEADER[1:])
+    print(sys.argv[2] + "," + ",".join(str(value) for value in details))
+    print("Found in " + str(round(elapsed, 2)) + " ms")
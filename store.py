@@ -0,0 +1,324 @@
+# importing modules
+
+# Importing array for compact, typed columns of numbers
+from array import array
+# Importing mul for multiplying two columns element by element
+from operator import mul
+# Importing MutableMapping so the store can be used like the product dictionary
+from collections.abc import MutableMapping
+# NumPy is optional, it only speeds up whole-catalogue calculations
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Index of each detail in a product record, same order as the product file
+NAME, BRAND, QUANTITY, COST_PRICE, ORIGIN = 0, 1, 2, 3, 4
+
+# Class for storing each distinct string once and referring to it by a number.
+class StringPool:
+    """
+    Helper Class
+    Dictionary-encoding repeated strings (names, brands, origins): each distinct
+    string is stored once and every product keeps only its small integer code.
+
+    · Example (Only for demonstration purposes):
+        pool = StringPool()
+        pool.encode("Cetaphil")   # 0
+        pool.encode("Cetaphil")   # 0 again, the string is stored once
+        pool.decode(0)            # "Cetaphil"
+    """
+
+    def __init__(self):
+        self.values = []  # Code -> string
+        self.codes = {}   # String -> code, None until needed after unpickling
+
+    def __getstate__(self):
+        # Only the strings are kept, the codes are rebuilt from them on the first encode
+        return {"values": self.values, "codes": None}
+
+    def encode(self, value):
+        """
+        Getting the code of a string, adding it to the pool if it is new.
+
+        · Parameters:
+            value (str): The string to encode.
+        · Returns:
+            int: The code of the string.
+        """
+        if self.codes is None:
+            self.codes = dict(zip(self.values, range(len(self.values))))
+        code = self.codes.get(value)
+        if code is None:
+            code = len(self.values)
+            self.values.append(value)
+            self.codes[value] = code
+        return code
+
+    def decode(self, code):
+        """
+        Getting the string belonging to a code.
+
+        · Parameters:
+            code (int): The code of the string.
+        · Returns:
+            str: The string.
+        """
+        return self.values[code]
+
+# Class for finding the row of a product when the product IDs are consecutive.
+class DenseRowIndex:
+    """
+    Helper Class
+    The product ID -> row lookup of a ProductStore whose rows hold the IDs
+    firstId, firstId + 1, firstId + 2, ... in order, as in a freshly written product
+    file. The row is worked out from the ID instead of being kept in a dictionary
+    entry per product, so a cached catalogue loads without rebuilding that dictionary.
+    """
+
+    __slots__ = ("firstId", "count")
+
+    def __init__(self, firstId, count):
+        self.firstId = firstId
+        self.count = count
+
+    def get(self, productId, default=None):
+        if type(productId) is not int:
+            return default
+        row = productId - self.firstId
+        if 0 <= row < self.count:
+            return row
+        return default
+
+    def __getitem__(self, productId):
+        row = self.get(productId)
+        if row is None:
+            raise KeyError(productId)
+        return row
+
+    def __contains__(self, productId):
+        return self.get(productId) is not None
+
+    def __len__(self):
+        return self.count
+
+    def toDict(self):
+        """
+        Building the usual dictionary lookup, once the IDs stop being consecutive.
+
+        · Returns:
+            dict: Product ID -> row.
+        """
+        return dict(zip(range(self.firstId, self.firstId + self.count), range(self.count)))
+
+# Class for accessing one product of the store like a list of details.
+class ProductRecord:
+    """
+    Helper Class
+    A view on one product inside a ProductStore that behaves like the usual list
+    [Name, Brand, Quantity, CostPrice, Origin]: it can be indexed, changed by index
+    (e.g., record[2] = 5) and unpacked. Changes go straight into the store's columns.
+    """
+
+    __slots__ = ("store", "row")
+
+    def __init__(self, store, row):
+        self.store = store
+        self.row = row
+
+    def __getitem__(self, index):
+        store = self.store
+        if index == QUANTITY:
+            return store.quantities[self.row]
+        if index == COST_PRICE:
+            return store.costs[self.row]
+        if index == NAME:
+            return store.namePool.decode(store.names[self.row])
+        if index == BRAND:
+            return store.brandPool.decode(store.brands[self.row])
+        if index == ORIGIN:
+            return store.originPool.decode(store.origins[self.row])
+        raise IndexError("product record index out of range")
+
+    def __setitem__(self, index, value):
+        store = self.store
+        if index == QUANTITY:
+            store.quantities[self.row] = value
+        elif index == COST_PRICE:
+            store.costs[self.row] = value
+        elif index == NAME:
+            store.names[self.row] = store.namePool.encode(value)
+        elif index == BRAND:
+            store.brands[self.row] = store.brandPool.encode(value)
+        elif index == ORIGIN:
+            store.origins[self.row] = store.originPool.encode(value)
+        else:
+            raise IndexError("product record index out of range")
+
+    def __len__(self):
+        return 5
+
+    def __iter__(self):
+        for index in range(5):
+            yield self[index]
+
+    def __eq__(self, other):
+        return list(self) == list(other)
+
+    def __repr__(self):
+        return repr(list(self))
+
+# Class for keeping the whole catalogue in compact columns.
+class ProductStore(MutableMapping):
+    """
+    Main Class
+    Storing the product catalogue in array-backed columns instead of one list per
+    product: quantity and cost price are typed integer arrays, and name, brand and
+    origin are dictionary-encoded through a StringPool.
+    It can be used everywhere the product dictionary is used: store[productId] returns
+    a ProductRecord that reads and writes like [Name, Brand, Quantity, CostPrice, Origin],
+    so code such as getValidProductId, sellProducts and restockProducts works unchanged.
+    Whole-catalogue figures (e.g., totalStockValue) run over the columns directly.
+
+    · Example (Only for demonstration purposes):
+        store = ProductStore()
+        store[1] = ['Serum', 'Garnier', 10, 500, 'France']
+        store[1][2] -= 4
+        store.totalStockValue()   # 3000
+    """
+
+    def __init__(self):
+        self.rowById = {}            # Product ID -> row in the columns (or a DenseRowIndex)
+        self.ids = array("q")        # Row -> product ID
+        self.names = array("i")      # Row -> code in namePool
+        self.brands = array("i")     # Row -> code in brandPool
+        self.quantities = array("q")
+        self.costs = array("q")
+        self.origins = array("i")    # Row -> code in originPool
+        self.namePool = StringPool()
+        self.brandPool = StringPool()
+        self.originPool = StringPool()
+
+    def __getitem__(self, productId):
+        return ProductRecord(self, self.rowById[productId])
+
+    def __setitem__(self, productId, details):
+        name, brand, qty, cost, origin = details
+        row = self.rowById.get(productId)
+        if row is None: # Adding a new row at the end of every column
+            if type(self.rowById) is DenseRowIndex:
+                if productId == self.rowById.firstId + self.rowById.count:
+                    self.rowById.count += 1 # Still consecutive
+                else:
+                    self.rowById = self.rowById.toDict()
+            if type(self.rowById) is dict:
+                self.rowById[productId] = len(self.ids)
+            self.ids.append(productId)
+            self.names.append(self.namePool.encode(name))
+            self.brands.append(self.brandPool.encode(brand))
+            self.quantities.append(qty)
+            self.costs.append(cost)
+            self.origins.append(self.originPool.encode(origin))
+        else: # Replacing the details of an existing product
+            record = ProductRecord(self, row)
+            for index, value in enumerate((name, brand, qty, cost, origin)):
+                record[index] = value
+
+    def __delitem__(self, productId):
+        if type(self.rowById) is DenseRowIndex:
+            self.rowById = self.rowById.toDict() # Rows are moved below, the IDs stop being consecutive
+        row = self.rowById.pop(productId)
+        lastRow = len(self.ids) - 1
+        # Moving the last row into the freed row so the columns stay dense
+        for column in (self.ids, self.names, self.brands, self.quantities, self.costs, self.origins):
+            column[row] = column[lastRow]
+            column.pop()
+        if row != lastRow:
+            self.rowById[self.ids[row]] = row
+
+    def __contains__(self, productId):
+        return productId in self.rowById
+
+    def __iter__(self):
+        return iter(self.ids)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __repr__(self):
+        return "ProductStore(" + str(len(self)) + " products)"
+
+    def __getstate__(self):
+        # Pickled for the snapshot cache (see readProductFile): consecutive IDs are
+        # stored as a DenseRowIndex instead of a dictionary entry per product
+        state = dict(self.__dict__)
+        state.pop("loadedFrom", None)
+        ids = self.ids
+        if type(self.rowById) is dict and len(ids) and ids[-1] - ids[0] == len(ids) - 1 and all(ids[row] == ids[0] + row for row in range(len(ids))):
+            state["rowById"] = DenseRowIndex(ids[0], len(ids))
+        return state
+
+    def copy(self):
+        """
+        Copying the whole store column by column, e.g. for writing a snapshot while
+        sales continue. Much faster than copying product by product.
+
+        · Returns:
+            ProductStore: An independent copy.
+        """
+        copied = ProductStore()
+        copied.ids = array("q", self.ids)
+        copied.names = array("i", self.names)
+        copied.brands = array("i", self.brands)
+        copied.quantities = array("q", self.quantities)
+        copied.costs = array("q", self.costs)
+        copied.origins = array("i", self.origins)
+        if type(self.rowById) is DenseRowIndex:
+            copied.rowById = DenseRowIndex(self.rowById.firstId, self.rowById.count)
+        else:
+            copied.rowById = dict(self.rowById)
+        for pool in ("namePool", "brandPool", "originPool"):
+            copiedPool = StringPool()
+            copiedPool.values = list(getattr(self, pool).values)
+            copiedPool.codes = None # Rebuilt if the copy ever encodes a string
+            setattr(copied, pool, copiedPool)
+        return copied
+
+    # Whole-catalogue operations
+
+    def totalUnits(self):
+        """
+        Counting all units in stock.
+
+        · Returns:
+            int: The sum of the quantity column.
+        """
+        return sum(self.quantities)
+
+    def totalStockValue(self, priceMultiplier=1):
+        """
+        Calculating the value of all stock at cost price (or at a multiple of it,
+        e.g., 2 for the selling price) in one pass over the quantity and cost columns.
+
+        · Parameters:
+            priceMultiplier (int): The factor applied to the cost price.
+        · Returns:
+            int: The sum of quantity * cost price * priceMultiplier over all products.
+        """
+        if numpy is not None and len(self.ids):
+            quantities = numpy.frombuffer(self.quantities, dtype=numpy.int64)
+            costs = numpy.frombuffer(self.costs, dtype=numpy.int64)
+            return int(numpy.dot(quantities, costs)) * priceMultiplier
+        return sum(map(mul, self.quantities, self.costs)) * priceMultiplier
+
+    def lowStockIds(self, threshold):
+        """
+        Finding the products whose stock is at or below a threshold.
+
+        · Parameters:
+            threshold (int): The highest quantity still counted as low stock.
+        · Returns:
+            list: The product IDs with quantity <= threshold, in catalogue order.
+        """
+        ids = self.ids
+        return [ids[row] for row, qty in enumerate(self.quantities) if qty <= threshold]
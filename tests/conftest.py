@@ -0,0 +1,41 @@
+# importing modules
+import os
+import sys
+
+import pytest
+
+# The modules of the inventory system sit next to this folder, not in a package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# importing user made modules
+from write import writeProductsToFile
+
+# Products every test starts with: [Name, Brand, Quantity, CostPrice, Origin]
+SAMPLE_PRODUCTS = {
+    1: ["Skin Cleanser", "Cetaphil", 10, 100, "Switzerland"],
+    2: ["Sunscreen", "Neutrogena", 5, 200, "USA"],
+    3: ["Face Serum", "Garnier", 0, 300, "France"],
+}
+
+def copyProducts(products=SAMPLE_PRODUCTS):
+    """
+    Copying a catalogue, so a test can change the quantities of its own copy.
+    """
+    return dict((productId, list(details)) for productId, details in products.items())
+
+@pytest.fixture
+def workDir(tmp_path, monkeypatch):
+    """
+    Running a test in an empty folder, as invoices and journals are written next to
+    the product file and into the current folder.
+    """
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+@pytest.fixture
+def productFile(workDir):
+    """
+    Writing the sample catalogue as "products.txt" and returning its name.
+    """
+    assert writeProductsToFile("products.txt", copyProducts())
+    return "products.txt"
@@ -0,0 +1,84 @@
+# Tests of carts holding their stock until checkout (user-021)
+
+# importing modules
+import pytest
+
+# importing user made modules
+import engine
+from engine import Inventory, InventoryError, NOT_ENOUGH_STOCK, COMMIT_FAILED, EMPTY_ORDER
+from read import readProductFile
+
+def loadInventory(productFile):
+    return Inventory(readProductFile(productFile, useCache=False), productFile)
+
+def test_cartHoldsItsStockFromOtherCarts(productFile):
+    inventory = loadInventory(productFile)
+    firstCart = inventory.newCart()
+    secondCart = inventory.newCart()
+    firstCart.add(1, 3)
+    held = inventory.quoteSaleItem(1, 3)["totalQty"] # Free items are held too
+
+    assert secondCart.available(1) == 10 - held
+    with pytest.raises(InventoryError) as error:
+        secondCart.add(1, 10 - held + 1)
+    assert error.value.code == NOT_ENOUGH_STOCK
+    assert secondCart.lines() == []
+
+    firstCart.release()
+    assert secondCart.available(1) == 10
+
+def test_rejectedLinesLeaveTheCartAsItWas(productFile):
+    inventory = loadInventory(productFile)
+    cart = inventory.newCart()
+    cart.addLines([(1, 2), (2, 1), (1, 1)])
+    assert cart.lines() == [(1, 3), (2, 1)]
+
+    with pytest.raises(InventoryError) as error:
+        cart.addLines([(2, 1), (3, 1)]) # Product 3 is out of stock
+    assert error.value.code == NOT_ENOUGH_STOCK
+    assert cart.lines() == [(1, 3), (2, 1)]
+
+def test_checkoutSellsTheCartAndFreesItsHold(productFile):
+    inventory = loadInventory(productFile)
+    cart = inventory.newCart()
+    cart.add(2, 1)
+    invoice = cart.checkout("Bob", "9800000000")
+
+    assert invoice.saved
+    assert inventory.products[2][2] == 4
+    assert not cart.isHeld()
+    assert readProductFile(productFile, useCache=False)[2][2] == 4
+    with pytest.raises(InventoryError) as error:
+        cart.checkout("Bob", "9800000000")
+    assert error.value.code == EMPTY_ORDER
+
+def test_failedCommitPutsTheStockBack(productFile, monkeypatch):
+    inventory = loadInventory(productFile)
+    calls = []
+    def failFirstCommit(fileName, productDataDict, changedIds):
+        calls.append(productDataDict[2][2])
+        return len(calls) > 1 # The second call saves the stock as it was
+    monkeypatch.setattr(engine, "commitInventoryChanges", failFirstCommit)
+    cart = inventory.newCart()
+    cart.add(2, 1)
+
+    with pytest.raises(InventoryError) as error:
+        cart.checkout("Bob", "9800000000")
+    assert error.value.code == COMMIT_FAILED
+    assert "Nothing was sold" in str(error.value)
+    assert calls == [4, 5]
+    assert inventory.products[2][2] == 5
+    assert cart.isHeld()
+
+def test_failedCompensatingCommitAsksForRestart(productFile, monkeypatch):
+    inventory = loadInventory(productFile)
+    monkeypatch.setattr(engine, "commitInventoryChanges", lambda fileName, productDataDict, changedIds: False)
+    cart = inventory.newCart()
+    cart.add(2, 1)
+
+    with pytest.raises(InventoryError) as error:
+        cart.checkout("Bob", "9800000000")
+    assert error.value.code == COMMIT_FAILED
+    assert "Restart" in str(error.value)
+    assert inventory.products[2][2] == 5
+    assert readProductFile(productFile, useCache=False)[2][2] == 5
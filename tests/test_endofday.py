@@ -0,0 +1,58 @@
+# Tests of the end-of-day statements and how they are split between workers (user-022)
+
+# importing modules
+import zipfile
+
+# importing user made modules
+from archive import SalesArchive
+from endofday import partitionParties, renderStatementRange, writeEndOfDayArchive
+
+DAY = "2026-05-01"
+
+def recordLines(archiveFileName, lineCount):
+    """
+    Recording lineCount sale lines spread over 40 customers, and two restocks.
+    """
+    rows = []
+    for number in range(lineCount):
+        party = "Customer " + str(number % 40).zfill(2)
+        rows.append(("SALE", "SALES_" + str(number), DAY, DAY + " 10:00:00", party, "98" + str(number % 40), 1, "Skin Cleanser", "Cetaphil", "Switzerland", 2, 2, 200, 100, 400))
+    for number in range(2):
+        rows.append(("RESTOCK", "RESTOCK_" + str(number), DAY, DAY + " 09:00:00", "Supplier", "9700000000", 1, "Skin Cleanser", "Cetaphil", "Switzerland", 5, 5, 100, 100, 500))
+    salesArchive = SalesArchive(archiveFileName)
+    salesArchive.insertLines(rows)
+    salesArchive.close()
+
+def readStatements(zipFileName):
+    with zipfile.ZipFile(zipFileName) as zipFile:
+        return dict((name, zipFile.read(name)) for name in zipFile.namelist() if name != "summary.txt")
+
+def test_rangesNeverSplitAPartyOrMixKinds():
+    dayParties = [("RESTOCK", "A", "1", 5), ("SALE", "A", "1", 3), ("SALE", "A", "2", 3), ("SALE", "B", "1", 1), ("SALE", "C", "1", 10), ("SALE", "D", "1", 1)]
+    ranges = list(partitionParties(dayParties, batchLines=4))
+
+    # Both phones of "A" stay in one range even though it is past batchLines
+    assert ranges == [("RESTOCK", "A", "A", 1), ("SALE", "A", "A", 2), ("SALE", "B", "C", 4), ("SALE", "D", "D", 6)]
+
+def test_workersWriteTheSameStatementsAsOneProcess(workDir):
+    recordLines("sales.db", 400)
+    single = writeEndOfDayArchive("sales.db", DAY, "single.zip", workers=1, batchLines=25)
+    pooled = writeEndOfDayArchive("sales.db", DAY, "pooled.zip", workers=4, batchLines=25)
+
+    assert single["customers"] == pooled["customers"] == 40
+    assert single["suppliers"] == pooled["suppliers"] == 1
+    assert single["lines"] == pooled["lines"] == 402
+    assert single["revenue"] == pooled["revenue"] == 400 * 400
+    assert readStatements("single.zip") == readStatements("pooled.zip")
+
+def test_linesRecordedAfterTheRangesAreLeftOut(workDir):
+    recordLines("sales.db", 40)
+    salesArchive = SalesArchive("sales.db")
+    lastLineId = salesArchive.getLastLineId()
+    salesArchive.close()
+    recordLines("sales.db", 40) # Sales made while the day is being closed
+
+    rendered = renderStatementRange("sales.db", DAY, "SALE", "Customer 00", "Customer 39", 1, lastLineId)
+    assert len(rendered) == 40
+    assert sum(lineCount for archiveName, data, lineCount, total in rendered) == 40
+    assert rendered[0][0].startswith("customers/000001_Customer_00_")
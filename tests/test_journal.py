@@ -0,0 +1,73 @@
+# Tests of the transaction journal (user-001) and the snapshot footer (user-002)
+
+# importing modules
+import os
+
+# importing user made modules
+from read import readProductFile, getJournalFileName, readCommitStamp
+from write import commitInventoryChanges, compactJournal, appendJournalRecords, writeProductsToFile
+
+def test_committedCartsAreReplayedOnLoad(productFile):
+    products = readProductFile(productFile, useCache=False)
+    products[1][2] = 7
+    products[2][3] = 250
+    assert commitInventoryChanges(productFile, products, [1, 2])
+    assert os.path.exists(getJournalFileName(productFile))
+
+    reloaded = readProductFile(productFile, useCache=False)
+    assert reloaded[1][2] == 7
+    assert reloaded[2][3] == 250
+    assert reloaded[3][2] == 0
+
+def test_incompleteJournalRecordIsIgnored(productFile):
+    products = readProductFile(productFile, useCache=False)
+    products[1][2] = 9
+    assert commitInventoryChanges(productFile, products, [1])
+    # A crash while appending leaves a record without its newline
+    with open(getJournalFileName(productFile), "a") as journalFile:
+        journalFile.write("2026-01-01 00:00:00|1:2:")
+
+    reloaded = readProductFile(productFile, useCache=False)
+    assert reloaded[1][2] == 9
+
+def test_failedJournalWriteReportsFailure(workDir):
+    os.mkdir("products.txt.journal") # A folder cannot be appended to
+    assert not appendJournalRecords("products.txt.journal", ["2026-01-01 00:00:00|1:1:1\n"])
+
+def test_compactionFoldsJournalAndKeepsCommitStamp(productFile):
+    products = readProductFile(productFile, useCache=False)
+    products[2][2] = 1
+    assert commitInventoryChanges(productFile, products, [2])
+    commitStamp = readCommitStamp(productFile)
+
+    assert compactJournal(productFile, products)
+    assert not os.path.exists(getJournalFileName(productFile))
+    assert readCommitStamp(productFile) == commitStamp
+    assert readProductFile(productFile, useCache=False)[2][2] == 1
+
+def test_snapshotWithWrongChecksumIsRejected(productFile):
+    with open(productFile) as file:
+        content = file.read()
+    with open(productFile, "w") as file:
+        file.write(content.replace("Sunscreen,Neutrogena,5,", "Sunscreen,Neutrogena,6,"))
+
+    assert len(readProductFile(productFile, useCache=False)) == 0
+
+def test_snapshotWithoutFooterIsRejected(productFile):
+    with open(productFile) as file:
+        lines = file.readlines()
+    with open(productFile, "w") as file:
+        file.writelines(lines[:-1]) # Cut short before the footer
+
+    assert len(readProductFile(productFile, useCache=False)) == 0
+
+def test_failedSnapshotWriteKeepsOldFile(productFile, monkeypatch):
+    def failingFsync(descriptor):
+        raise OSError("disk full")
+    products = readProductFile(productFile, useCache=False)
+    products[1][2] = 0
+    with monkeypatch.context() as patch:
+        patch.setattr(os, "fsync", failingFsync)
+        assert not writeProductsToFile(productFile, products)
+
+    assert readProductFile(productFile, useCache=False)[1][2] == 10
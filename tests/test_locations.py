@@ -0,0 +1,79 @@
+# Tests of location ownership and the transfer inbox (user-020)
+
+# importing modules
+import os
+
+# importing user made modules
+from conftest import copyProducts
+from locations import LocationSet, getShardFileName, claimLocation, releaseLocation, sendTransfer, readPendingTransfers
+from read import readProductFile
+from write import writeProductsToFile, commitInventoryChanges
+
+def createShards(workDir):
+    for location in ("kathmandu", "pokhara"):
+        assert writeProductsToFile(getShardFileName("products.txt", location), copyProducts())
+    return getShardFileName("products.txt", "pokhara")
+
+def startReceiving(shardFileName):
+    """
+    Renaming the waiting transfer the way receiveTransfers does before saving it.
+    """
+    (transferFileName, fromLocation, productId, quantity, details, before), = readPendingTransfers(shardFileName)
+    quantityBefore = readProductFile(shardFileName, useCache=False)[productId][2]
+    os.replace(transferFileName, transferFileName + ".receiving-" + str(quantityBefore))
+    return productId, quantity
+
+def test_onlyOneProcessOwnsALocation(productFile):
+    assert claimLocation(productFile)
+    assert not claimLocation(productFile)
+    assert claimLocation(productFile, force=True)
+    releaseLocation(productFile)
+    assert not os.path.exists(productFile + ".owner")
+
+def test_transferReachesTheInboxAndIsAddedOnce(workDir):
+    pokharaFileName = createShards(workDir)
+    kathmandu = LocationSet.load("products.txt", ownLocation="kathmandu")
+    assert kathmandu.transfer(1, 4, "kathmandu", "pokhara")
+    assert kathmandu.stores["kathmandu"][1][2] == 6
+    assert len(kathmandu.pending["pokhara"]) == 1
+    assert readProductFile(pokharaFileName, useCache=False)[1][2] == 10 # Only its owner writes it
+
+    pokhara = LocationSet.load("products.txt", ownLocation="pokhara")
+    assert pokhara.receiveTransfers("pokhara") == [1]
+    assert pokhara.receiveTransfers("pokhara") == []
+    assert readProductFile(pokharaFileName, useCache=False)[1][2] == 14
+    assert readPendingTransfers(pokharaFileName, True) == []
+
+def test_transferSavedBeforeACrashIsNotAddedAgain(workDir):
+    pokharaFileName = createShards(workDir)
+    assert sendTransfer(pokharaFileName, "kathmandu", 2, copyProducts()[2], 3)
+    productId, quantity = startReceiving(pokharaFileName)
+    # The crash came after the stock was saved but before the file was removed
+    products = readProductFile(pokharaFileName, useCache=False)
+    products[productId][2] += quantity
+    assert commitInventoryChanges(pokharaFileName, products, [productId])
+
+    pokhara = LocationSet.load("products.txt", ownLocation="pokhara")
+    assert pokhara.receiveTransfers("pokhara") == []
+    assert pokhara.stores["pokhara"][2][2] == 8
+    assert readPendingTransfers(pokharaFileName, True) == []
+
+def test_transferNotSavedBeforeACrashIsAdded(workDir):
+    pokharaFileName = createShards(workDir)
+    assert sendTransfer(pokharaFileName, "kathmandu", 2, copyProducts()[2], 3)
+    startReceiving(pokharaFileName) # The crash came before the stock was saved
+
+    pokhara = LocationSet.load("products.txt", ownLocation="pokhara")
+    assert pokhara.receiveTransfers("pokhara") == [2]
+    assert readProductFile(pokharaFileName, useCache=False)[2][2] == 8
+    assert readPendingTransfers(pokharaFileName, True) == []
+
+def test_transferOfANewProductIsAddedOnce(workDir):
+    pokharaFileName = createShards(workDir)
+    newProduct = ["Lip Balm", "Nivea", 0, 50, "Germany"]
+    assert sendTransfer(pokharaFileName, "kathmandu", 9, newProduct, 2)
+
+    pokhara = LocationSet.load("products.txt", ownLocation="pokhara")
+    assert pokhara.receiveTransfers("pokhara") == [9]
+    assert readProductFile(pokharaFileName, useCache=False)[9] == ["Lip Balm", "Nivea", 2, 50, "Germany"]
+    assert pokhara.receiveTransfers("pokhara") == []
@@ -0,0 +1,36 @@
+# Tests of the inventory server rolling back transactions it could not save (user-008)
+
+# importing user made modules
+import server
+from server import InventoryService
+from read import readProductFile
+
+def test_transactionIsSavedThroughTheCommitter(productFile):
+    service = InventoryService(readProductFile(productFile, useCache=False), productFile)
+    response = service.runTransaction("sell", "Bob", "9800000000", [(2, 1)])
+
+    assert response["ok"]
+    assert readProductFile(productFile, useCache=False)[2][2] == 4
+
+def test_failedJournalWriteRollsBackTheStock(productFile, monkeypatch):
+    service = InventoryService(readProductFile(productFile, useCache=False), productFile)
+    appendJournalRecords = server.appendJournalRecords
+    calls = []
+    def failFirstWrite(journalFileName, records):
+        calls.append(records)
+        if len(calls) == 1:
+            return False
+        return appendJournalRecords(journalFileName, records)
+    monkeypatch.setattr(server, "appendJournalRecords", failFirstWrite)
+
+    response = service.runTransaction("sell", "Bob", "9800000000", [(2, 1)])
+    assert not response["ok"]
+    assert "Stock not changed" in response["error"]
+    assert service.productDataDict[2][2] == 5
+
+    response = service.runTransaction("restock", "Supplier", "9800000001", [(1, 5, 90)])
+    assert response["ok"]
+    reloaded = readProductFile(productFile, useCache=False)
+    assert reloaded[2][2] == 5
+    assert reloaded[1][2] == 15
+    assert reloaded[1][3] == 90
@@ -1,40 +1,359 @@
 # Importing the datetime library. This is needed for getting the current date and time 
 from datetime import datetime 
+# Importing os for flushing files to disk, atomic renames and removing the folded journal
+import os
+# Importing threading for writing snapshots in the background
+import threading
+# Importing zlib for the checksum in the snapshot footer
+import zlib
+# Importing itertools for the running invoice number
+import itertools
+# Importing queue for handing invoices to the background writer
+import queue
+# Importing atexit for flushing pending invoices when the program ends
+import atexit
+# Importing array for collecting the SKU index while a snapshot is written
+from array import array
+
+# importing user made modules
+from read import getJournalFileName, getCompactingJournalFileName, SNAPSHOT_FOOTER, PRODUCT_FILE_HEADER, getSnapshotKey, writeCachedSnapshot, readCommitStamp
+from skuindex import writeSkuIndex
+from store import ProductStore
+
+# Size (in bytes) after which the journal is folded into a fresh snapshot
+JOURNAL_COMPACT_SIZE = 64 * 1024
+# Running number used to keep invoice names unique within this process
+invoiceCounter = itertools.count(1)
+# Directory the background invoice writer files invoices in, one sub-directory per day
+INVOICE_DIRECTORY = "invoices"
+# Most invoices the background writer writes in one batch
+INVOICE_BATCH_SIZE = 100
+# Commit stamp (see getLastCommitStamp) of the last change saved by this process, per journal file
+lastCommitStamps = {}
 
 # File Handling Functions
 
+# Helper Function for getting the commit stamp of the last change saved to a product file.
+def getLastCommitStamp(fileName):
+    """
+    Helper Function
+    Getting the commit stamp of the last change this process saved to a product
+    file: the timestamp of its last journal record, or of its last snapshot if
+    one was written since. It is only looked up in memory, no file is read (see
+    readCommitStamp in read.py for the stamp on disk).
+
+    · Parameters:
+        fileName (str): The name of the product file (e.g., "products.txt").
+    · Returns:
+        str: The stamp, or None if this process has not saved a change to the file.
+    · Raises:
+        Nothing
+    """
+    return lastCommitStamps.get(getJournalFileName(fileName))
+
 # Helper Function for writing the current state of the product dictionary back to the text file.
-def writeProductsToFile(fileName, productDataDict):
+def writeProductsToFile(fileName, productDataDict, commitStamp=None):
     """
     Helper Function
     Writing the current product data from a dictionary back to a specified text file,
-    overwriting any existing content in that file.
+    replacing any existing content in that file.
+    The file starts with the PRODUCT_FILE_HEADER line and every product line starts
+    with its SKU (the product ID).
+    The data is written to a temporary file first, ending with a
+    "#END,count,crc32,stamp" footer, flushed to disk and then renamed over the old file,
+    so a crash mid-write never leaves a truncated catalogue behind. The stamp is the
+    commit stamp of the snapshot (see getLastCommitStamp).
+    The SKU index of the new file (see skuindex.py) is written next to it, and so is
+    the parsed snapshot cache when a ProductStore is written (see readProductFile).
 
     · Parameters:
         fileName (str): The name of the text file (e.g., "products.txt") to write to.
-        productDataDict (dict): A dictionary containing the current product data,
+        productDataDict (dict or ProductStore): A dictionary containing the current product data,
                                 where keys are product IDs and values are lists of details.
+        commitStamp (str): The commit stamp of the last change in the data, when a
+                           journal is folded into the snapshot (see compactJournal).
+                           By default the snapshot is a new change, stamped now.
     · Returns:
         bool: True if the data was successfully written to the file, if False otherwise.
     · Raises:
         (Prints error messages to the console for IOErrors or other general exceptions
-         encountered during file writing, instead, returns False.)
+         encountered during file writing, instead, returns False. The old file is left
+         untouched in that case.)
     """
 
+    tempFileName = fileName + ".tmp"
+    newChange = commitStamp is None
+    if newChange:
+        commitStamp = str(datetime.now())
     try:
-        # Opening the file in write mode ("w").
-        file = open(fileName, "w")
-        # Looping through each product (value) in the dictionary.
-        for details in productDataDict.values():
+        # Opening the temporary file in write mode ("w").
+        file = open(tempFileName, "w")
+        header = PRODUCT_FILE_HEADER + "\n"
+        file.write(header)
+        checksum = 0
+        recordCount = 0
+        skus = array("q")     # SKU and byte position of every line, for the SKU index
+        offsets = array("q")
+        offset = len(header)
+        # Looping through each product in the dictionary.
+        for productId, details in productDataDict.items():
             # Building the line item by item, converting all to string
-            line = details[0] + "," + details[1] + "," + str(details[2]) + "," + str(details[3]) + "," + details[4] + "\n"
+            line = str(productId) + "," + details[0] + "," + details[1] + "," + str(details[2]) + "," + str(details[3]) + "," + details[4] + "\n"
             file.write(line)      # Writing the formatted line to the file.
+            encodedLine = line.encode("utf-8")
+            checksum = zlib.crc32(encodedLine, checksum)
+            skus.append(productId)
+            offsets.append(offset)
+            offset += len(encodedLine)
+            recordCount += 1
+        # Writing the footer used by readProductFile to validate the snapshot
+        file.write(SNAPSHOT_FOOTER + "," + str(recordCount) + "," + str(checksum) + "," + commitStamp + "\n")
+        file.flush()
+        os.fsync(file.fileno())   # Making sure the data is on disk before the rename
         file.close()      # Closing the file after writing all product entries.
+        os.replace(tempFileName, fileName) # Atomically swapping in the new snapshot
+        if newChange:
+            lastCommitStamps[getJournalFileName(fileName)] = commitStamp
+        writeSkuIndex(fileName, skus, offsets) # A failed index is rebuilt by the next lookup
+        if type(productDataDict) is ProductStore:
+            # Refreshing the cache, so the next start does not parse the new snapshot
+            snapshotKey = getSnapshotKey(fileName)
+            if snapshotKey is not None:
+                writeCachedSnapshot(fileName, snapshotKey, productDataDict)
         return True
     except Exception as e:      # Handling errors during writing
         print("Error writing to file '" + fileName + "': " + str(e))
         return False
 
+# Helper Function for building the journal record of one committed cart.
+def formatJournalRecord(productDataDict, changedIds):
+    """
+    Helper Function
+    Building the journal line of one committed cart, holding the final quantity and
+    cost price of every changed product ("timestamp|id:qty:cost;id:qty:cost").
+
+    · Parameters:
+        productDataDict (dict or ProductStore): The dictionary containing the current product data.
+        changedIds (iterable): The product IDs touched by the cart.
+    · Returns:
+        str: The journal line (ending with a newline), or None if nothing changed.
+    · Raises:
+        KeyError: If a changed product ID is not in productDataDict.
+    """
+    changes = []
+    for productId in sorted(set(changedIds)):
+        details = productDataDict[productId]
+        changes.append(str(productId) + ":" + str(details[2]) + ":" + str(details[3]))
+    if not changes:
+        return None # Nothing changed, nothing to record
+    return str(datetime.now()) + "|" + ";".join(changes) + "\n"
+
+# Helper Function for appending journal records to the journal file.
+def appendJournalRecords(journalFileName, records):
+    """
+    Helper Function
+    Appending one or more journal records to the journal and forcing them to disk
+    with a single fsync, so several carts committed together cost one disk flush.
+
+    · Parameters:
+        journalFileName (str): The name of the journal file (e.g., "products.txt.journal").
+        records (list): The journal lines to append (see formatJournalRecord).
+    · Returns:
+        bool: True if the records were written and flushed to disk, False otherwise.
+    · Raises:
+        (Prints error messages to the console for IOErrors or other general exceptions
+         encountered during file writing, instead, returns False.)
+    """
+    if not records:
+        return True
+    try:
+        file = open(journalFileName, "a") # Opening journal in append mode ("a")
+        file.write("".join(records))
+        file.flush()
+        os.fsync(file.fileno()) # Making sure the records survive a crash
+        file.close()
+        lastCommitStamps[journalFileName] = records[-1].partition("|")[0]
+        return True
+    except Exception as e: # Handling errors during writing
+        print("Error writing to journal '" + journalFileName + "': " + str(e))
+        return False
+
+# Helper Function for appending one committed cart to the transaction journal.
+def appendJournalRecord(journalFileName, productDataDict, changedIds):
+    """
+    Helper Function
+    Appending one committed cart to the append-only transaction journal as a single
+    line and forcing it to disk, instead of rewriting the whole product file.
+    The record holds the final quantity and cost price of every changed product.
+
+    · Parameters:
+        journalFileName (str): The name of the journal file (e.g., "products.txt.journal").
+        productDataDict (dict or ProductStore): The dictionary containing the current product data.
+        changedIds (iterable): The product IDs touched by the cart.
+    · Returns:
+        bool: True if the record was written and flushed to disk, False otherwise.
+    · Raises:
+        (Prints error messages to the console for IOErrors or other general exceptions
+         encountered during file writing, instead, returns False.)
+    """
+    try:
+        record = formatJournalRecord(productDataDict, changedIds)
+    except Exception as e:
+        print("Error preparing journal record: " + str(e))
+        return False
+    if record is None:
+        return True
+    return appendJournalRecords(journalFileName, [record])
+
+# Helper Function for folding the journal into a fresh snapshot of the product file.
+def compactJournal(fileName, productDataDict, background=False):
+    """
+    Helper Function
+    Writing a fresh snapshot of the product file and removing the journal whose
+    records are now part of that snapshot.
+    The journal is first renamed to "<journal>.compacting" so new carts go to a fresh
+    journal, and the snapshot is taken from a copy of the current data. The folded
+    journal is removed only after the snapshot has been written, so a crash in between
+    only means its (harmless) records are replayed once more at startup.
+
+    · Parameters:
+        fileName (str): The name of the product file (e.g., "products.txt").
+        productDataDict (dict or ProductStore): The dictionary containing the current product data.
+        background (bool): If True, the snapshot is written by a background thread so
+                           sales can continue while a large catalogue is saved.
+    · Returns:
+        bool: True if the compaction was done (or started, in background mode),
+              False otherwise.
+    · Raises:
+        (Prints error messages to the console for errors during writing or removing,
+         instead, returns False. The folded journal is kept if the snapshot could not
+         be written.)
+    """
+    journalFileName = getJournalFileName(fileName)
+    compactingFileName = getCompactingJournalFileName(journalFileName)
+    try:
+        if os.path.exists(compactingFileName):
+            return False # A previous compaction is still running or has to be replayed first
+        if os.path.exists(journalFileName):
+            os.replace(journalFileName, compactingFileName)
+        # The snapshot holds no change the journal did not, so it keeps the journal's stamp
+        commitStamp = readCommitStamp(fileName)
+        # Copying the data so later sales do not change what is being written
+        if type(productDataDict) is ProductStore:
+            snapshot = productDataDict.copy() # Column by column
+        else:
+            snapshot = {}
+            for productId, details in productDataDict.items():
+                snapshot[productId] = list(details)
+    except Exception as e:
+        print("Error preparing compaction of '" + fileName + "': " + str(e))
+        return False
+
+    if background:
+        thread = threading.Thread(target=writeSnapshotAndRemoveJournal, args=(fileName, snapshot, compactingFileName, commitStamp))
+        thread.start()
+        return True
+    return writeSnapshotAndRemoveJournal(fileName, snapshot, compactingFileName, commitStamp)
+
+# Helper Function for writing a snapshot and removing the journal folded into it.
+def writeSnapshotAndRemoveJournal(fileName, snapshot, compactingFileName, commitStamp=None):
+    """
+    Helper Function
+    Writing the snapshot copy to the product file and then removing the journal
+    that was folded into it. Used by compactJournal, possibly from a background thread.
+
+    · Parameters:
+        fileName (str): The name of the product file (e.g., "products.txt").
+        snapshot (dict or ProductStore): A copy of the product data to write.
+        compactingFileName (str): The name of the journal being folded.
+        commitStamp (str): The stamp of its last record, kept by the snapshot.
+    · Returns:
+        bool: True if the snapshot was written and the journal removed, False otherwise.
+    · Raises:
+        (Prints error messages to the console instead of raising.)
+    """
+    if not writeProductsToFile(fileName, snapshot, commitStamp):
+        return False
+    try:
+        if os.path.exists(compactingFileName):
+            os.remove(compactingFileName)
+        return True
+    except Exception as e:
+        print("Error removing compacted journal '" + compactingFileName + "': " + str(e))
+        return False
+
+# Helper Function for making the stock changes of one cart permanent.
+def commitInventoryChanges(fileName, productDataDict, changedIds):
+    """
+    Helper Function
+    Making the stock changes of one committed cart permanent by appending them to
+    the transaction journal, and compacting the journal into a fresh snapshot once
+    it grows past JOURNAL_COMPACT_SIZE bytes.
+    Products loaded from a binary product file are already changed in place, so
+    for them the mapped file is only flushed to disk.
+
+    · Parameters:
+        fileName (str): The name of the product file (e.g., "products.txt").
+        productDataDict (dict or ProductStore): The dictionary containing the current product data.
+        changedIds (iterable): The product IDs touched by the cart.
+    · Returns:
+        bool: True if the changes were recorded, False otherwise.
+    · Raises:
+        (Prints error messages to the console for errors during writing, instead,
+         returns False. A failed compaction is reported but the changes are already
+         safe in the journal, so True is still returned.)
+    """
+    if hasattr(productDataDict, "flushChanges"):
+        # Binary product files were already updated in place, they only need flushing
+        return productDataDict.flushChanges(changedIds)
+    journalFileName = getJournalFileName(fileName)
+    if not appendJournalRecord(journalFileName, productDataDict, changedIds):
+        return False
+    compactJournalIfNeeded(fileName, productDataDict)
+    return True
+
+# Helper Function for checking if the journal has grown too large.
+def isJournalCompactionDue(fileName):
+    """
+    Helper Function
+    Checking if the journal of a product file has grown past JOURNAL_COMPACT_SIZE
+    bytes and no compaction of it is running.
+
+    · Parameters:
+        fileName (str): The name of the product file (e.g., "products.txt").
+    · Returns:
+        bool: True if the journal should be compacted now.
+    · Raises:
+        Nothing
+    """
+    journalFileName = getJournalFileName(fileName)
+    try:
+        journalSize = os.path.getsize(journalFileName) if os.path.exists(journalFileName) else 0
+    except OSError:
+        journalSize = 0
+    return journalSize > JOURNAL_COMPACT_SIZE and not os.path.exists(getCompactingJournalFileName(journalFileName))
+
+# Helper Function for compacting the journal once it has grown too large.
+def compactJournalIfNeeded(fileName, productDataDict):
+    """
+    Helper Function
+    Starting a background compaction of the journal once it grows past
+    JOURNAL_COMPACT_SIZE bytes.
+
+    · Parameters:
+        fileName (str): The name of the product file (e.g., "products.txt").
+        productDataDict (dict or ProductStore): The dictionary containing the current product data.
+    · Returns:
+        None
+    · Raises:
+        (Prints a warning if the compaction could not be started; the changes stay
+         safe in the journal.)
+    """
+    if isJournalCompactionDue(fileName):
+        # Compacting in the background so the checkout does not wait for the snapshot
+        if not compactJournal(fileName, productDataDict, background=True):
+            print("Warning: Journal compaction skipped, changes remain in the journal.")
+
 # Invoice Generation Functions
 
 # Helper Function for creating a unique filename for an invoice, including customer/supplier name.
@@ -48,7 +367,10 @@ def generateInvoiceName(type, name):
         type (str): A string indicating the type of invoice (e.g., "SALES", "RESTOCK").
         name (str): The customer or supplier name to be included in the filename.
     · Returns:
-        str: The generated unique invoice filename (e.g., "SALES_Customer_Name_YYYY-M-D_H-M.txt").
+        str: The generated unique invoice filename
+             (e.g., "SALES_Customer_Name_YYYY-M-D_H-M-S_PID-N.txt"). The process ID and a
+             running number make the name unique even for two checkouts of the same
+             customer in the same second, or on two terminals at once.
     · Raises:
         (Prints an error message if an exception occurs during timestamp generation. )
     """
@@ -57,13 +379,15 @@ def generateInvoiceName(type, name):
         # store present date and time .
         now = datetime.now()
         # convert and store time as string.
-        timestamp = str(now.year) + "-" + str(now.month) + "-" + str(now.day) + "_" + str(now.hour) + "-" + str(now.minute)    
-        return type + "_" + name + "_" + timestamp + ".txt" # Constructing filename
+        timestamp = str(now.year) + "-" + str(now.month) + "-" + str(now.day) + "_" + str(now.hour) + "-" + str(now.minute) + "-" + str(now.second)
+        # process ID and running number keep names from colliding
+        uniqueId = str(os.getpid()) + "-" + str(next(invoiceCounter))
+        return type + "_" + name + "_" + timestamp + "_" + uniqueId + ".txt" # Constructing filename
     except Exception as e:
         print("Error generating invoice name: " + str(e))
 
 # Helper Function for writing invoice lines to a file.
-def writeInvoice(fileName, lines):
+def writeInvoice(fileName, lines, announce=True):
     """
     Helper Function
     Writing an invoice to a specified text file.
@@ -72,6 +396,7 @@ def writeInvoice(fileName, lines):
         fileName (str): The name of the invoice file to be created/written to.
         lines (list): A list of strings, where each string is one line of the
                       invoice content.
+        announce (bool): If True, a success message is printed to the console.
     · Returns:
         bool: True if the invoice file was written successfully, False otherwise.
     · Raises:
@@ -83,8 +408,143 @@ def writeInvoice(fileName, lines):
         for line in lines:
             invoiceFile.write(line + "\n") # Writing each line
         invoiceFile.close() # Closing file
-        print("Invoice file generated successfully: " + fileName) 
+        if announce:
+            print("Invoice file generated successfully: " + fileName) 
         return True # Signaling success
     except Exception as e: # General exception for file writing issues
         print("Error writing invoice file '" + fileName + "': " + str(e))
         return False
+
+# Helper Function for saving an invoice directly or through the background writer.
+def saveInvoice(fileName, lines, invoiceWriter=None):
+    """
+    Helper Function
+    Saving an invoice: handing it to the background InvoiceWriter if one is given,
+    otherwise writing it right away with writeInvoice.
+
+    · Parameters:
+        fileName (str): The invoice file name (see generateInvoiceName).
+        lines (list): The invoice lines.
+        invoiceWriter (InvoiceWriter): Optional background writer.
+    · Returns:
+        bool: True if the invoice was written or queued, False otherwise.
+    · Raises:
+        (Prints error messages to the console instead of raising, returns False.)
+    """
+    if invoiceWriter is None:
+        return writeInvoice(fileName, lines)
+    try:
+        filePath = invoiceWriter.submit(fileName, lines)
+        print("Invoice file queued for writing: " + filePath)
+        return True
+    except Exception as e:
+        print("Error queueing invoice '" + fileName + "': " + str(e))
+        return False
+
+# Class for writing invoices in the background, so checkouts do not wait for the disk.
+class InvoiceWriter:
+    """
+    Main Class
+    Writing invoices on a background thread. A checkout only hands its invoice over
+    (submit) and carries on; the thread collects the waiting invoices and writes them
+    in batches of up to INVOICE_BATCH_SIZE into one directory per day
+    (e.g., "invoices/2025-05-01/SALES_Bob_..._1234-7.txt").
+    close() writes everything still waiting; it is also called when the program ends.
+    Invoices that could not be written are reported on the console and kept in
+    failedInvoices.
+
+    · Example (Only for demonstration purposes):
+        invoiceWriter = InvoiceWriter()
+        invoiceWriter.submit(generateInvoiceName("SALES", "Bob"), invoiceLines)
+        invoiceWriter.close()
+    """
+
+    def __init__(self, directory=INVOICE_DIRECTORY, batchSize=INVOICE_BATCH_SIZE):
+        self.directory = directory
+        self.batchSize = batchSize
+        self.pending = queue.Queue()
+        self.failedInvoices = []  # (file path, lines, error message)
+        self.writtenCount = 0
+        self.closed = False
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+        atexit.register(self.close)
+
+    def submit(self, fileName, lines):
+        """
+        Handing over one invoice to be written in the background.
+
+        · Parameters:
+            fileName (str): The invoice file name (see generateInvoiceName).
+            lines (list): The invoice lines.
+        · Returns:
+            str: The path the invoice will be written to.
+        · Raises:
+            RuntimeError: If the writer was already closed.
+        """
+        if self.closed:
+            raise RuntimeError("The invoice writer is closed.")
+        today = datetime.now()
+        dayDirectory = str(today.year) + "-" + str(today.month).zfill(2) + "-" + str(today.day).zfill(2)
+        filePath = os.path.join(self.directory, dayDirectory, fileName)
+        self.pending.put((filePath, lines))
+        return filePath
+
+    def run(self):
+        while True:
+            batch = [self.pending.get()] # Waiting for the first invoice of the next batch
+            while len(batch) < self.batchSize:
+                try:
+                    batch.append(self.pending.get_nowait())
+                except queue.Empty:
+                    break
+            stopping = False
+            for entry in batch:
+                if entry is None:
+                    stopping = True # close() was called, everything before is written
+                    continue
+                self.writeOne(entry[0], entry[1])
+            for entry in batch:
+                self.pending.task_done()
+            if stopping:
+                return
+
+    def writeOne(self, filePath, lines):
+        """
+        Writing one invoice file, creating its day directory if needed.
+
+        · Parameters:
+            filePath (str): The path of the invoice file.
+            lines (list): The invoice lines.
+        """
+        try:
+            os.makedirs(os.path.dirname(filePath), exist_ok=True)
+            invoiceFile = open(filePath, "w")
+            invoiceFile.write("\n".join(lines) + "\n")
+            invoiceFile.close()
+            self.writtenCount += 1
+        except Exception as e:
+            self.failedInvoices.append((filePath, lines, str(e)))
+            print("Error writing invoice file '" + filePath + "': " + str(e))
+
+    def flush(self):
+        """
+        Waiting until every submitted invoice has been written.
+        """
+        self.pending.join()
+
+    def close(self):
+        """
+        Writing all waiting invoices and stopping the background thread.
+
+        · Returns:
+            bool: True if every invoice was written, False if some failed.
+        """
+        if not self.closed:
+            self.closed = True
+            self.pending.put(None)
+            self.thread.join()
+            if self.failedInvoices:
+                print("Warning: " + str(len(self.failedInvoices)) + " invoice(s) could not be written.")
+        return not self.failedInvoices
+